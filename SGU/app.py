@@ -1,4 +1,6 @@
-from src import app
+from src import carregar_web
+
+app = carregar_web()  # API completa (extensões web e rotas)
 
 if __name__== '__main__':
     app.run()
\ No newline at end of file
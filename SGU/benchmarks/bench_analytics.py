@@ -0,0 +1,126 @@
+"""
+Benchmark dos relatórios: objetos do ORM linha a linha x colunas NumPy
+
+Para N agendamentos (padrão 10k e 100k) em 12 semanas, mede:
+- orm: ``AgendamentoModel.query`` + laços em Python (o jeito antigo)
+- colunas: leitura em colunas + NumPy (``analytics_services``), cache frio
+- cache: mesma chamada com o período em cache (só confere o outbox)
+
+Confere antes que os dois caminhos dão as mesmas taxas e a mesma ocupação.
+
+Uso: python benchmarks/bench_analytics.py [N ...]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DATABASE_URL', 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench.db'))
+
+from sqlalchemy import delete, insert  # noqa: E402
+
+from src import app, db  # noqa: E402
+from src.models.agendamento_model import AgendamentoModel  # noqa: E402
+from src.models.profissional_model import ProfissionalModel  # noqa: E402
+from src.models.servicos_model import ServicoModel  # noqa: E402
+from src.services import analytics_services  # noqa: E402
+from src.services.agendamento_services import _obter_duracao_servico  # noqa: E402
+
+FIM = date(2030, 3, 31)
+INICIO = FIM - timedelta(weeks=12) + timedelta(days=1)
+PROFISSIONAIS = 20
+STATUS = ('agendado', 'concluido', 'concluido', 'concluido', 'cancelado', 'faltou')
+
+
+def popular(n):
+    random.seed(n)
+    db.session.execute(delete(AgendamentoModel.__table__))
+    base = datetime.combine(INICIO, datetime.min.time())
+    linhas = []
+    for _ in range(n):
+        dt = base + timedelta(days=random.randrange(84), hours=random.randrange(9, 19),
+                              minutes=random.choice((0, 30)))
+        linhas.append({'dt_agendamento': dt, 'dt_atendimento': dt, 'id_user': 1,
+                       'id_profissional': random.randrange(1, PROFISSIONAIS + 1),
+                       'id_servico': random.randrange(1, 6), 'status': random.choice(STATUS),
+                       'valor_total': 50.0, 'taxa_cancelamento': 0.0})
+    db.session.execute(insert(AgendamentoModel.__table__), linhas)
+    db.session.commit()
+
+
+def via_orm():
+    """Taxas por profissional e ocupação (profissional, semana, hora) com objetos do ORM"""
+    inicio = datetime.combine(INICIO, datetime.min.time())
+    fim = datetime.combine(FIM + timedelta(days=1), datetime.min.time())
+    origem = INICIO - timedelta(days=INICIO.weekday())
+    duracoes = {s.id: _obter_duracao_servico(s) for s in ServicoModel.query.all()}
+    total, cancelados, ocupacao = Counter(), Counter(), Counter()
+    for a in AgendamentoModel.query.filter(AgendamentoModel.dt_atendimento >= inicio,
+                                           AgendamentoModel.dt_atendimento < fim):
+        total[a.id_profissional] += 1
+        if a.status == 'cancelado':
+            cancelados[a.id_profissional] += 1
+            continue
+        momento = a.dt_atendimento
+        for _ in range(max(1, -(-duracoes[a.id_servico] // 30))):
+            semana = (momento.date() - origem).days // 7
+            ocupacao[(a.id_profissional, semana, momento.weekday() * 24 + momento.hour)] += 0.5
+            momento += timedelta(minutes=30)
+    return total, cancelados, ocupacao
+
+
+def via_colunas():
+    return analytics_services.taxas(INICIO, FIM), analytics_services.ocupacao(INICIO, FIM)
+
+
+def conferir():
+    total, cancelados, ocupacao = via_orm()
+    taxas, mapa = via_colunas()
+    for linha in taxas['por_profissional']:
+        assert linha['total'] == total[linha['id_profissional']]
+        assert linha['cancelados'] == cancelados[linha['id_profissional']]
+    for prof in mapa['profissionais']:
+        for semana, horas in enumerate(prof['ocupacao']):
+            for hora, valor in enumerate(horas):
+                esperado = min(1.0, ocupacao.get((prof['id_profissional'], semana, hora), 0))
+                assert abs(valor - esperado) < 1e-3, (prof['id_profissional'], semana, hora)
+
+
+def cronometrar(funcao, preparar=lambda: None, repeticoes=3):
+    melhor = float('inf')
+    for _ in range(repeticoes):
+        preparar()
+        db.session.expunge_all()
+        inicio = time.perf_counter()
+        funcao()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor * 1000
+
+
+def main():
+    escalas = [int(x) for x in sys.argv[1:]] or [10_000, 100_000]
+    with app.app_context():
+        db.create_all()
+        db.session.add_all([ProfissionalModel(nome=f'prof {i}') for i in range(PROFISSIONAIS)])
+        db.session.add_all([ServicoModel(descricao=f'servico {i}', valor=50.0, horario_duraçao=30)
+                            for i in range(5)])
+        db.session.commit()
+
+        print(f'{"N":>9}{"orm ms":>11}{"colunas ms":>12}{"cache ms":>10}')
+        for n in escalas:
+            popular(n)
+            analytics_services.invalidar_cache()
+            conferir()
+            orm = cronometrar(via_orm)
+            colunas = cronometrar(via_colunas, analytics_services.invalidar_cache)
+            cache = cronometrar(via_colunas)
+            print(f'{n:>9}{orm:>11.0f}{colunas:>12.1f}{cache:>10.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+"""
+Benchmark: API síncrona (Flask-RESTful) x variante assíncrona (/async)
+
+Sobe a app num servidor WSGI com threads e dispara clientes concorrentes
+contra as consultas de leitura. Cenários:
+- usuario: GET /usuario/<id>
+- horarios: disponibilidade de um profissional em um dia
+- semana: disponibilidade de 7 dias (sync = 7 requisições; async = 1
+  requisição com dias=7, dias consultados em paralelo)
+
+Uso: python benchmarks/bench_async_api.py [clientes] [requisicoes_por_cliente]
+"""
+
+import json
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DATABASE_URL', 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench.db'))
+os.environ.setdefault('ASYNC_API_ENABLED', '1')
+os.environ.setdefault('RATE_LIMIT_ENABLED', '0')
+
+from sqlalchemy import insert  # noqa: E402
+from werkzeug.serving import make_server  # noqa: E402
+
+from src import carregar_web, db  # noqa: E402
+from src.models.agendamento_model import AgendamentoModel  # noqa: E402
+from src.models.profissional_model import ProfissionalModel  # noqa: E402
+from src.models.servicos_model import ServicoModel  # noqa: E402
+from src.models.usuario_model import UsuarioModel  # noqa: E402
+
+app = carregar_web()
+
+PROFISSIONAIS = 10
+INICIO = date.today() + timedelta(days=1)
+
+
+def popular():
+    with app.app_context():
+        db.create_all()
+        db.session.execute(insert(UsuarioModel.__table__), [{
+            'nome': f'usuario {i}', 'email': f'u{i}@sgu', 'email_canonical': f'u{i}@sgu',
+            'telefone': '0', 'senha': 'x'} for i in range(1000)])
+        db.session.execute(insert(ProfissionalModel.__table__), [
+            {'nome': f'prof {i}'} for i in range(PROFISSIONAIS)])
+        db.session.execute(insert(ServicoModel.__table__), [
+            {'descricao': 'corte', 'valor': 50.0, 'horario_duraçao': 30}])
+        linhas = []
+        for dia in range(7):
+            for prof in range(1, PROFISSIONAIS + 1):
+                for hora in (9, 10, 14, 16):
+                    linhas.append({
+                        'dt_agendamento': datetime.utcnow(),
+                        'dt_atendimento': datetime.combine(INICIO + timedelta(days=dia), datetime.min.time()).replace(hour=hora),
+                        'id_user': 1, 'id_profissional': prof, 'id_servico': 1,
+                        'status': 'agendado', 'valor_total': 50.0, 'taxa_cancelamento': 0.0})
+        db.session.execute(insert(AgendamentoModel.__table__), linhas)
+        db.session.commit()
+
+
+def rotas(cenario, prefixo, i):
+    prof = i % PROFISSIONAIS + 1
+    if cenario == 'usuario':
+        return [f'{prefixo}/usuario/{i % 1000 + 1}']
+    if cenario == 'horarios':
+        return [f'{prefixo}/profissional/{prof}/horarios?data={INICIO.isoformat()}']
+    if prefixo:
+        return [f'{prefixo}/profissional/{prof}/horarios?data={INICIO.isoformat()}&dias=7']
+    return [f'/profissional/{prof}/horarios?data={(INICIO + timedelta(days=d)).isoformat()}' for d in range(7)]
+
+
+def disparar(base, cenario, prefixo, clientes, por_cliente):
+    erros = []
+
+    def cliente(c):
+        for i in range(por_cliente):
+            for rota in rotas(cenario, prefixo, c * por_cliente + i):
+                try:
+                    with urllib.request.urlopen(base + rota) as resposta:
+                        json.loads(resposta.read())
+                except Exception:
+                    erros.append(rota)
+
+    threads = [threading.Thread(target=cliente, args=(c,)) for c in range(clientes)]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return clientes * por_cliente / (time.perf_counter() - t0), len(erros)
+
+
+def main():
+    clientes = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    por_cliente = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    popular()
+    servidor = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    base = f'http://127.0.0.1:{servidor.server_port}'
+
+    print(f'{clientes} clientes x {por_cliente} operações')
+    print(f'{"cenario":<10}{"sync op/s":>12}{"async op/s":>12}{"erros":>8}')
+    for cenario in ('usuario', 'horarios', 'semana'):
+        sync, erros_sync = disparar(base, cenario, '', clientes, por_cliente)
+        assincrono, erros_async = disparar(base, cenario, '/async', clientes, por_cliente)
+        print(f'{cenario:<10}{sync:>12.0f}{assincrono:>12.0f}{erros_sync + erros_async:>8}')
+
+    servidor.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+"""
+Benchmark da auditoria de sobreposição: comparação par a par x linha de varredura
+
+Para N agendamentos (padrão 10k, 100k e 1M) de 200 profissionais, em
+horários sorteados (as colisões são as sobreposições), mede:
+- pares: compara todos os pares de agendamentos de cada profissional,
+  O(n²/p) — só roda até PARES_ATE linhas
+- varredura: ``auditoria_services.Auditoria`` (leitura em lotes + heap)
+
+Confere antes que os dois acham os mesmos pares.
+
+Uso: python benchmarks/bench_auditoria.py [N ...]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from itertools import combinations
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DATABASE_URL', 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench.db'))
+
+from sqlalchemy import delete, insert, select  # noqa: E402
+
+from src import app, db  # noqa: E402
+from src.models.agendamento_model import AgendamentoModel  # noqa: E402
+from src.models.profissional_model import ProfissionalModel  # noqa: E402
+from src.models.servicos_model import ServicoModel  # noqa: E402
+from src.services.auditoria_services import Auditoria  # noqa: E402
+
+PROFISSIONAIS = 200
+PARES_ATE = 100_000
+INICIO = datetime(2030, 1, 1)
+DURACAO = timedelta(minutes=60)  # serviços sem duração: padrão de _obter_duracao_servico
+
+
+def popular(n, lote=50_000):
+    random.seed(n)
+    db.session.execute(delete(AgendamentoModel.__table__))
+    # horários sorteados (9h-19h, de 30 em 30 min) com o dobro da capacidade: colisões viram sobreposições
+    dias = max(365, 2 * n // (PROFISSIONAIS * 20))
+    linhas = []
+    for _ in range(n):
+        dt = INICIO + timedelta(days=random.randrange(dias), minutes=30 * random.randrange(18, 38))
+        linhas.append({'dt_agendamento': dt, 'dt_atendimento': dt, 'id_user': 1,
+                       'id_profissional': random.randrange(1, PROFISSIONAIS + 1), 'id_servico': random.randrange(1, 6),
+                       'status': random.choice(('agendado', 'concluido', 'cancelado')),
+                       'valor_total': 50.0, 'taxa_cancelamento': 0.0})
+        if len(linhas) == lote:
+            db.session.execute(insert(AgendamentoModel.__table__), linhas)
+            linhas = []
+    if linhas:
+        db.session.execute(insert(AgendamentoModel.__table__), linhas)
+    db.session.commit()
+
+
+def via_pares():
+    por_profissional = defaultdict(list)
+    consulta = select(AgendamentoModel.id, AgendamentoModel.id_profissional, AgendamentoModel.dt_atendimento) \
+        .where(AgendamentoModel.status != 'cancelado')
+    for id_agendamento, id_profissional, inicio in db.session.execute(consulta):
+        por_profissional[id_profissional].append((id_agendamento, inicio))
+    pares = set()
+    for agendamentos in por_profissional.values():
+        for (id_a, ini_a), (id_b, ini_b) in combinations(agendamentos, 2):
+            if ini_a < ini_b + DURACAO and ini_b < ini_a + DURACAO:
+                pares.add((min(id_a, id_b), max(id_a, id_b)))
+    return pares
+
+
+def via_varredura():
+    auditoria = Auditoria()
+    pares = {(min(p[1], p[4]), max(p[1], p[4])) for p in auditoria}
+    return pares, auditoria.resumo()
+
+
+def cronometrar(funcao, repeticoes=3):
+    melhor, resultado = float('inf'), None
+    for _ in range(repeticoes):
+        db.session.expunge_all()
+        inicio = time.perf_counter()
+        resultado = funcao()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor * 1000, resultado
+
+
+def main():
+    escalas = [int(x) for x in sys.argv[1:]] or [10_000, 100_000, 1_000_000]
+    with app.app_context():
+        db.create_all()
+        db.session.add_all([ProfissionalModel(nome=f'prof {i}') for i in range(PROFISSIONAIS)])
+        db.session.add_all([ServicoModel(descricao=f'servico {i}', valor=50.0, horario_duraçao=30)
+                            for i in range(5)])
+        db.session.commit()
+
+        print(f'{"N":>9}{"pares ms":>11}{"varredura ms":>14}{"sobrepostos":>13}')
+        for n in escalas:
+            popular(n)
+            repeticoes = 3 if n <= PARES_ATE else 1
+            varredura, (pares, resumo) = cronometrar(via_varredura, repeticoes)
+            if n <= PARES_ATE:
+                ingenuo, esperado = cronometrar(via_pares, 1)
+                assert pares == esperado, (len(pares), len(esperado))
+                ingenuo = f'{ingenuo:.0f}'
+            else:
+                ingenuo = '-'
+            print(f'{n:>9}{ingenuo:>11}{varredura:>14.0f}{resumo["pares_sobrepostos"]:>13}')
+
+
+if __name__ == '__main__':
+    main()
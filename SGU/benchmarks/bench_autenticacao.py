@@ -0,0 +1,55 @@
+"""
+Benchmark: custo de autenticar cada requisição
+
+Compara, por chamada:
+- senha: ``verficar_senha`` (pbkdf2) a cada requisição
+- token: ``verificar_token`` (HMAC + validade + cache de revogados)
+e mede quantas consultas SQL a verificação de token faz.
+
+Uso: python benchmarks/bench_autenticacao.py [chamadas]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DATABASE_URL', 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench.db'))
+os.environ.setdefault('SECRET_KEY', 'chave-do-benchmark')
+
+from src import app, db  # noqa: E402
+from src.models.usuario_model import UsuarioModel  # noqa: E402
+from src.utils.autenticacao import emitir_token, verificar_token  # noqa: E402
+from src.utils.orcamento_consultas import OrcamentoConsultas  # noqa: E402
+
+
+def por_chamada(funcao, chamadas):
+    inicio = time.perf_counter()
+    for _ in range(chamadas):
+        funcao()
+    return (time.perf_counter() - inicio) / chamadas * 1e6
+
+
+def main():
+    chamadas = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+
+    with app.app_context():
+        db.create_all()
+        usuario = UsuarioModel(nome='bench', email='bench@sgu', telefone='0', senha='')
+        usuario.gen_senha('senha-do-benchmark')
+        token = emitir_token(1)['token']
+        verificar_token(token)  # carrega a lista de revogados
+
+        senha_us = por_chamada(lambda: usuario.verficar_senha('senha-do-benchmark'), max(chamadas // 100, 5))
+        with OrcamentoConsultas(db.engine, max_consultas=0, nome='verificar_token') as orcamento:
+            token_us = por_chamada(lambda: verificar_token(token), chamadas)
+
+    print(f'{"verificação":<12}{"µs/chamada":>12}{"chamadas/s":>13}')
+    print(f'{"senha":<12}{senha_us:>12.0f}{1e6 / senha_us:>13.0f}')
+    print(f'{"token":<12}{token_us:>12.1f}{1e6 / token_us:>13.0f}')
+    print(f'\ntoken {senha_us / token_us:.0f}x mais barato; consultas SQL: {orcamento.consultas}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""
+Benchmark da busca de usuários: índice textual x alternativas
+
+Para 1k, 10k e 100k usuários compara, por consulta:
+- índice: ``busca_services.buscar`` (FTS5 + bm25, uma página)
+- like: o mesmo filtro por prefixo em LIKE (``_ranking_like``, varre a tabela)
+- lista: o que a recepção fazia — ``GET /usuario`` inteiro e filtro no cliente
+
+Antes de medir, confere que o índice encontra tudo o que o LIKE encontra (o
+LIKE não ignora acentos nem pontuação: "joao" não acha "João").
+
+Uso: python benchmarks/bench_busca.py [repeticoes]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DATABASE_URL', 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench.db'))
+
+from sqlalchemy import delete, insert  # noqa: E402
+
+from src import app, db  # noqa: E402
+from src.models.usuario_model import UsuarioModel  # noqa: E402
+from src.schemas import usuario_schema  # noqa: E402
+from src.services import busca_services, usuario_services  # noqa: E402
+
+ESCALAS = (1_000, 10_000, 100_000)
+TERMOS = ('mar sil', 'joao', '61 9000')
+NOMES = ('João', 'Maria', 'José', 'Ana', 'Marcos', 'Mariana', 'Paulo', 'Sílvia')
+SOBRENOMES = ('Silva', 'Souza', 'Oliveira', 'Santos', 'Lima', 'Silveira', 'Costa')
+
+
+def popular(n):
+    db.session.execute(delete(UsuarioModel.__table__))
+    db.session.execute(insert(UsuarioModel.__table__), [{
+        'nome': f'{NOMES[i % len(NOMES)]} {SOBRENOMES[i // len(NOMES) % len(SOBRENOMES)]} {i}',
+        'email': f'u{i}@sgu', 'email_canonical': f'u{i}@sgu',
+        'telefone': f'(61) 9{i:04d}-{i % 10_000:04d}', 'senha': 'x'} for i in range(n)])
+    db.session.commit()
+
+
+def filtro_cliente(termo):
+    palavras = busca_services._palavras(termo)
+    usuarios = usuario_schema.serializar_usuarios(usuario_services.listar_usuario())
+    return [u for u in usuarios
+            if all(any(p in campo.lower() for campo in (u['nome'], u['email'], u['telefone'])) for p in palavras)]
+
+
+def cronometrar(funcao, repeticoes):
+    melhor = float('inf')
+    for _ in range(repeticoes):
+        db.session.expunge_all()
+        inicio = time.perf_counter()
+        funcao()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor * 1000
+
+
+def main():
+    repeticoes = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+    with app.app_context():
+        db.create_all()
+        print(f'{"N":>8}  {"termo":<10}{"índice":>10}{"like":>10}{"lista":>10}   (ms, melhor de {repeticoes})')
+        for n in ESCALAS:
+            popular(n)
+            for termo in TERMOS:
+                palavras = busca_services._palavras(termo)
+                indice = {i for _, i, _ in busca_services._ranking_indice('sqlite', ['usuario'], palavras, n, 0)}
+                like = {i for _, i, _ in busca_services._ranking_like(['usuario'], palavras, n, 0)}
+                assert like <= indice, (termo, len(indice), len(like))
+
+                tempos = [
+                    cronometrar(lambda: busca_services.buscar(termo, ['usuario']), repeticoes),
+                    cronometrar(lambda: busca_services._ranking_like(['usuario'], palavras, 21, 0), repeticoes),
+                    cronometrar(lambda: filtro_cliente(termo), max(1, repeticoes // 2)),
+                ]
+                print(f'{n:>8}  {termo:<10}' + ''.join(f'{t:>10.2f}' for t in tempos))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+"""
+Benchmark dos calendários .ics: consultas periódicas de apps de calendário
+
+Para um profissional com N agendamentos (padrão 200 e 2000), compara por
+consulta (cliente HTTP de teste, pilha Flask completa):
+- lista: ``GET /agendamento`` filtrado no Python (o que um app faria sem feed)
+- ics frio: feed montado do banco a cada consulta (cache descartado)
+- ics 304: feed em cache com ``If-None-Match`` (o caso comum)
+- ics após escrita: um agendamento cancelado entre duas consultas (atualização incremental)
+e quantas consultas SQL cada um faz.
+
+Uso: python benchmarks/bench_calendario.py [N ...]
+"""
+
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DATABASE_URL', 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench.db'))
+os.environ.setdefault('SECRET_KEY', 'chave-do-benchmark')
+os.environ.setdefault('RATE_LIMIT_ENABLED', '0')
+
+from sqlalchemy import delete, insert  # noqa: E402
+
+from src import carregar_web, db  # noqa: E402
+from src.models.agendamento_model import AgendamentoModel  # noqa: E402
+from src.models.profissional_model import ProfissionalModel  # noqa: E402
+from src.models.servicos_model import ServicoModel  # noqa: E402
+from src.models.usuario_model import UsuarioModel  # noqa: E402
+from src.services import agendamento_services, calendario_services  # noqa: E402
+from src.utils.orcamento_consultas import OrcamentoConsultas  # noqa: E402
+
+app = carregar_web()
+
+
+def popular(n):
+    db.session.execute(delete(AgendamentoModel.__table__))
+    inicio = datetime.now().replace(hour=9, minute=0, second=0, microsecond=0) + timedelta(days=1)
+    db.session.execute(insert(AgendamentoModel.__table__), [{
+        'dt_agendamento': inicio, 'dt_atendimento': inicio + timedelta(days=i // 8, hours=i % 8),
+        'id_user': 1 + i % 50, 'id_profissional': 1, 'id_servico': 1, 'status': 'agendado',
+        'valor_total': 50.0, 'taxa_cancelamento': 0.0} for i in range(n)])
+    db.session.commit()
+
+
+def medir(funcao, chamadas, preparar=lambda: None):
+    """(ms por consulta, consultas SQL por consulta)"""
+    total, consultas = 0.0, 0
+    with OrcamentoConsultas(db.engine, nome='calendario') as orcamento:
+        for _ in range(chamadas):
+            preparar()
+            antes, inicio = orcamento.consultas, time.perf_counter()
+            funcao()
+            total += time.perf_counter() - inicio
+            consultas += orcamento.consultas - antes
+    return total / chamadas * 1000, consultas / chamadas
+
+
+def main():
+    escalas = [int(x) for x in sys.argv[1:]] or [200, 2000]
+    cliente = app.test_client()
+    with app.app_context():
+        db.create_all()
+        db.session.add(ProfissionalModel(nome='prof'))
+        db.session.add(ServicoModel(descricao='corte', valor=50.0, horario_duraçao=30))
+        db.session.execute(insert(UsuarioModel.__table__), [{
+            'nome': f'cliente {i}', 'email': f'c{i}@sgu', 'email_canonical': f'c{i}@sgu',
+            'telefone': '0', 'senha': 'x'} for i in range(1, 51)])
+        db.session.commit()
+        caminho = f'/calendario/{calendario_services.emitir_token("profissional", 1)}.ics'
+
+        print(f'{"N":>6}  {"consulta":<16}{"ms":>9}{"SQL":>7}')
+        for n in escalas:
+            popular(n)
+            calendario_services.invalidar_cache()
+            ids = iter(range(1, n + 1))
+
+            def lista():
+                cliente.get('/agendamento').get_json()
+
+            def cancelar_um():
+                # cancelamento "de outro cliente" entre duas consultas do app
+                agendamento_services.excluir_agendamento(next(ids))
+                db.session.remove()
+
+            etag = cliente.get(caminho).headers['ETag']
+            resultados = {
+                'lista': medir(lista, 20),
+                'ics frio': medir(lambda: cliente.get(caminho), 20, calendario_services.invalidar_cache),
+                'ics 304': medir(lambda: cliente.get(caminho, headers={'If-None-Match': etag}), 1000),
+                'ics após escrita': medir(lambda: cliente.get(caminho, headers={'If-None-Match': etag}), 20,
+                                          cancelar_um),
+            }
+            for nome, (ms, sql) in resultados.items():
+                print(f'{n:>6}  {nome:<16}{ms:>9.2f}{sql:>7.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""
+Benchmark da cotação: consulta por horário x tabela de preços em cache
+
+Para H horários candidatos (padrão 100, 500 e 1000) de um pacote de 3
+serviços, com R regras de pico (padrão 50) e 2 faixas de pacote, compara:
+- por horário: serviços e regras lidos do banco para cada horário cotado
+  (cache descartado antes de cada ``cotar`` de um horário)
+- em lote: ``preco_services.cotar`` com todos os horários, tabela em cache
+
+Confere antes que os dois dão os mesmos preços.
+
+Uso: python benchmarks/bench_cotacao.py [H ...]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, time as hora, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DATABASE_URL', 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench.db'))
+
+from sqlalchemy import insert  # noqa: E402
+
+from src import app, db  # noqa: E402
+from src.models.regra_preco_model import RegraPrecoModel  # noqa: E402
+from src.services import preco_services  # noqa: E402
+from src.utils import fixtures  # noqa: E402
+from src.utils.orcamento_consultas import OrcamentoConsultas  # noqa: E402
+
+SERVICOS = [1, 4, 7]
+INICIO = datetime(2030, 1, 7, 9)
+REGRAS = 50
+
+
+def popular():
+    random.seed(REGRAS)
+    fixtures.gerar(clientes=1, agendamentos=0)
+    vazia = {'dia_semana': None, 'hora_inicio': None, 'hora_fim': None, 'min_servicos': None, 'id_servico': None}
+    regras = [{**vazia, 'tipo': 'pacote', 'percentual': 10.0, 'min_servicos': 2},
+              {**vazia, 'tipo': 'pacote', 'percentual': 15.0, 'min_servicos': 3}]
+    for _ in range(REGRAS):
+        inicio = random.randrange(18, 38)
+        regras.append({**vazia, 'tipo': 'horario_pico', 'percentual': float(random.choice((5, 10, 15, 20, 30))),
+                       'dia_semana': random.choice((None, *range(7))),
+                       'hora_inicio': hora(inicio // 2, 30 * (inicio % 2)),
+                       'hora_fim': hora((inicio + 4) // 2, 30 * (inicio % 2)),
+                       'id_servico': random.choice((None, *SERVICOS))})
+    db.session.execute(insert(RegraPrecoModel.__table__), regras)
+    db.session.commit()
+
+
+def por_horario(horarios):
+    cotacoes = []
+    for momento in horarios:
+        preco_services.invalidar_cache()
+        cotacoes += preco_services.cotar(SERVICOS, [momento])['cotacoes']
+    return cotacoes
+
+
+def em_lote(horarios):
+    return preco_services.cotar(SERVICOS, horarios)['cotacoes']
+
+
+def main():
+    tamanhos = [int(x) for x in sys.argv[1:]] or [100, 500, 1000]
+
+    with app.app_context():
+        popular()
+        print(f'{len(SERVICOS)} serviços por cotação, {REGRAS} regras de pico')
+        print(f"{'horários':>8} {'por horário':>22} {'em lote':>22} {'ganho':>7}")
+        for n in tamanhos:
+            horarios = [INICIO + timedelta(minutes=30 * i) for i in range(n)]
+            assert por_horario(horarios) == em_lote(horarios)
+
+            resultados = []
+            for funcao in (por_horario, em_lote):
+                em_lote(horarios[:1])  # tabela carregada (o lote usa o cache)
+                with OrcamentoConsultas(db.engine) as orcamento:
+                    comeco = time.perf_counter()
+                    funcao(horarios)
+                    ms = (time.perf_counter() - comeco) * 1000
+                resultados.append((orcamento.consultas, ms))
+            (q1, ms1), (q2, ms2) = resultados
+            print(f'{n:8} {f"{q1}q {ms1:8.1f} ms":>22} {f"{q2}q {ms2:8.1f} ms":>22} {ms1 / ms2:6.0f}x')
+
+
+if __name__ == '__main__':
+    main()
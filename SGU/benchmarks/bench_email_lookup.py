@@ -0,0 +1,75 @@
+"""
+Benchmark da busca por email no cadastro (UsuarioList.post)
+
+Popula tb_usuario com N usuários (INSERT em lote, hash fixo) e mede a
+latência de ``listar_usuario_email`` pela coluna ``email_canonical``
+indexada, comparando com a alternativa sem coluna (``lower(email) = ?``),
+que obriga o banco a varrer a tabela.
+
+Uso: python benchmarks/bench_email_lookup.py [usuarios] [buscas]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DATABASE_URL', 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench.db'))
+
+from sqlalchemy import func, insert  # noqa: E402
+
+from src import app, db  # noqa: E402
+from src.models.usuario_model import UsuarioModel  # noqa: E402
+from src.services import usuario_services  # noqa: E402
+
+LOTE = 50_000
+
+
+def popular(total):
+    tabela = UsuarioModel.__table__
+    for inicio in range(0, total, LOTE):
+        linhas = [{
+            'nome': f'usuario {i}',
+            'email': f'Usuario{i}@Exemplo.com',
+            'email_canonical': f'usuario{i}@exemplo.com',
+            'telefone': '61 90000-0000',
+            'senha': 'hash-fixo',
+        } for i in range(inicio, min(inicio + LOTE, total))]
+        db.session.execute(insert(tabela), linhas)
+    db.session.commit()
+
+
+def medir(funcao, emails):
+    t0 = time.perf_counter()
+    for email in emails:
+        funcao(email)
+    return (time.perf_counter() - t0) / len(emails) * 1000
+
+
+def busca_lower(email):
+    return UsuarioModel.query.filter(func.lower(UsuarioModel.email) == email.strip().lower()).first()
+
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    buscas = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+    with app.app_context():
+        db.create_all()
+        t0 = time.perf_counter()
+        popular(total)
+        print(f'{total} usuários inseridos em {time.perf_counter() - t0:.1f}s')
+
+        emails = [f'USUARIO{random.randrange(total)}@exemplo.COM' for _ in range(buscas)]
+        emails.append('novo.usuario@exemplo.com')  # caso comum do cadastro: email livre
+
+        canonical = medir(usuario_services.listar_usuario_email, emails)
+        lower = medir(busca_lower, emails[:max(1, buscas // 20)])
+        print(f'email_canonical indexado: {canonical:8.3f} ms/busca')
+        print(f'lower(email) sem índice : {lower:8.3f} ms/busca')
+
+
+if __name__ == '__main__':
+    main()
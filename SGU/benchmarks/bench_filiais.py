@@ -0,0 +1,132 @@
+"""
+Benchmark do custo por filial (um engine/banco por filial)
+
+Mede, com o test client (cabeçalho X-Filial -> engine da filial), a
+latência de ``GET /usuario/<id>``:
+- padrão: sem cabeçalho, engine do Flask-SQLAlchemy
+- filial quente: engine já no pool
+- filial fria: primeiro acesso (cria engine, conecta e aplica os PRAGMAs)
+- rodízio: requisições alternando entre F filiais, com o pool maior que F
+  (todos quentes) e menor que F (cada troca descarta e recria um engine)
+
+Também mostra o custo de resolver o engine (``get_bind``) e a memória de
+um engine de filial.
+
+Uso: python benchmarks/bench_filiais.py [filiais] [requisicoes]
+"""
+
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+PASTA = tempfile.mkdtemp()
+FILIAIS = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+REQUISICOES = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DATABASE_URL', 'sqlite:///' + os.path.join(PASTA, 'padrao.db'))
+os.environ['FILIAL_DATABASE_URL'] = 'sqlite:///' + os.path.join(PASTA, 'filial_{filial}.db')
+os.environ['FILIAIS'] = ','.join(f'f{i}' for i in range(FILIAIS))
+os.environ['RATE_LIMIT_ENABLED'] = '0'
+
+from sqlalchemy import insert  # noqa: E402
+
+from src import carregar_web, db  # noqa: E402
+from src.models.usuario_model import UsuarioModel  # noqa: E402
+from src.utils import filiais  # noqa: E402
+
+app = carregar_web()
+cliente = app.test_client()
+NOMES = [f'f{i}' for i in range(FILIAIS)]
+
+
+def popular():
+    linhas = [{'nome': f'usuario {i}', 'email': f'u{i}@sgu', 'email_canonical': f'u{i}@sgu',
+               'telefone': '0', 'senha': 'x'} for i in range(1, 101)]
+    with app.app_context():
+        db.create_all()
+        db.session.execute(insert(UsuarioModel.__table__), linhas)
+        db.session.commit()
+        for nome in NOMES:
+            filiais.criar_tabelas(nome)
+            with filiais.usar_filial(nome):
+                db.session.execute(insert(UsuarioModel.__table__), linhas)
+                db.session.commit()
+
+
+def requisicao(filial=None):
+    cabecalhos = {'X-Filial': filial} if filial else {}
+    inicio = time.perf_counter()
+    resposta = cliente.get('/usuario/7', headers=cabecalhos)
+    duracao = (time.perf_counter() - inicio) * 1e6
+    assert resposta.status_code == 200, resposta.json
+    return duracao
+
+
+def medianas(filiais_por_requisicao):
+    return statistics.median(requisicao(f) for f in filiais_por_requisicao)
+
+
+def novo_pool(limite):
+    app.config['FILIAL_MAX_ENGINES'] = limite
+    pool = app.extensions.pop('sgu_filiais', None)
+    if pool:
+        pool.descartar_todos()
+    return filiais.engines(app)
+
+
+def main():
+    popular()
+    resultados = {}
+
+    novo_pool(FILIAIS)
+    resultados['padrão (sem filial)'] = medianas([None] * REQUISICOES)
+    requisicao(NOMES[0])
+    resultados['filial quente'] = medianas([NOMES[0]] * REQUISICOES)
+
+    frias = []
+    for _ in range(5):
+        novo_pool(FILIAIS)
+        frias += [requisicao(nome) for nome in NOMES]
+    resultados['filial fria (1º acesso)'] = statistics.median(frias)
+
+    rodizio = [NOMES[i % FILIAIS] for i in range(REQUISICOES)]
+    pool = novo_pool(FILIAIS)
+    resultados[f'rodízio {FILIAIS} filiais, pool {FILIAIS}'] = medianas(rodizio)
+    recriados_cheio = pool.criados
+
+    limite = max(1, FILIAIS // 2)
+    pool = novo_pool(limite)
+    resultados[f'rodízio {FILIAIS} filiais, pool {limite}'] = medianas(rodizio)
+
+    print(f'{"cenário":<34}{"mediana µs":>12}')
+    for nome, us in resultados.items():
+        print(f'{nome:<34}{us:>12.0f}')
+    print(f'\nengines criados no rodízio: pool {FILIAIS} = {recriados_cheio}, '
+          f'pool {limite} = {pool.criados} ({pool.descartados} descartados)')
+
+    with app.test_request_context(headers={'X-Filial': NOMES[0]}):
+        app.preprocess_request()
+        sessao = db.session()
+        inicio = time.perf_counter()
+        for _ in range(100_000):
+            sessao.get_bind()
+        print(f'get_bind com filial: {(time.perf_counter() - inicio) * 10:.2f} µs')
+        app.do_teardown_request()
+
+    pool = novo_pool(FILIAIS)
+    tracemalloc.start()
+    antes = tracemalloc.take_snapshot()
+    for nome in NOMES:
+        requisicao(nome)
+    depois = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    memoria = sum(s.size_diff for s in depois.compare_to(antes, 'filename'))
+    print(f'memória por engine de filial (com 1 conexão): {memoria / FILIAIS / 1024:.0f} KiB')
+
+
+if __name__ == '__main__':
+    main()
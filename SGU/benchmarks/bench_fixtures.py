@@ -0,0 +1,94 @@
+"""
+Benchmark da massa de dados: services x carga em lote x snapshot
+
+Para C clientes e N agendamentos (padrão 100k e 1M), mede:
+- services: ``cadastrar_usuario`` e ``cadastrar_agendamento`` (um pbkdf2 /
+  validações e um commit por linha) em uma amostra, extrapolado para C e N
+- lote: ``fixtures.gerar`` (insert em executemany, hash calculado uma vez)
+- snapshot: salvar pela API de backup e restaurar por cópia do arquivo e
+  pela API de backup
+
+Uso: python benchmarks/bench_fixtures.py [clientes] [agendamentos]
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+TEMP = tempfile.mkdtemp()
+os.environ.setdefault('DATABASE_URL', 'sqlite:///' + os.path.join(TEMP, 'bench.db'))
+
+from sqlalchemy import func, select  # noqa: E402
+
+from src import app, db  # noqa: E402
+from src.entities.usuario import Usuario  # noqa: E402
+from src.models.agendamento_model import AgendamentoModel  # noqa: E402
+from src.services import agendamento_services, usuario_services  # noqa: E402
+from src.utils import fixtures  # noqa: E402
+
+AMOSTRA = 200
+
+
+def por_linha_services():
+    """Segundos por usuário e por agendamento cadastrados pelos services (banco já com a massa pequena)"""
+    comeco = time.perf_counter()
+    for i in range(AMOSTRA):
+        usuario_services.cadastrar_usuario(Usuario(f'Amostra {i}', f'amostra{i}@bench.sgu', '11900000000', 'senha'))
+    usuario = (time.perf_counter() - comeco) / AMOSTRA
+
+    # horários livres: um dia útil daqui a um ano, um profissional por agendamento
+    dia = datetime.combine(datetime.now().date() + timedelta(days=365), datetime.min.time())
+    while dia.weekday() >= 5:
+        dia += timedelta(days=1)
+    comeco = time.perf_counter()
+    for i in range(AMOSTRA):
+        agendamento_services.cadastrar_agendamento(AgendamentoModel(
+            dt_atendimento=dia + timedelta(days=7 * (i // 20), hours=9), id_user=1,
+            id_profissional=i % 20 + 1, id_servico=1, valor_total=40.0))
+    agendamento = (time.perf_counter() - comeco) / AMOSTRA
+    return usuario, agendamento
+
+
+def main():
+    clientes = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    agendamentos = int(sys.argv[2]) if len(sys.argv) > 2 else 1_000_000
+
+    with app.app_context():
+        fixtures.gerar(clientes=100, agendamentos=0)
+        usuario, agendamento = por_linha_services()
+        estimado = usuario * clientes + agendamento * agendamentos
+        print(f'services: {usuario * 1000:.1f} ms/usuário, {agendamento * 1000:.1f} ms/agendamento '
+              f'-> estimado {estimado / 60:.0f} min para {clientes} + {agendamentos}')
+
+        db.session.remove()
+        db.drop_all()
+        comeco = time.perf_counter()
+        fixtures.gerar(clientes=clientes, agendamentos=agendamentos)
+        gerar = time.perf_counter() - comeco
+        print(f'lote: {gerar:.1f} s ({(clientes + agendamentos) / gerar:,.0f} linhas/s)')
+
+        snapshot = os.path.join(TEMP, 'massa.db')
+        comeco = time.perf_counter()
+        fixtures.salvar_snapshot(snapshot)
+        print(f'salvar snapshot: {time.perf_counter() - comeco:.2f} s '
+              f'({os.path.getsize(snapshot) / 2 ** 20:.0f} MB)')
+
+        for metodo in ('copia', 'backup'):
+            db.session.execute(AgendamentoModel.__table__.delete())
+            db.session.commit()
+            comeco = time.perf_counter()
+            fixtures.restaurar_snapshot(snapshot, metodo=metodo)
+            segundos = time.perf_counter() - comeco
+            total = db.session.execute(select(func.count(AgendamentoModel.id))).scalar()
+            assert total == agendamentos, (metodo, total)
+            print(f'restaurar ({metodo}): {segundos:.2f} s ({estimado / segundos:,.0f}x mais rápido que services)')
+
+    shutil.rmtree(TEMP, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
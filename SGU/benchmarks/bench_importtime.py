@@ -0,0 +1,111 @@
+"""
+Benchmark de cold start: tempo de import de cada tipo de processo
+
+Executa cada cenário em um processo Python novo e mede:
+- tempo total do processo (mediana de várias execuções, sem -X importtime)
+- tempo de import (soma dos módulos de topo no -X importtime)
+- os pacotes mais caros (tempo próprio dos módulos) e quais camadas pesadas
+  foram carregadas
+
+Cenários:
+- web: app.py (API completa: Flask-RESTful, Marshmallow, CORS, views)
+- migracoes: ``flask --app migracoes db current`` (Flask-Migrate/Alembic, sem web)
+- cli: job que usa só modelos e services
+
+Uso: python benchmarks/bench_importtime.py [execucoes] [--json arquivo]
+"""
+
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CENARIOS = {
+    'web': ['-c', 'import app'],
+    'migracoes': ['-m', 'flask', '--app', 'migracoes', 'db', 'current'],
+    'cli': ['-c', 'from src import app\n'
+                  'from src.services import agendamento_services, evento_services, usuario_services'],
+}
+
+# pacotes que o cenário cli não deveria carregar
+CAMADAS = ('flask_restful', 'flask_cors', 'flask_marshmallow', 'marshmallow', 'flask_migrate', 'alembic')
+
+LINHA = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+
+def executar(argumentos, env, importtime=False):
+    comando = [sys.executable] + (['-X', 'importtime'] if importtime else []) + argumentos
+    inicio = time.perf_counter()
+    processo = subprocess.run(comando, cwd=RAIZ, env=env, capture_output=True, text=True)
+    duracao = (time.perf_counter() - inicio) * 1000
+    if processo.returncode != 0:
+        raise RuntimeError(f'{" ".join(argumentos)} falhou:\n{processo.stderr[-2000:]}')
+    return duracao, processo.stderr
+
+
+def analisar(stderr):
+    """Soma dos imports de topo (ms) e tempo próprio (self) somado por pacote"""
+    total = 0
+    pacotes = {}
+    for linha in stderr.splitlines():
+        encontrado = LINHA.match(linha)
+        if not encontrado:
+            continue
+        proprio, acumulado, recuo, modulo = encontrado.groups()
+        if recuo == ' ':  # import de topo
+            total += int(acumulado)
+        pacote = modulo.split('.')[0]
+        pacotes[pacote] = pacotes.get(pacote, 0) + int(proprio)
+    return total / 1000, {p: us / 1000 for p, us in pacotes.items()}
+
+
+def medir(nome, execucoes, env):
+    argumentos = CENARIOS[nome]
+    executar(argumentos, env)  # aquece o cache de bytecode (.pyc)
+    tempos = [executar(argumentos, env)[0] for _ in range(execucoes)]
+    _, stderr = executar(argumentos, env, importtime=True)
+    importacao, pacotes = analisar(stderr)
+    carregados = sorted({m.group(4).split('.')[0] for m in map(LINHA.match, stderr.splitlines()) if m})
+    return {
+        'processo_ms': statistics.median(tempos),
+        'import_ms': importacao,
+        'mais_caros': sorted(pacotes.items(), key=lambda item: -item[1])[:6],
+        'camadas': [c for c in CAMADAS if c in carregados],
+    }
+
+
+def main():
+    argumentos = sys.argv[1:]
+    arquivo_json = None
+    if '--json' in argumentos:
+        posicao = argumentos.index('--json')
+        arquivo_json = argumentos[posicao + 1]
+        del argumentos[posicao:posicao + 2]
+    execucoes = int(argumentos[0]) if argumentos else 5
+
+    env = dict(os.environ, DATABASE_URL='sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench.db'))
+    resultados = {nome: medir(nome, execucoes, env) for nome in CENARIOS}
+
+    print(f'{"cenario":<11}{"processo ms":>13}{"import ms":>11}  camadas carregadas')
+    for nome, r in resultados.items():
+        print(f'{nome:<11}{r["processo_ms"]:>13.0f}{r["import_ms"]:>11.0f}  {", ".join(r["camadas"]) or "-"}')
+    for nome, r in resultados.items():
+        print(f'\n{nome}: ' + ', '.join(f'{p} {ms:.0f}ms' for p, ms in r['mais_caros']))
+
+    if arquivo_json:
+        with open(arquivo_json, 'w') as saida:
+            json.dump(resultados, saida, indent=2)
+
+    if resultados['cli']['camadas']:
+        print(f'\nO cenário cli carregou camadas web/migração: {resultados["cli"]["camadas"]}')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+"""
+Benchmark do despachante de lembretes contra o SMTP local
+
+Para N lembretes vencidos (padrão 2000) e um servidor SMTP com latência
+simulada por mensagem (padrão 5 ms), compara a vazão (envios/s):
+- conexão por mensagem: abre, envia e fecha uma conexão SMTP para cada lembrete
+- pool de 1, 4 e 8 conexões: ``lembrete_services.despachar`` (lotes, reserva e
+  envio em paralelo pelas conexões do pool)
+
+Uso: python benchmarks/bench_lembretes.py [N] [latência em s]
+"""
+
+import os
+import smtplib
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DATABASE_URL', 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench.db'))
+
+from sqlalchemy import delete, insert  # noqa: E402
+
+from smtp_local import ServidorSMTP  # noqa: E402
+from src import app, db  # noqa: E402
+from src.models.agendamento_model import AgendamentoModel  # noqa: E402
+from src.models.lembrete_model import LembreteModel  # noqa: E402
+from src.models.profissional_model import ProfissionalModel  # noqa: E402
+from src.models.servicos_model import ServicoModel  # noqa: E402
+from src.models.usuario_model import UsuarioModel  # noqa: E402
+from src.services import lembrete_services  # noqa: E402
+from src.utils.smtp import PoolSMTP  # noqa: E402
+
+AGORA = datetime(2030, 1, 10, 12, 0)
+
+
+def popular(n):
+    """N agendamentos entre 1h e 1h15 à frente: todos com o lembrete de 1h vencendo agora"""
+    db.session.execute(delete(LembreteModel.__table__))
+    db.session.execute(delete(AgendamentoModel.__table__))
+    db.session.execute(insert(AgendamentoModel.__table__), [{
+        'dt_agendamento': AGORA, 'dt_atendimento': AGORA + timedelta(hours=1) - timedelta(seconds=i % 600),
+        'id_user': 1 + i % 100, 'id_profissional': 1, 'id_servico': 1, 'status': 'agendado',
+        'valor_total': 50.0, 'taxa_cancelamento': 0.0} for i in range(n)])
+    db.session.commit()
+
+
+def conexao_por_mensagem(servidor, n):
+    """Linha de base: uma conexão SMTP nova para cada mensagem, em sequência"""
+    popular(n)
+    lembrete_services.agendar(AGORA)
+    inicio = time.perf_counter()
+    enviados = 0
+    while True:
+        lote = lembrete_services.reservar(200, AGORA)
+        if lote is None:
+            break
+        for lembrete in LembreteModel.query.filter_by(reservado_por=lote):
+            with smtplib.SMTP('127.0.0.1', servidor.porta) as smtp:
+                smtp.send_message(lembrete_services._mensagem('sgu@local', 'u@x', 'u', 'corte', 'prof', AGORA))
+            lembrete.status, lembrete.reservado_por = 'enviado', None
+            enviados += 1
+        db.session.commit()
+    return enviados / (time.perf_counter() - inicio)
+
+
+def com_pool(servidor, n, tamanho):
+    popular(n)
+    pool = app.extensions['sgu_smtp'] = PoolSMTP('127.0.0.1', servidor.porta, tamanho=tamanho)
+    metricas = lembrete_services.despachar(agora=AGORA)
+    pool.fechar()
+    assert metricas['enviados'] == n, metricas
+    return metricas['enviados_por_segundo'], pool.conexoes_abertas
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    latencia = float(sys.argv[2]) if len(sys.argv) > 2 else 0.005
+
+    with ServidorSMTP(porta=0, latencia=latencia) as servidor, app.app_context():
+        db.create_all()
+        db.session.add_all([ProfissionalModel(nome='prof'), ServicoModel(descricao='corte', valor=50.0,
+                                                                          horario_duraçao=30)])
+        db.session.execute(insert(UsuarioModel.__table__), [{
+            'nome': f'cliente {i}', 'email': f'c{i}@sgu', 'email_canonical': f'c{i}@sgu',
+            'telefone': '0', 'senha': 'x'} for i in range(1, 101)])
+        db.session.commit()
+
+        print(f'{n} lembretes, latência SMTP {latencia * 1000:.0f} ms/mensagem')
+        print(f'{"envio":<24}{"envios/s":>10}{"conexões":>10}')
+        antes = servidor.conexoes
+        print(f'{"conexão por mensagem":<24}{conexao_por_mensagem(servidor, n):>10.0f}{servidor.conexoes - antes:>10}')
+        for tamanho in (1, 4, 8):
+            vazao, conexoes = com_pool(servidor, n, tamanho)
+            print(f'{f"pool de {tamanho}":<24}{vazao:>10.0f}{conexoes:>10}')
+
+
+if __name__ == '__main__':
+    main()
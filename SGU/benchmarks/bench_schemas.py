@@ -0,0 +1,144 @@
+"""
+Microbenchmark de (de)serialização dos usuários e agendamentos
+
+Compara, para 1, 100 e 10k registros:
+- por requisição: ``UsuarioSchema()`` criado a cada requisição (como as views faziam)
+- cache: instâncias de módulo (``usuario_schema.usuario_schema`` etc.)
+- rápido: caminho sem marshmallow (``carregar_usuario``/``serializar_*``)
+
+load = N requisições POST com um usuário cada; dump = uma listagem com N
+registros. Antes de medir, confere que o caminho rápido produz o mesmo
+resultado (e os mesmos erros) que o schema.
+
+Uso: python benchmarks/bench_schemas.py [repeticoes]
+"""
+
+import gc
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DATABASE_URL', 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench.db'))
+
+from marshmallow import ValidationError  # noqa: E402
+
+from src import app  # noqa: E402
+from src.entities.usuario import Usuario  # noqa: E402
+from src.models.agendamento_model import AgendamentoModel  # noqa: E402
+from src.models.usuario_model import UsuarioModel  # noqa: E402
+from src.schemas import agendamento_schema, usuario_schema  # noqa: E402
+
+ESCALAS = (1, 100, 10_000)
+
+
+def usuarios(n):
+    modelos = [UsuarioModel(nome=f'usuario {i}', email=f'u{i}@sgu', telefone='61 90000-0000',
+                            senha='hash') for i in range(n)]
+    for i, u in enumerate(modelos, 1):
+        u.id = i
+    return modelos
+
+
+def agendamentos(n):
+    base = datetime(2030, 1, 2, 9)
+    modelos = [AgendamentoModel(base + timedelta(minutes=30 * i), 1, i % 10 + 1, 1, 50.0) for i in range(n)]
+    for i, a in enumerate(modelos, 1):
+        a.id = i
+        a.taxa_cancelamento = 0.0
+    return modelos
+
+
+def payloads(n):
+    return [{'nome': f'usuario {i}', 'email': f'u{i}@sgu', 'telefone': '0', 'senha': 'segredo'} for i in range(n)]
+
+
+def erro(funcao, dados):
+    try:
+        return funcao(dados)
+    except ValidationError as e:
+        return ('erro', e.messages)
+
+
+def conferir_equivalencia():
+    """O caminho rápido tem que devolver exatamente o que o schema devolve"""
+    amostra = usuarios(3)
+    assert usuario_schema.serializar_usuarios(amostra) == usuario_schema.usuarios_schema.dump(amostra)
+    entidades = [Usuario(u.nome, u.email, u.telefone, u.senha) for u in amostra]
+    assert usuario_schema.serializar_usuarios(entidades) == usuario_schema.usuarios_schema.dump(entidades)
+    lista = agendamentos(3)
+    assert agendamento_schema.serializar_agendamentos(lista) == agendamento_schema.agendamentos_schema.dump(lista)
+
+    casos = payloads(1) + [
+        {'nome': 'a', 'email': 'a@sgu', 'telefone': '0'},  # falta senha
+        {'nome': 'a', 'email': 'a@sgu', 'telefone': 0, 'senha': 's'},  # tipo errado
+        {'nome': 'a', 'email': 'a@sgu', 'telefone': '0', 'senha': 's', 'extra': 1},  # campo desconhecido
+        {'id': '7', 'nome': 'a', 'email': 'a@sgu', 'telefone': '0', 'senha': 's'},
+        ['lista'],
+        None,
+    ]
+    for dados in casos:
+        assert erro(usuario_schema.carregar_usuario, dados) == erro(usuario_schema.usuario_schema.load, dados), dados
+
+
+def cronometrar(funcao, repeticoes):
+    # como o timeit: GC desligado durante a medição
+    melhor = float('inf')
+    gc.disable()
+    try:
+        for _ in range(repeticoes):
+            inicio = time.perf_counter()
+            funcao()
+            melhor = min(melhor, time.perf_counter() - inicio)
+    finally:
+        gc.enable()
+    return melhor * 1000
+
+
+def cenarios(n):
+    lista_usuarios = usuarios(n)
+    lista_agendamentos = agendamentos(n)
+    dados = payloads(n)
+    return {
+        'load usuario': {
+            'por requisição': lambda: [usuario_schema.UsuarioSchema().load(d) for d in dados],
+            'cache': lambda: [usuario_schema.usuario_schema.load(d) for d in dados],
+            'rápido': lambda: [usuario_schema.carregar_usuario(d) for d in dados],
+        },
+        'dump usuario': {
+            'por requisição': lambda: usuario_schema.UsuarioSchema(many=True).dump(lista_usuarios),
+            'cache': lambda: usuario_schema.usuarios_schema.dump(lista_usuarios),
+            'rápido': lambda: usuario_schema.serializar_usuarios(lista_usuarios),
+        },
+        'dump agendamento': {
+            'por requisição': lambda: agendamento_schema.AgendamentoSchema(many=True).dump(lista_agendamentos),
+            'cache': lambda: agendamento_schema.agendamentos_schema.dump(lista_agendamentos),
+            'rápido': lambda: agendamento_schema.serializar_agendamentos(lista_agendamentos),
+        },
+    }
+
+
+def main():
+    repeticoes = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+    with app.app_context():
+        app.config['SCHEMA_FAST_PATH_ENABLED'] = True
+        conferir_equivalencia()
+
+        inicio = time.perf_counter()
+        for _ in range(1000):
+            usuario_schema.UsuarioSchema()
+        print(f'criar UsuarioSchema(): {(time.perf_counter() - inicio) * 1000:.1f} µs por instância\n')
+
+        print(f'{"operação":<18}{"N":>7}{"por requisição":>17}{"cache":>11}{"rápido":>11}   (ms, melhor de {repeticoes})')
+        for n in ESCALAS:
+            for operacao, variantes in cenarios(n).items():
+                tempos = {nome: cronometrar(funcao, repeticoes) for nome, funcao in variantes.items()}
+                print(f'{operacao:<18}{n:>7}{tempos["por requisição"]:>17.3f}'
+                      f'{tempos["cache"]:>11.3f}{tempos["rápido"]:>11.3f}')
+
+
+if __name__ == '__main__':
+    main()
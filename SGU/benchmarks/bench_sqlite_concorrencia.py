@@ -0,0 +1,110 @@
+"""
+Benchmark de escrita concorrente no SQLite (antes/depois do perfil de desempenho)
+
+Várias threads fazem o ciclo de agendamento (consulta de conflito + INSERT +
+COMMIT) no mesmo arquivo. Compara o engine padrão com o engine configurado
+com WAL/pragmas de ``connection.SQLITE_PRAGMAS``.
+
+Uso: python benchmarks/bench_sqlite_concorrencia.py [threads] [agendamentos_por_thread]
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DATABASE_URL', 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench.db'))
+
+from sqlalchemy import create_engine, insert, select, func  # noqa: E402
+from sqlalchemy.exc import OperationalError  # noqa: E402
+
+from src import db  # noqa: E402
+from src.models.agendamento_model import AgendamentoModel  # noqa: E402
+from src.models.profissional_model import ProfissionalModel  # noqa: E402
+from src.models.servicos_model import ServicoModel  # noqa: E402
+from src.models.usuario_model import UsuarioModel  # noqa: E402
+from src.utils.sqlite_tuning import configurar_sqlite  # noqa: E402
+import connection  # noqa: E402
+
+
+def preparar_banco(caminho, otimizado):
+    engine = create_engine(f'sqlite:///{caminho}')
+    if otimizado:
+        configurar_sqlite(engine, connection.SQLITE_PRAGMAS)
+
+    db.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(UsuarioModel.__table__), [
+            {'nome': 'bench', 'email': 'bench@sgu', 'telefone': '0', 'senha': 'x'}])
+        conn.execute(insert(ProfissionalModel.__table__), [
+            {'nome': f'prof {i}'} for i in range(8)])
+        conn.execute(insert(ServicoModel.__table__), [
+            {'descricao': 'corte', 'valor': 50.0, 'horario_duraçao': 30}])
+    return engine
+
+
+def agendar(engine, id_profissional, inicio, erros):
+    tabela = AgendamentoModel.__table__
+    fim = inicio + timedelta(minutes=30)
+    try:
+        with engine.begin() as conn:
+            conflito = conn.execute(
+                select(func.count()).select_from(tabela).where(
+                    tabela.c.id_profissional == id_profissional,
+                    tabela.c.status != 'cancelado',
+                    tabela.c.dt_atendimento < fim,
+                    tabela.c.dt_atendimento >= inicio)
+            ).scalar()
+            if conflito:
+                return False
+            conn.execute(insert(tabela), {
+                'dt_agendamento': datetime.utcnow(), 'dt_atendimento': inicio,
+                'id_user': 1, 'id_profissional': id_profissional, 'id_servico': 1,
+                'status': 'agendado', 'valor_total': 50.0, 'taxa_cancelamento': 0.0})
+        return True
+    except OperationalError:
+        erros.append(1)
+        return False
+
+
+def executar(otimizado, n_threads, por_thread):
+    pasta = tempfile.mkdtemp()
+    engine = preparar_banco(os.path.join(pasta, 'agenda.db'), otimizado)
+    erros = []
+    base = datetime.now().replace(minute=0, second=0, microsecond=0) + timedelta(days=1)
+
+    def trabalhador(indice):
+        for i in range(por_thread):
+            inicio = base + timedelta(minutes=30 * (indice * por_thread + i))
+            agendar(engine, indice % 8 + 1, inicio, erros)
+
+    threads = [threading.Thread(target=trabalhador, args=(t,)) for t in range(n_threads)]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    duracao = time.perf_counter() - t0
+
+    with engine.connect() as conn:
+        gravados = conn.execute(select(func.count()).select_from(AgendamentoModel.__table__)).scalar()
+    engine.dispose()
+    return gravados, len(erros), duracao
+
+
+def main():
+    n_threads = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    por_thread = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+    print(f'{n_threads} threads x {por_thread} agendamentos')
+    print(f'{"perfil":<12}{"gravados":>10}{"locked":>10}{"segundos":>10}{"agend/s":>10}')
+    for nome, otimizado in (('padrao', False), ('desempenho', True)):
+        gravados, erros, duracao = executar(otimizado, n_threads, por_thread)
+        print(f'{nome:<12}{gravados:>10}{erros:>10}{duracao:>10.2f}{gravados / duracao:>10.0f}')
+
+
+if __name__ == '__main__':
+    main()
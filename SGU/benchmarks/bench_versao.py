@@ -0,0 +1,94 @@
+"""
+Benchmark do controle otimista (ETag/If-Match) em edições concorrentes
+
+T threads (padrão 8) fazem, cada uma, E edições (padrão 50) do mesmo
+usuário: GET /usuario/1, soma 1 ao contador guardado no nome e PUT.
+- sem If-Match: leitura e escrita se intercalam entre threads e edições
+  somem (a última gravação sobrescreve as outras)
+- com If-Match: o PUT de quem leu uma versão velha recebe 412 e a thread
+  lê de novo e refaz a edição; nenhuma edição se perde
+
+Sem If-Match também pode haver conflito, respondido com 409: são PUTs
+simultâneos que leram a mesma versão dentro da própria requisição (o UPDATE
+com ``versao`` pega o segundo). 412 fica só para If-Match que não casou.
+
+Mostra edições perdidas, 409/412 recebidos e vazão (PUTs aceitos/s).
+
+Uso: python benchmarks/bench_versao.py [threads] [edições por thread]
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DATABASE_URL', 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench.db'))
+os.environ.setdefault('RATE_LIMIT_ENABLED', '0')
+os.environ.setdefault('SECRET_KEY', 'bench-versao')
+
+from src import app, carregar_web  # noqa: E402
+from src.utils import fixtures  # noqa: E402
+
+
+def entrar():
+    """Cabeçalho Authorization do usuário 1 (editar usuário exige o próprio login)"""
+    resposta = app.test_client().post('/login', json={'email': fixtures.email_cliente(1),
+                                                      'senha': fixtures.SENHA_PADRAO})
+    assert resposta.status_code == 200, resposta.json
+    return {'Authorization': f"Bearer {resposta.json['token']}"}
+
+
+def editar(if_match, edicoes, conflitos, autorizacao):
+    cliente = app.test_client()
+    feitas = 0
+    while feitas < edicoes:
+        leitura = cliente.get('/usuario/1')
+        contador = int(leitura.json['nome'].split()[-1])
+        cabecalhos = {**autorizacao, **({'If-Match': leitura.headers['ETag']} if if_match else {})}
+        resposta = cliente.put('/usuario/1', json={'nome': f'Contador {contador + 1}', 'telefone': '11900000000'},
+                               headers=cabecalhos)
+        if resposta.status_code in (409, 412):
+            assert resposta.headers.get('ETag'), 'conflito sem o ETag da versão atual'
+            conflitos.append(resposta.status_code)
+            continue
+        assert resposta.status_code == 200, resposta.json
+        feitas += 1
+
+
+def rodada(if_match, threads, edicoes, autorizacao):
+    cliente = app.test_client()
+    cliente.put('/usuario/1', json={'nome': 'Contador 0', 'telefone': '11900000000'}, headers=autorizacao)
+    conflitos = []
+    trabalhadores = [threading.Thread(target=editar, args=(if_match, edicoes, conflitos, autorizacao))
+                     for _ in range(threads)]
+    comeco = time.perf_counter()
+    for t in trabalhadores:
+        t.start()
+    for t in trabalhadores:
+        t.join()
+    segundos = time.perf_counter() - comeco
+    final = int(cliente.get('/usuario/1').json['nome'].split()[-1])
+    total = threads * edicoes
+    print(f"{'com If-Match' if if_match else 'sem If-Match':13} {total:6} {final:6} {total - final:8} "
+          f"{conflitos.count(409):6} {conflitos.count(412):6} {total / segundos:9.0f}")
+
+
+def main():
+    threads = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    edicoes = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+
+    carregar_web()
+    with app.app_context():
+        fixtures.gerar(clientes=1, agendamentos=0)
+
+    autorizacao = entrar()
+    print(f'{threads} threads x {edicoes} edições do mesmo usuário')
+    print(f"{'':13} {'PUTs':>6} {'final':>6} {'perdidas':>8} {'409':>6} {'412':>6} {'PUTs/s':>9}")
+    rodada(False, threads, edicoes, autorizacao)
+    rodada(True, threads, edicoes, autorizacao)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,428 @@
+"""
+Gerador de carga e replay de tráfego contra os endpoints reais
+
+Sem ``--url`` sobe a API neste processo (servidor HTTP do werkzeug com
+threads) sobre um SQLite temporário; com ``--url`` ataca uma instância já
+rodando. ``--semear`` popula o banco de DATABASE_URL com um conjunto
+realista (clientes, profissionais com popularidade desigual, serviços de
+durações diferentes e agendamentos passados e futuros); a semente fixa
+(``--semente``) gera sempre os mesmos ids. Com ``--snapshots dir`` (sqlite)
+a massa é gerada uma vez e as execuções seguintes só restauram o arquivo.
+
+Carga (padrão): ``--clientes`` clientes concorrentes, cada um com sua
+conexão keep-alive, sorteiam operações pelo ``--mix`` durante
+``--duracao`` segundos (pausa média ``--pensar`` entre requisições):
+
+    horarios   GET /profissional/<id>/horarios?data=
+    proximos   GET /servico/<id>/proximos-horarios
+    agendar    POST /agendamento
+    editar     PUT /agendamento/<id>        (agendamentos criados pelo cliente)
+    cancelar   DELETE /agendamento/<id>     (idem)
+    usuario_ler, usuario_criar, usuario_editar, usuario_excluir   /usuario e /usuario/<id>
+
+Editar e excluir usuário exigem o token do próprio usuário: antes da
+primeira edição/exclusão de um usuário que criou, o cliente faz POST /login
+(medido como operação ``login``). No replay, PUT/DELETE de /usuario gravados
+sem token recebem 401.
+
+Replay: ``--replay arquivo.jsonl`` reenvia um log gravado, uma requisição
+por linha: {"t": segundos desde o início, "metodo", "caminho", "corpo"}
+(também aceita method/path/body). ``--velocidade 2`` reproduz no dobro da
+velocidade, 0 sem pausas. Linhas sem método/caminho são ignoradas e
+contadas. ``--gravar arquivo.jsonl`` grava a carga gerada nesse formato
+(com status e ms).
+
+Saída: por operação, requisições, vazão, p50/p95/p99 (ms), 4xx (regra de
+negócio, ex.: horário ocupado) e erros (5xx, timeout, conexão).
+
+Exemplos:
+    python benchmarks/carga.py --semear --clientes 32 --duracao 30
+    python benchmarks/carga.py --semear --usuarios 100000 --agendamentos 1000000 --snapshots /tmp/snapshots
+    python benchmarks/carga.py --semear --duracao 20 --gravar /tmp/trafego.jsonl
+    python benchmarks/carga.py --semear --replay /tmp/trafego.jsonl --velocidade 0
+    DATABASE_URL=mysql+pymysql://... python benchmarks/carga.py --semear --url http://localhost:5000
+"""
+
+import argparse
+import http.client
+import json
+import logging
+import math
+import os
+import queue
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from urllib.parse import urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DATABASE_URL', 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'carga.db'))
+os.environ.setdefault('RATE_LIMIT_ENABLED', '0')
+os.environ.setdefault('SECRET_KEY', 'carga-local')  # tokens do POST /login no servidor local
+
+MIX_PADRAO = ('horarios=35,proximos=10,agendar=15,editar=5,cancelar=5,'
+              'usuario_ler=15,usuario_criar=5,usuario_editar=5,usuario_excluir=5')
+
+from src.utils import fixtures  # noqa: E402
+from src.utils.fixtures import HORAS, PROFISSIONAIS, SENHA_PADRAO, SERVICOS  # noqa: E402
+
+
+# ---------------------------------------------------------------- dados
+
+def semear(clientes: int, agendamentos: int, semente: int, snapshots: str = None) -> None:
+    """
+    Popula o banco de DATABASE_URL (``src.utils.fixtures``). Com ``snapshots``
+    restaura a massa já gerada antes (ou gera e salva); sem, só semeia banco
+    sem clientes.
+    """
+    from src import app
+
+    parametros = {'clientes': clientes, 'agendamentos': agendamentos, 'profissionais': PROFISSIONAIS,
+                  'semente': semente}
+    with app.app_context():
+        if snapshots:
+            print(json.dumps(fixtures.preparar(snapshots, **parametros), ensure_ascii=False), file=sys.stderr)
+        else:
+            fixtures.gerar(**parametros)
+
+
+# ---------------------------------------------------------------- cliente HTTP
+
+class ClienteHTTP:
+    """Conexão keep-alive de um cliente; refeita após erro de conexão"""
+
+    def __init__(self, url: str, timeout: float):
+        partes = urlsplit(url)
+        self.host, self.porta = partes.hostname, partes.port or (443 if partes.scheme == 'https' else 80)
+        self.classe = http.client.HTTPSConnection if partes.scheme == 'https' else http.client.HTTPConnection
+        self.timeout = timeout
+        self.conexao = None
+
+    def requisitar(self, metodo: str, caminho: str, corpo=None, cabecalhos=None):
+        """(status, resposta em JSON ou None, ms); status 0 = erro de conexão/timeout"""
+        dados = json.dumps(corpo).encode() if corpo is not None else None
+        cabecalhos = {**({'Content-Type': 'application/json'} if dados is not None else {}), **(cabecalhos or {})}
+        inicio = time.perf_counter()
+        try:
+            if self.conexao is None:
+                self.conexao = self.classe(self.host, self.porta, timeout=self.timeout)
+            self.conexao.request(metodo, caminho, body=dados, headers=cabecalhos)
+            resposta = self.conexao.getresponse()
+            conteudo = resposta.read()
+            status = resposta.status
+        except (OSError, http.client.HTTPException):
+            if self.conexao is not None:
+                self.conexao.close()
+            self.conexao = None
+            return 0, None, (time.perf_counter() - inicio) * 1000
+        ms = (time.perf_counter() - inicio) * 1000
+        try:
+            return status, json.loads(conteudo) if conteudo else None, ms
+        except ValueError:
+            return status, None, ms
+
+
+# ---------------------------------------------------------------- operações
+
+class Sessao:
+    """Estado de um cliente virtual: agendamentos e usuários que ele criou"""
+
+    def __init__(self, aleatorio: random.Random, clientes: int):
+        self.aleatorio = aleatorio
+        self.clientes = clientes
+        self.agendamentos = []
+        self.usuarios = []
+        self.emails = {}  # id -> email dos usuários criados
+        self.tokens = {}  # id -> token de acesso (após o login)
+        self.pesos = [1 / (i + 1) for i in range(PROFISSIONAIS)]
+
+    def profissional(self) -> int:
+        return self.aleatorio.choices(range(1, PROFISSIONAIS + 1), self.pesos)[0]
+
+    def dia_util(self) -> date:
+        dia = date.today() + timedelta(days=self.aleatorio.randrange(1, 15))
+        return dia + timedelta(days=7 - dia.weekday()) if dia.weekday() >= 5 else dia
+
+    def horario(self) -> str:
+        hora = self.aleatorio.choice(HORAS)
+        return datetime.combine(self.dia_util(), datetime.min.time()).replace(
+            hour=hora, minute=self.aleatorio.choice((0, 30))).isoformat()
+
+    def agendamento(self):
+        servico = self.aleatorio.randrange(len(SERVICOS))
+        return {'dt_atendimento': self.horario(), 'id_user': self.aleatorio.randrange(1, self.clientes + 1),
+                'id_profissional': self.profissional(), 'id_servico': servico + 1,
+                'valor_total': SERVICOS[servico][1]}
+
+    def proxima(self, operacao: str):
+        """
+        (método, caminho, corpo, ao_responder, cabeçalhos) da operação; None se não houver alvo
+        (ex.: nada a cancelar). Editar/excluir usuário ainda sem token devolve o POST /login dele.
+        """
+        a = self.aleatorio
+        if operacao == 'horarios':
+            return 'GET', f'/profissional/{self.profissional()}/horarios?data={self.dia_util()}', None, None, None
+        if operacao == 'proximos':
+            return 'GET', f'/servico/{a.randrange(1, len(SERVICOS) + 1)}/proximos-horarios', None, None, None
+        if operacao == 'agendar':
+            return 'POST', '/agendamento', self.agendamento(), self._guardar(self.agendamentos), None
+        if operacao == 'editar' and self.agendamentos:
+            return 'PUT', f'/agendamento/{a.choice(self.agendamentos)}', self.agendamento(), None, None
+        if operacao == 'cancelar' and self.agendamentos:
+            return ('DELETE', f'/agendamento/{self.agendamentos.pop(a.randrange(len(self.agendamentos)))}',
+                    None, None, None)
+        if operacao == 'usuario_ler':
+            return 'GET', f'/usuario/{a.randrange(1, self.clientes + 1)}', None, None, None
+        if operacao == 'usuario_criar':
+            n = a.getrandbits(48)
+            email = f'novo{n}@carga.sgu'
+            return 'POST', '/usuario', {'nome': f'Novo {n}', 'email': email, 'telefone': '11900000000',
+                                        'senha': SENHA_PADRAO}, self._guardar_usuario(email), None
+        if operacao in ('usuario_editar', 'usuario_excluir') and self.usuarios:
+            indice = a.randrange(len(self.usuarios))
+            id_usuario = self.usuarios[indice]
+            if id_usuario not in self.tokens:
+                return 'POST', '/login', {'email': self.emails[id_usuario], 'senha': SENHA_PADRAO}, \
+                    self._guardar_token(id_usuario), None
+            cabecalhos = {'Authorization': f'Bearer {self.tokens[id_usuario]}'}
+            if operacao == 'usuario_excluir':
+                self.usuarios.pop(indice)
+                return 'DELETE', f'/usuario/{id_usuario}', None, None, cabecalhos
+            n = a.getrandbits(48)
+            return 'PUT', f'/usuario/{id_usuario}', {'nome': f'Editado {n}', 'email': f'ed{n}@carga.sgu',
+                                                     'telefone': '11900000001'}, None, cabecalhos
+        return None
+
+    @staticmethod
+    def _guardar(lista):
+        def ao_responder(status, resposta):
+            if status == 201 and isinstance(resposta, dict) and 'id' in resposta:
+                lista.append(resposta['id'])
+        return ao_responder
+
+    def _guardar_usuario(self, email):
+        def ao_responder(status, resposta):
+            if status == 201 and isinstance(resposta, dict) and 'id' in resposta:
+                self.usuarios.append(resposta['id'])
+                self.emails[resposta['id']] = email
+        return ao_responder
+
+    def _guardar_token(self, id_usuario):
+        def ao_responder(status, resposta):
+            if status == 200 and isinstance(resposta, dict) and 'token' in resposta:
+                self.tokens[id_usuario] = resposta['token']
+        return ao_responder
+
+
+# ---------------------------------------------------------------- medição
+
+class Medicoes:
+    def __init__(self, gravar=None):
+        self.lock = threading.Lock()
+        self.latencias = defaultdict(list)
+        self.status = defaultdict(lambda: defaultdict(int))
+        self.gravar = gravar
+        self.inicio = time.perf_counter()
+
+    def registrar(self, operacao, metodo, caminho, corpo, status, ms):
+        with self.lock:
+            self.latencias[operacao].append(ms)
+            self.status[operacao][status] += 1
+            if self.gravar is not None:
+                self.gravar.write(json.dumps({
+                    't': round(time.perf_counter() - self.inicio, 4), 'metodo': metodo, 'caminho': caminho,
+                    'corpo': corpo, 'operacao': operacao, 'status': status, 'ms': round(ms, 2)},
+                    ensure_ascii=False) + '\n')
+
+    @staticmethod
+    def percentil(valores, p):
+        # nearest-rank
+        return valores[max(0, math.ceil(p / 100 * len(valores)) - 1)] if valores else 0.0
+
+    def relatorio(self, segundos: float):
+        linhas = {}
+        for operacao in sorted(self.latencias, key=lambda o: -len(self.latencias[o])):
+            valores = sorted(self.latencias[operacao])
+            status = self.status[operacao]
+            erros = sum(n for s, n in status.items() if s == 0 or s >= 500)
+            negocio = sum(n for s, n in status.items() if 400 <= s < 500)
+            linhas[operacao] = {
+                'requisicoes': len(valores), 'por_segundo': round(len(valores) / segundos, 1),
+                'p50_ms': round(self.percentil(valores, 50), 2), 'p95_ms': round(self.percentil(valores, 95), 2),
+                'p99_ms': round(self.percentil(valores, 99), 2),
+                'taxa_4xx': round(negocio / len(valores), 4), 'taxa_erro': round(erros / len(valores), 4),
+                'status': dict(sorted(status.items())),
+            }
+        return linhas
+
+
+def imprimir(relatorio, segundos, ignoradas=0):
+    total = sum(r['requisicoes'] for r in relatorio.values())
+    print(f'\n{total} requisições em {segundos:.1f} s ({total / segundos:.0f}/s)'
+          + (f'; {ignoradas} linhas ignoradas' if ignoradas else ''))
+    print(f'{"operação":<18}{"req":>7}{"req/s":>8}{"p50":>9}{"p95":>9}{"p99":>9}{"4xx":>8}{"erros":>8}')
+    for operacao, r in relatorio.items():
+        print(f'{operacao:<18}{r["requisicoes"]:>7}{r["por_segundo"]:>8.1f}{r["p50_ms"]:>9.1f}{r["p95_ms"]:>9.1f}'
+              f'{r["p99_ms"]:>9.1f}{r["taxa_4xx"]:>8.1%}{r["taxa_erro"]:>8.1%}')
+
+
+# ---------------------------------------------------------------- execução
+
+def _mix(texto: str):
+    pesos = {}
+    for parte in texto.split(','):
+        nome, _, peso = parte.partition('=')
+        if nome.strip():
+            pesos[nome.strip()] = float(peso or 1)
+    return list(pesos), list(pesos.values())
+
+
+def gerar_carga(args, url, medicoes):
+    operacoes, pesos = _mix(args.mix)
+    prazo = time.perf_counter() + args.duracao
+
+    def cliente(numero):
+        sessao = Sessao(random.Random(args.semente * 1000 + numero), args.usuarios)
+        http_cliente = ClienteHTTP(url, args.timeout)
+        while time.perf_counter() < prazo:
+            operacao = sessao.aleatorio.choices(operacoes, pesos)[0]
+            proxima = sessao.proxima(operacao)
+            if proxima is None:
+                continue
+            metodo, caminho, corpo, ao_responder, cabecalhos = proxima
+            if caminho == '/login':
+                operacao = 'login'
+            status, resposta, ms = http_cliente.requisitar(metodo, caminho, corpo, cabecalhos)
+            medicoes.registrar(operacao, metodo, caminho, corpo, status, ms)
+            if ao_responder:
+                ao_responder(status, resposta)
+            if args.pensar:
+                time.sleep(sessao.aleatorio.expovariate(1 / args.pensar))
+
+    _rodar(cliente, args.clientes)
+
+
+def _operacao_do_caminho(metodo, caminho):
+    # agrupa o replay por rota (ids viram <id>)
+    partes = ['<id>' if p.isdigit() else p for p in caminho.split('?')[0].split('/')]
+    return f'{metodo} {"/".join(partes)}'
+
+
+def replay(args, url, medicoes):
+    fila = queue.Queue()
+    ignoradas = 0
+    with open(args.replay, encoding='utf-8') as arquivo:
+        for linha in arquivo:
+            try:
+                registro = json.loads(linha)
+            except ValueError:
+                ignoradas += 1
+                continue
+            metodo = registro.get('metodo') or registro.get('method')
+            caminho = registro.get('caminho') or registro.get('path')
+            if not metodo or not caminho:
+                ignoradas += 1
+                continue
+            corpo = registro.get('corpo', registro.get('body'))
+            fila.put((float(registro.get('t', registro.get('ts', 0)) or 0), metodo.upper(), caminho, corpo))
+
+    comeco = time.perf_counter()
+
+    def cliente(_numero):
+        http_cliente = ClienteHTTP(url, args.timeout)
+        while True:
+            try:
+                t, metodo, caminho, corpo = fila.get_nowait()
+            except queue.Empty:
+                return
+            if args.velocidade:
+                # mantém o ritmo gravado (relativo ao início)
+                espera = comeco + t / args.velocidade - time.perf_counter()
+                if espera > 0:
+                    time.sleep(espera)
+            status, _, ms = http_cliente.requisitar(metodo, caminho, corpo)
+            medicoes.registrar(_operacao_do_caminho(metodo, caminho), metodo, caminho, corpo, status, ms)
+
+    _rodar(cliente, args.clientes)
+    return ignoradas
+
+
+def _rodar(funcao, clientes):
+    threads = [threading.Thread(target=funcao, args=(i,), daemon=True) for i in range(clientes)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def _servidor_local():
+    """Sobe a API neste processo em uma porta livre; devolve (url, servidor)"""
+    from werkzeug.serving import make_server
+
+    from src import carregar_web
+
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)  # sem uma linha de log por requisição
+    app = carregar_web()
+    servidor = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return f'http://127.0.0.1:{servidor.server_port}', servidor
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Gerador de carga e replay de tráfego da API SGU')
+    parser.add_argument('--url', help='API já rodando (padrão: sobe a API neste processo)')
+    parser.add_argument('--semear', action='store_true', help='popula o banco de DATABASE_URL antes')
+    parser.add_argument('--usuarios', type=int, default=2000, help='clientes semeados')
+    parser.add_argument('--agendamentos', type=int, default=20_000, help='agendamentos semeados')
+    parser.add_argument('--semente', type=int, default=42)
+    parser.add_argument('--snapshots', help='diretório de snapshots da massa (restaura em vez de gerar; só sqlite)')
+    parser.add_argument('--clientes', type=int, default=16, help='clientes concorrentes')
+    parser.add_argument('--duracao', type=float, default=30, help='segundos de carga')
+    parser.add_argument('--pensar', type=float, default=0.0, help='pausa média entre requisições (s)')
+    parser.add_argument('--mix', default=MIX_PADRAO, help='operacao=peso,...')
+    parser.add_argument('--timeout', type=float, default=30)
+    parser.add_argument('--replay', help='log .jsonl a reproduzir (em vez da carga sintética)')
+    parser.add_argument('--velocidade', type=float, default=1.0, help='replay: 1 = ritmo gravado, 0 = sem pausas')
+    parser.add_argument('--gravar', help='grava as requisições em .jsonl (formato do replay)')
+    parser.add_argument('--json', action='store_true', help='relatório em JSON')
+    args = parser.parse_args()
+
+    if args.semear:
+        semear(args.usuarios, args.agendamentos, args.semente, args.snapshots)
+
+    servidor = None
+    url = args.url
+    if url is None:
+        url, servidor = _servidor_local()
+
+    gravar = open(args.gravar, 'w', encoding='utf-8') if args.gravar else None
+    medicoes = Medicoes(gravar)
+    ignoradas = 0
+    try:
+        if args.replay:
+            ignoradas = replay(args, url, medicoes)
+        else:
+            gerar_carga(args, url, medicoes)
+    finally:
+        if gravar:
+            gravar.close()
+        if servidor:
+            servidor.shutdown()
+
+    segundos = time.perf_counter() - medicoes.inicio
+    relatorio = medicoes.relatorio(segundos)
+    if args.json:
+        print(json.dumps({'segundos': round(segundos, 2), 'ignoradas': ignoradas, 'operacoes': relatorio},
+                         ensure_ascii=False, indent=2))
+    else:
+        imprimir(relatorio, segundos, ignoradas)
+    erros = sum(r['taxa_erro'] * r['requisicoes'] for r in relatorio.values())
+    sys.exit(1 if erros else 0)
+
+
+if __name__ == '__main__':
+    main()
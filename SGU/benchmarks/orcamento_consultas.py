@@ -0,0 +1,163 @@
+"""
+Orçamento de consultas e latência dos services, em várias escalas
+
+Popula um SQLite temporário com N agendamentos (e N/10 usuários) para cada
+escala e executa cada função de ``agendamento_services`` e
+``usuario_services`` dentro de ``OrcamentoConsultas``. Mostra quantos
+comandos SQL e quantos ms cada uma gastou por escala e termina com código 1
+se algum orçamento for excedido ou se o número de consultas crescer com a
+escala (sinal de N+1).
+
+Uso: python benchmarks/orcamento_consultas.py [escala ...]   (padrão: 100 1000 10000)
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DATABASE_URL', 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench.db'))
+
+from sqlalchemy import insert  # noqa: E402
+
+from src import app, db  # noqa: E402
+from src.entities.usuario import Usuario  # noqa: E402
+from src.models.agendamento_model import AgendamentoModel  # noqa: E402
+from src.models.profissional_model import ProfissionalModel  # noqa: E402
+from src.models.servicos_model import ServicoModel  # noqa: E402
+from src.models.usuario_model import UsuarioModel  # noqa: E402
+from src.services import (  # noqa: E402
+    agendamento_services, busca_services, evento_services, horario_services, preco_services, usuario_services)
+from src.utils.orcamento_consultas import OrcamentoConsultas, OrcamentoExcedido  # noqa: E402
+
+PROFISSIONAIS = 20
+DIA = date.today() + timedelta(days=30)
+
+
+def novo_agendamento(hora, id_profissional=1):
+    return AgendamentoModel(
+        dt_atendimento=datetime.combine(DIA, datetime.min.time()).replace(hour=hora),
+        id_user=1, id_profissional=id_profissional, id_servico=1, valor_total=50.0)
+
+
+# nome: (função, máximo de consultas, máximo de ms ou None quando a resposta cresce com os dados)
+ORCAMENTOS = {
+    'listar_agendamento_id': (lambda: agendamento_services.listar_agendamento_id(1), 1, 20),
+    'listar_agendamentos_usuario': (lambda: agendamento_services.listar_agendamentos_usuario(2), 1, 20),
+    'listar_horarios_disponiveis': (
+        lambda: agendamento_services.listar_horarios_disponiveis(1, DIA.isoformat()), 2, 30),
+    'buscar_proximos_horarios': (lambda: agendamento_services.buscar_proximos_horarios(
+        1, datetime.combine(DIA, datetime.min.time()), datetime.combine(DIA + timedelta(days=7), datetime.min.time()), 10), 3, 100),
+    'cadastrar_agendamento': (lambda: agendamento_services.cadastrar_agendamento(novo_agendamento(17)), 6, 50),
+    'editar_agendamento': (lambda: agendamento_services.editar_agendamento(
+        1, novo_agendamento(18)), 6, 50),
+    'excluir_agendamento': (lambda: agendamento_services.excluir_agendamento(1), 5, 30),
+    'cancelar_agendamentos_profissional': (lambda: agendamento_services.cancelar_agendamentos_profissional(
+        2, datetime.combine(DIA, datetime.min.time()), datetime.combine(DIA + timedelta(days=1), datetime.min.time())), 4, 50),
+    'listar_eventos': (lambda: evento_services.listar_eventos(0, 100), 1, 20),
+    'listar_agendamentos': (agendamento_services.listar_agendamentos, 1, None),
+    'cadastrar_usuario': (lambda: usuario_services.cadastrar_usuario(
+        Usuario('novo', 'novo@sgu', '0', 'senha')), 1, 500),
+    'listar_usuario_email': (lambda: usuario_services.listar_usuario_email('U5@SGU'), 1, 20),
+    'listar_usuario_id': (lambda: usuario_services.listar_usuario_id(5), 1, 20),
+    'editar_usuario': (lambda: usuario_services.editar_usuario(5, Usuario('x', 'u5@sgu', '1', None)), 2, 30),
+    'listar_usuario': (usuario_services.listar_usuario, 1, None),
+    'buscar': (lambda: busca_services.buscar('usuario 1'), 2, 30),
+    'cotar': (lambda: preco_services.cotar([1, 2, 3], [
+        datetime.combine(DIA, datetime.min.time()) + timedelta(minutes=30 * i) for i in range(500)]), 0, 30),
+}
+
+
+def popular(n):
+    usuarios = max(10, n // 10)
+    db.create_all()
+    db.session.execute(insert(UsuarioModel.__table__), [{
+        'nome': f'usuario {i}', 'email': f'u{i}@sgu', 'email_canonical': f'u{i}@sgu',
+        'telefone': '0', 'senha': 'x'} for i in range(1, usuarios + 1)])
+    db.session.execute(insert(ProfissionalModel.__table__), [
+        {'nome': f'prof {i}'} for i in range(PROFISSIONAIS)])
+    db.session.execute(insert(ServicoModel.__table__), [
+        {'descricao': f'servico {i}', 'valor': 50.0, 'horario_duraçao': 30} for i in range(5)])
+    inicio = datetime.combine(DIA, datetime.min.time()) - timedelta(days=n // 40)
+    db.session.execute(insert(AgendamentoModel.__table__), [{
+        'dt_agendamento': datetime.utcnow(),
+        'dt_atendimento': inicio + timedelta(days=i // 40, hours=9 + i % 2 * 5),
+        'id_user': i % usuarios + 1, 'id_profissional': i // 2 % PROFISSIONAIS + 1,
+        'id_servico': i % 5 + 1, 'status': 'agendado', 'valor_total': 50.0,
+        'taxa_cancelamento': 0.0} for i in range(n)])
+    # agendamento 1 fica no futuro e editável
+    agendamento = db.session.get(AgendamentoModel, 1)
+    agendamento.dt_atendimento = datetime.combine(DIA, datetime.min.time()).replace(hour=15)
+    agendamento.id_profissional = 1
+    # agendamento 2 fica no mesmo dia com o profissional 2 (cancelamento em lote)
+    agendamento = db.session.get(AgendamentoModel, 2)
+    agendamento.dt_atendimento = datetime.combine(DIA, datetime.min.time()).replace(hour=10)
+    agendamento.id_profissional = 2
+    db.session.commit()
+
+
+def medir(n):
+    """Roda em um processo filho, com um banco novo para a escala n"""
+    with app.app_context():
+        popular(n)
+        horario_services.mascara_do_dia(1, DIA)  # cache de expediente aquecido
+        preco_services.cotar([1], [datetime.combine(DIA, datetime.min.time())])  # tabela de preços aquecida
+
+    resultados = {}
+    for nome, (funcao, max_consultas, max_ms) in ORCAMENTOS.items():
+        # app context novo = identity map vazio, como em uma requisição
+        with app.app_context():
+            orcamento = OrcamentoConsultas(db.engine, max_consultas, max_ms, nome)
+            try:
+                with orcamento:
+                    funcao()
+                erro = None
+            except OrcamentoExcedido as e:
+                erro = str(e)
+            resultados[nome] = (orcamento.consultas, orcamento.ms, erro)
+    return resultados
+
+
+def medir_em_processo(n):
+    env = dict(os.environ, DATABASE_URL='sqlite:///' + os.path.join(tempfile.mkdtemp(), f'escala_{n}.db'))
+    saida = subprocess.run([sys.executable, __file__, '--filho', str(n)],
+                           env=env, capture_output=True, text=True, check=True).stdout
+    return json.loads(saida.strip().splitlines()[-1])
+
+
+def main():
+    if sys.argv[1:2] == ['--filho']:
+        print(json.dumps(medir(int(sys.argv[2]))))
+        return
+
+    escalas = [int(x) for x in sys.argv[1:]] or [100, 1000, 10000]
+    por_escala = {n: medir_em_processo(n) for n in escalas}
+
+    falhas = []
+    print(f'{"função":<38}' + ''.join(f'{f"N={n}":>18}' for n in escalas))
+    for nome in ORCAMENTOS:
+        linha = f'{nome:<38}'
+        for n in escalas:
+            consultas, ms, erro = por_escala[n][nome]
+            linha += f'{f"{consultas}q {ms:7.1f}ms":>18}'
+            if erro:
+                falhas.append(f'N={n} {erro}')
+        print(linha)
+
+        contagens = [por_escala[n][nome][0] for n in escalas]
+        if len(set(contagens)) > 1:
+            falhas.append(f'{nome}: número de consultas cresce com a escala {contagens}')
+
+    if falhas:
+        print('\nOrçamentos excedidos:')
+        for falha in falhas:
+            print(f'- {falha}')
+        sys.exit(1)
+    print('\nTodos os orçamentos respeitados.')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+"""
+Servidor SMTP local para testes (substitui o servidor real dos lembretes)
+
+Aceita qualquer remetente e destinatário e descarta as mensagens, contando
+quantas recebeu. Pode simular latência por mensagem e recusar uma fração
+delas (451, falha temporária) para exercitar o backoff.
+
+Uso: python benchmarks/smtp_local.py [--porta 1025] [--latencia 0.01] [--falhas 0.1]
+e LEMBRETE_SMTP_HOST=localhost LEMBRETE_SMTP_PORT=1025 no worker.
+Em scripts: ``with ServidorSMTP(porta=0) as servidor: ... servidor.porta``.
+"""
+
+import argparse
+import random
+import socketserver
+import threading
+import time
+
+
+class _Sessao(socketserver.StreamRequestHandler):
+    def _responder(self, linha: str) -> None:
+        self.wfile.write(linha.encode() + b'\r\n')
+
+    def handle(self):
+        servidor = self.server.dono
+        with servidor.lock:
+            servidor.conexoes += 1
+        self._responder('220 smtp-local pronto')
+        while True:
+            linha = self.rfile.readline()
+            if not linha:
+                return
+            comando = linha.decode(errors='replace').strip().upper()
+            if comando.startswith('EHLO'):
+                self.wfile.write(b'250-smtp-local\r\n250-8BITMIME\r\n250 SMTPUTF8\r\n')
+            elif comando.startswith(('HELO', 'MAIL', 'RCPT', 'RSET', 'NOOP')):
+                self._responder('250 OK')
+            elif comando == 'DATA':
+                self._responder('354 termine com <CRLF>.<CRLF>')
+                while self.rfile.readline() not in (b'.\r\n', b'.\n', b''):
+                    pass
+                if servidor.latencia:
+                    time.sleep(servidor.latencia)
+                if random.random() < servidor.falhas:
+                    with servidor.lock:
+                        servidor.recusadas += 1
+                    self._responder('451 falha temporária (simulada)')
+                else:
+                    with servidor.lock:
+                        servidor.mensagens += 1
+                    self._responder('250 OK: mensagem aceita')
+            elif comando == 'QUIT':
+                self._responder('221 até logo')
+                return
+            else:
+                self._responder('502 comando não implementado')
+
+
+class _Servidor(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class ServidorSMTP:
+    def __init__(self, host: str = '127.0.0.1', porta: int = 1025, latencia: float = 0.0, falhas: float = 0.0):
+        self.latencia = latencia
+        self.falhas = falhas
+        self.lock = threading.Lock()
+        self.mensagens = self.recusadas = self.conexoes = 0
+        self._servidor = _Servidor((host, porta), _Sessao)
+        self._servidor.dono = self
+        self.porta = self._servidor.server_address[1]
+
+    def __enter__(self):
+        threading.Thread(target=self._servidor.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *_):
+        self._servidor.shutdown()
+        self._servidor.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--porta', type=int, default=1025)
+    parser.add_argument('--latencia', type=float, default=0.0, help='segundos por mensagem')
+    parser.add_argument('--falhas', type=float, default=0.0, help='fração recusada com 451')
+    args = parser.parse_args()
+    with ServidorSMTP(porta=args.porta, latencia=args.latencia, falhas=args.falhas) as servidor:
+        print(f'SMTP local em 127.0.0.1:{servidor.porta} (Ctrl+C para sair)')
+        try:
+            while True:
+                time.sleep(5)
+                print(f'{servidor.mensagens} aceitas, {servidor.recusadas} recusadas, {servidor.conexoes} conexões')
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == '__main__':
+    main()
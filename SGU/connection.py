@@ -6,9 +6,83 @@ import os
 load_dotenv()
 
 # config sqlite
-SQLALCHEMY_DATABASE_URI = 'sqlite:///database.db'
+SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL', 'sqlite:///database.db')
 SECRET_KEY = os.getenv('SECRET_KEY')
 
+# perfil de desempenho do sqlite (WAL + pragmas aplicados a cada conexão nova)
+# desligue com SQLITE_PERFORMANCE_MODE=0 para voltar ao comportamento padrão
+SQLITE_PERFORMANCE_MODE = os.getenv('SQLITE_PERFORMANCE_MODE', '1') == '1'
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', '5000'))
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',  # leitores não bloqueiam o escritor
+    'synchronous': 'NORMAL',  # seguro em WAL, evita fsync a cada commit
+    'busy_timeout': SQLITE_BUSY_TIMEOUT_MS,  # espera o lock em vez de falhar na hora
+    'cache_size': -64000,  # ~64 MB de cache de páginas (valor negativo = KiB)
+    'mmap_size': 268435456,  # 256 MB lidos via mmap
+    'temp_store': 'MEMORY',
+}
+
+# rate limiting e controle de admissão dos endpoints de escrita
+RATE_LIMIT_ENABLED = os.getenv('RATE_LIMIT_ENABLED', '1') == '1'
+RATE_LIMIT_TRUST_PROXY = os.getenv('RATE_LIMIT_TRUST_PROXY', '0') == '1'
+RATE_LIMIT_REDIS_URL = os.getenv('RATE_LIMIT_REDIS_URL')  # opcional: buckets compartilhados
+
+# Idempotency-Key: por quanto tempo a resposta fica guardada e intervalo da limpeza
+IDEMPOTENCY_TTL_SECONDS = int(os.getenv('IDEMPOTENCY_TTL_SECONDS', str(24 * 3600)))
+IDEMPOTENCY_CLEANUP_INTERVAL = int(os.getenv('IDEMPOTENCY_CLEANUP_INTERVAL', '300'))
+# reserva "em processamento" sem resposta há mais que isso é assumida pela retentativa
+IDEMPOTENCY_LEASE_SECONDS = int(os.getenv('IDEMPOTENCY_LEASE_SECONDS', '60'))
+
+# rotas /async/* com SQLAlchemy asyncio (aiosqlite para sqlite, asyncmy para mysql)
+ASYNC_API_ENABLED = os.getenv('ASYNC_API_ENABLED', '1') == '1'
+ASYNC_DB_POOL_SIZE = int(os.getenv('ASYNC_DB_POOL_SIZE', '10'))
+
+# tokens de acesso (POST /login): validade e intervalo de recarga da lista de revogados
+AUTH_TOKEN_TTL_SECONDS = int(os.getenv('AUTH_TOKEN_TTL_SECONDS', str(8 * 3600)))
+AUTH_REVOCATION_REFRESH_SECONDS = int(os.getenv('AUTH_REVOCATION_REFRESH_SECONDS', '30'))
+
+# serialização sem marshmallow nos endpoints mais chamados (mesmo resultado; 0 usa sempre o schema)
+SCHEMA_FAST_PATH_ENABLED = os.getenv('SCHEMA_FAST_PATH_ENABLED', '1') == '1'
+
+# outbox de eventos (/events): long-poll máximo e intervalo de consulta ao banco durante a espera
+EVENTOS_ESPERA_MAXIMA = float(os.getenv('EVENTOS_ESPERA_MAXIMA', '30'))
+EVENTOS_INTERVALO_CONSULTA = float(os.getenv('EVENTOS_INTERVALO_CONSULTA', '1'))
+# lacuna de ids mais nova que isso segura o cursor (commit fora de ordem no MySQL); mais velha é rollback
+EVENTOS_ESPERA_LACUNA = float(os.getenv('EVENTOS_ESPERA_LACUNA', '5'))
+
+# relatórios (/relatorios/*): validade máxima do cache por período (também invalidado por eventos novos)
+ANALYTICS_CACHE_TTL = int(os.getenv('ANALYTICS_CACHE_TTL', '300'))
+
+# calendários .ics (/calendario/<token>.ics): releitura do outbox para ver escritas de outros processos,
+# feeds em cache por filial (LRU) e quantos dias de agendamentos passados entram no feed
+ICS_REVALIDACAO_SEGUNDOS = int(os.getenv('ICS_REVALIDACAO_SEGUNDOS', '30'))
+ICS_MAX_FEEDS = int(os.getenv('ICS_MAX_FEEDS', '1000'))
+ICS_DIAS_PASSADOS = int(os.getenv('ICS_DIAS_PASSADOS', '30'))
+
+# lembretes de atendimento (flask --app migracoes lembretes): servidor SMTP, pool de conexões e fila
+LEMBRETE_SMTP_HOST = os.getenv('LEMBRETE_SMTP_HOST', 'localhost')
+LEMBRETE_SMTP_PORT = int(os.getenv('LEMBRETE_SMTP_PORT', '25'))
+LEMBRETE_SMTP_USUARIO = os.getenv('LEMBRETE_SMTP_USUARIO')
+LEMBRETE_SMTP_SENHA = os.getenv('LEMBRETE_SMTP_SENHA')
+LEMBRETE_SMTP_STARTTLS = os.getenv('LEMBRETE_SMTP_STARTTLS', '0') == '1'
+LEMBRETE_SMTP_POOL = int(os.getenv('LEMBRETE_SMTP_POOL', '4'))  # conexões abertas (e envios em paralelo)
+LEMBRETE_REMETENTE = os.getenv('LEMBRETE_REMETENTE', 'SGU <nao-responda@sgu.local>')
+LEMBRETE_LOTE = int(os.getenv('LEMBRETE_LOTE', '200'))  # lembretes reservados por vez
+LEMBRETE_LEASE_SEGUNDOS = int(os.getenv('LEMBRETE_LEASE_SEGUNDOS', '300'))  # reserva de um lote por um worker
+LEMBRETE_MAX_TENTATIVAS = int(os.getenv('LEMBRETE_MAX_TENTATIVAS', '5'))
+LEMBRETE_BACKOFF_SEGUNDOS = int(os.getenv('LEMBRETE_BACKOFF_SEGUNDOS', '60'))  # dobra a cada tentativa
+LEMBRETE_HORIZONTE_SEGUNDOS = int(os.getenv('LEMBRETE_HORIZONTE_SEGUNDOS', '900'))  # lembretes criados com antecedência
+LEMBRETE_ATRASO_MAXIMO_SEGUNDOS = int(os.getenv('LEMBRETE_ATRASO_MAXIMO_SEGUNDOS', '3600'))
+
+# várias filiais no mesmo processo: um banco por filial, escolhido pelo cabeçalho X-Filial
+# FILIAL_DATABASE_URL com {filial}, ex.: sqlite:///filial_{filial}.db ou mysql+pymysql://u:s@host/sgu_{filial}
+# sem FILIAL_DATABASE_URL (padrão) o cabeçalho é ignorado e tudo usa SQLALCHEMY_DATABASE_URI
+FILIAL_DATABASE_URL = os.getenv('FILIAL_DATABASE_URL')
+FILIAIS = [f.strip().lower() for f in os.getenv('FILIAIS', '').split(',') if f.strip()]  # filiais atendidas (obrigatório)
+FILIAL_HEADER = os.getenv('FILIAL_HEADER', 'X-Filial')
+FILIAL_MAX_ENGINES = int(os.getenv('FILIAL_MAX_ENGINES', '8'))  # engines abertos ao mesmo tempo (LRU)
+FILIAL_POOL_SIZE = int(os.getenv('FILIAL_POOL_SIZE', '5'))  # conexões por engine de filial (exceto sqlite)
+
 # teste de conexao
 
 try:
@@ -18,4 +92,4 @@ try:
 except Exception as e :
     print(f'Falha ao conectar com o banco: {e}')
 
-Base = declarative_base()
\ No newline at end of file
+Base = declarative_base()
@@ -0,0 +1,5 @@
+# ponto de entrada leve para as migrações (sem a camada web):
+#   FLASK_APP=migracoes.py flask db upgrade
+from src import app, carregar_migracoes
+
+carregar_migracoes()
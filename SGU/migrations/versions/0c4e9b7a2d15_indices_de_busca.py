@@ -0,0 +1,53 @@
+"""indices de busca
+
+Revision ID: 0c4e9b7a2d15
+Revises: 8586253670e0
+Create Date: 2026-10-19 03:12:40.118204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from src.models.busca_model import DDL_MYSQL, DDL_SQLITE
+
+
+# revision identifiers, used by Alembic.
+revision = '0c4e9b7a2d15'
+down_revision = '8586253670e0'
+branch_labels = None
+depends_on = None
+
+# Obs.: no SQLite, batch_alter_table em tb_usuario/tb_servico recria a tabela e
+# perde os triggers de busca — migrações futuras que fizerem isso devem recriá-los.
+
+
+def upgrade():
+    dialeto = op.get_bind().dialect.name
+    if dialeto == 'sqlite':
+        for comandos in DDL_SQLITE.values():
+            for comando in comandos:
+                op.execute(comando)
+        # carga inicial dos registros que já existem (daqui em diante, os triggers mantêm)
+        op.execute(
+            "INSERT INTO tb_usuario_busca(rowid, nome, email, telefone, telefone_digitos) "
+            "SELECT id, nome, email, telefone, "
+            "replace(replace(replace(replace(replace(replace(telefone, ' ', ''), '-', ''), "
+            "'(', ''), ')', ''), '.', ''), '+', '') FROM tb_usuario"
+        )
+        op.execute("INSERT INTO tb_servico_busca(rowid, descricao) SELECT id, descricao FROM tb_servico")
+    elif dialeto == 'mysql':
+        for comandos in DDL_MYSQL.values():
+            for comando in comandos:
+                op.execute(comando)
+
+
+def downgrade():
+    dialeto = op.get_bind().dialect.name
+    if dialeto == 'sqlite':
+        for tabela in ('tb_usuario', 'tb_servico'):
+            for sufixo in ('ai', 'au', 'ad'):
+                op.execute(f'DROP TRIGGER IF EXISTS {tabela}_busca_{sufixo}')
+            op.execute(f'DROP TABLE IF EXISTS {tabela}_busca')
+    elif dialeto == 'mysql':
+        op.drop_index('ft_tb_usuario_busca', table_name='tb_usuario')
+        op.drop_index('ft_tb_servico_busca', table_name='tb_servico')
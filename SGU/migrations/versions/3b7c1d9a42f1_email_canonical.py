@@ -0,0 +1,44 @@
+"""email canonical indexado em tb_usuario
+
+Revision ID: 3b7c1d9a42f1
+Revises: e90ab45037da
+Create Date: 2026-10-19 09:12:03.114027
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3b7c1d9a42f1'
+down_revision = 'e90ab45037da'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('tb_usuario', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('email_canonical', sa.String(length=120), nullable=True))
+
+    # backfill: mesma normalização de UsuarioModel.normalizar_email
+    op.execute("UPDATE tb_usuario SET email_canonical = lower(trim(email))")
+
+    # emails que só diferem em maiúsculas/espaços impedem o índice único
+    conn = op.get_bind()
+    duplicados = conn.execute(sa.text(
+        "SELECT email_canonical, count(*) FROM tb_usuario "
+        "GROUP BY email_canonical HAVING count(*) > 1"
+    )).fetchall()
+    if duplicados:
+        lista = ', '.join(f'{email} ({qtd})' for email, qtd in duplicados)
+        raise RuntimeError(f'Emails duplicados por maiúsculas/minúsculas, resolva antes de migrar: {lista}')
+
+    with op.batch_alter_table('tb_usuario', schema=None) as batch_op:
+        batch_op.alter_column('email_canonical', existing_type=sa.String(length=120), nullable=False)
+        batch_op.create_index(batch_op.f('ix_tb_usuario_email_canonical'), ['email_canonical'], unique=True)
+
+
+def downgrade():
+    with op.batch_alter_table('tb_usuario', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_tb_usuario_email_canonical'))
+        batch_op.drop_column('email_canonical')
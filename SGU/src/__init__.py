@@ -1,35 +1,150 @@
-from flask import (  # app Flask e objeto request para inspecionar endpoint atual
-    Flask,
-    request,
-)
-from flask_cors import CORS  # habilita CORS (cross-origin requests)
-from flask_marshmallow import Marshmallow  # serialização/validação de schemas
-from flask_migrate import Migrate  # migrações do banco (Alembic)
-from flask_restful import Api  # estrutura para criar APIs REST
+"""
+Pacote da aplicação SGU
+
+Importar ``src`` (ou ``src.models`` / ``src.services``) carrega só o Flask, a
+configuração, o SQLAlchemy e os modelos: é o que jobs de linha de comando e
+scripts precisam. As camadas mais pesadas são montadas sob demanda:
+
+- ``carregar_web()``: Marshmallow, Flask-RESTful, CORS, rate limit e views
+  (chamado pelo app.py; também ao acessar ``src.api`` ou ``src.ma``)
+- ``carregar_migracoes()``: Flask-Migrate/Alembic (chamado pelo migracoes.py;
+  também ao acessar ``src.migrate``)
+"""
+
+import threading
+
+import click
+from flask import Flask  # app Flask
 from flask_sqlalchemy import SQLAlchemy  # ORM para modelagem do banco
 
 app = Flask(__name__)  # instância da aplicação Flask
 app.config.from_object('connection')
 
-# configuração das extensões vinculadas à app
-db = SQLAlchemy(app)  # objeto do SQLAlchemy para manipular o banco
-migrate = Migrate(app, db)  # gerenciador de migrações (alinha o ORM com o banco)
-ma = Marshmallow(app)  # Marshmallow para (de)serialização e validação
-api = Api(app)  # wrapper para rotas RESTful
-CORS(app)  # aplica CORS com configuração padrão
+# objeto do SQLAlchemy para manipular o banco; a sessão usa o banco da filial da requisição (src.utils.filiais)
+from .utils.filiais import SessaoFilial
 
+db = SQLAlchemy(app, session_options={'class_': SessaoFilial})
 
-@app.before_request
-def create_tables():
-    # cria todas as tabelas definidas pelos modelos apenas quando o endpoint for "index"
-    # OBS: chamar db.create_all() em requisições pode ser útil em desenvolvimento,
-    # mas não é recomendado em produção — prefira migrações.
-    if request.endpoint == "index":
-        db.create_all()
+# perfil de desempenho do SQLite (WAL, pragmas e busy timeout) — ignorado em outros bancos
+from .utils.sqlite_tuning import configurar_sqlite_app
 
+configurar_sqlite_app(app, db)
 
 # importa os módulos de modelos
-from .models import agendamento_model, profissional_model, servicos_model, usuario_model
+from .models import (
+    agendamento_model,
+    busca_model,
+    calendario_link_model,
+    evento_model,
+    horario_trabalho_model,
+    idempotencia_model,
+    lembrete_model,
+    lista_espera_model,
+    profissional_model,
+    regra_preco_model,
+    servicos_model,
+    token_revogado_model,
+    usuario_model,
+)
+
+_carga_lock = threading.RLock()
+
+
+def carregar_migracoes():
+    """Registra o Flask-Migrate (comandos ``flask db``); idempotente"""
+    global migrate
+    with _carga_lock:
+        if 'migrate' not in globals():
+            from flask_migrate import Migrate  # migrações do banco (Alembic)
+
+            # gerenciador de migrações (alinha o ORM com o banco); os índices de busca ficam de fora do autogenerate
+            migrate = Migrate(app, db, include_object=busca_model.incluir_no_autogenerate)
+    return migrate
+
+
+def _carregar_marshmallow():
+    global ma
+    with _carga_lock:
+        if 'ma' not in globals():
+            from flask_marshmallow import Marshmallow  # serialização/validação de schemas
+
+            ma = Marshmallow(app)  # Marshmallow para (de)serialização e validação
+    return ma
+
+
+def carregar_web():
+    """Monta a API (extensões web, rate limit e rotas) sobre o app; idempotente"""
+    global api
+    with _carga_lock:
+        if 'api' in globals():
+            return app
+
+        from flask import request  # objeto request para inspecionar endpoint atual
+        from flask_cors import CORS  # habilita CORS (cross-origin requests)
+        from flask_restful import Api  # estrutura para criar APIs REST
+
+        _carregar_marshmallow()
+        api = Api(app)  # wrapper para rotas RESTful
+        CORS(app)  # aplica CORS com configuração padrão
+
+        # filial da requisição (cabeçalho X-Filial) — antes de qualquer hook que use o banco
+        from .utils.filiais import configurar_filiais
+
+        configurar_filiais(app)
+
+        # backend do rate limiting (memória do processo ou Redis compartilhado)
+        from .utils.rate_limit import configurar_rate_limit
+
+        configurar_rate_limit(app)
+
+        @app.before_request
+        def create_tables():
+            # cria todas as tabelas definidas pelos modelos apenas quando o endpoint for "index"
+            # OBS: chamar db.create_all() em requisições pode ser útil em desenvolvimento,
+            # mas não é recomendado em produção — prefira migrações.
+            if request.endpoint == "index":
+                db.create_all()
+
+        # views registram as rotas na API
+        from .views import (agendamento_view, busca_view, calendario_view, evento_view, horario_view,
+                            lista_espera_view, login_view, preco_view, relatorio_view, usuario_view)
+
+        # variante assíncrona das consultas de leitura (requer aiosqlite/asyncmy e greenlet)
+        if app.config.get('ASYNC_API_ENABLED'):
+            from .views import async_view
+
+    return app
+
+
+_CARREGADORES = {
+    'api': carregar_web,
+    'ma': _carregar_marshmallow,
+    'migrate': carregar_migracoes,
+}
+
+
+def __getattr__(nome):
+    # ``from src import api`` / ``ma`` / ``migrate`` monta a camada correspondente na primeira vez
+    if nome in _CARREGADORES:
+        _CARREGADORES[nome]()
+        return globals()[nome]
+    raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
+
+
+class _ComandosMigracao(click.Group):
+    """Grupo ``flask db`` que só importa o Flask-Migrate/Alembic quando é usado"""
+
+    def make_context(self, info_name, args, parent=None, **extra):
+        # repassa para o grupo real do Flask-Migrate (opções, subcomandos e ajuda)
+        carregar_migracoes()
+        from flask_migrate.cli import db as grupo
+
+        return grupo.make_context(info_name, args, parent=parent, **extra)
+
+
+app.cli.add_command(_ComandosMigracao('db', help='Migrações do banco (Flask-Migrate).'))
+
+# demais comandos (auditoria etc.)
+from .comandos import registrar as _registrar_comandos
 
-# TODO - Importar as views para a API para as rotas
-from .views import usuario_view
+_registrar_comandos(app)
@@ -0,0 +1,227 @@
+"""
+Comandos de linha de comando da aplicação (``flask --app migracoes <comando>``)
+
+Os services são importados dentro de cada comando: registrar os comandos
+não carrega nada além do click.
+"""
+
+import csv
+import json
+import sys
+import time
+
+import click
+
+
+@click.command('auditar-agenda')
+@click.option('--profissional', type=int, help='Só este profissional.')
+@click.option('--inicio', type=click.DateTime(['%Y-%m-%d']), help='Atendimentos a partir desta data.')
+@click.option('--fim', type=click.DateTime(['%Y-%m-%d']), help='Atendimentos antes desta data.')
+@click.option('--filial', help='Banco da filial (FILIAIS); padrão: SQLALCHEMY_DATABASE_URI.')
+@click.option('--formato', type=click.Choice(['texto', 'json', 'csv']), default='texto')
+@click.option('--saida', type=click.File('w'), default='-', help='Arquivo do relatório (padrão: stdout).')
+@click.option('--lote', type=int, default=10_000, show_default=True, help='Linhas lidas por vez.')
+def auditar_agenda(profissional, inicio, fim, filial, formato, saida, lote):
+    """
+    Procura agendamentos ativos sobrepostos do mesmo profissional.
+    Termina com código 1 se encontrar algum par.
+    """
+    from src.services.auditoria_services import Auditoria, dados_par
+    from src import app
+    from src.utils.filiais import filial_valida, usar_filial
+
+    if filial is not None and not filial_valida(app, filial):
+        raise click.BadParameter(f'filial desconhecida: {filial}', param_hint='--filial')
+
+    with usar_filial(filial):
+        auditoria = Auditoria(inicio, fim, profissional, lote)
+
+        if formato == 'csv':
+            escritor = None
+            for par in auditoria:
+                dados = dados_par(par)
+                if escritor is None:
+                    escritor = csv.DictWriter(saida, fieldnames=list(dados))
+                    escritor.writeheader()
+                escritor.writerow(dados)
+            resumo = auditoria.resumo()
+            click.echo(json.dumps(resumo, ensure_ascii=False), err=True)
+        elif formato == 'json':
+            pares = [dados_par(par) for par in auditoria]
+            resumo = auditoria.resumo()
+            json.dump({'resumo': resumo, 'sobreposicoes': pares}, saida, ensure_ascii=False, indent=2)
+            saida.write('\n')
+        else:
+            for par in auditoria:
+                d = dados_par(par)
+                saida.write(f"profissional {d['id_profissional']}: agendamento {d['id_agendamento_a']} "
+                            f"({d['inicio_a']} - {d['fim_a']}) x {d['id_agendamento_b']} "
+                            f"({d['inicio_b']} - {d['fim_b']}): {d['minutos_sobrepostos']:g} min\n")
+            resumo = auditoria.resumo()
+            saida.write(f"\n{resumo['agendamentos_lidos']} agendamentos lidos em {resumo['segundos']} s; "
+                        f"{resumo['pares_sobrepostos']} pares sobrepostos, "
+                        f"{resumo['agendamentos_envolvidos']} agendamentos envolvidos, "
+                        f"profissionais afetados: {resumo['profissionais_afetados'] or '-'}\n")
+            if resumo['servicos_com_duracao_padrao']:
+                saida.write(f"serviços sem duração cadastrada (usando a duração padrão): "
+                            f"{resumo['servicos_com_duracao_padrao']}\n")
+
+    if resumo['pares_sobrepostos']:
+        sys.exit(1)
+
+
+@click.command('lembretes')
+@click.option('--filial', help='Banco da filial (FILIAIS); padrão: SQLALCHEMY_DATABASE_URI.')
+@click.option('--lote', type=int, help='Lembretes reservados por vez (padrão: LEMBRETE_LOTE).')
+@click.option('--intervalo', type=float, default=30, show_default=True, help='Segundos entre ciclos.')
+@click.option('--uma-vez', is_flag=True, help='Roda um ciclo e sai.')
+def lembretes(filial, lote, intervalo, uma_vez):
+    """
+    Envia os lembretes de 24h e 1h antes dos atendimentos. Vários workers
+    podem rodar ao mesmo tempo: cada lote é reservado por um só.
+    """
+    from src import app
+    from src.services import lembrete_services
+    from src.utils.filiais import filial_valida, usar_filial
+    from src.utils.smtp import pool_smtp
+
+    if filial is not None and not filial_valida(app, filial):
+        raise click.BadParameter(f'filial desconhecida: {filial}', param_hint='--filial')
+
+    totais = {'enviados': 0, 'falhas': 0, 'segundos': 0.0}
+    try:
+        while True:
+            with usar_filial(filial):
+                metricas = lembrete_services.despachar(lote)
+            for chave in totais:
+                totais[chave] += metricas[chave]
+            if metricas['reservados'] or metricas['criados'] or uma_vez:
+                click.echo(json.dumps(metricas, ensure_ascii=False))
+            if uma_vez:
+                break
+            time.sleep(intervalo)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        pool_smtp(app).fechar()
+        if not uma_vez:
+            click.echo(f"total: {totais['enviados']} enviados, {totais['falhas']} falhas, "
+                       f"{totais['enviados'] / totais['segundos'] if totais['segundos'] else 0:.1f} envios/s",
+                       err=True)
+
+
+@click.command('semear')
+@click.option('--clientes', type=int, default=1000, show_default=True)
+@click.option('--agendamentos', type=int, default=10_000, show_default=True)
+@click.option('--profissionais', type=int, default=20, show_default=True)
+@click.option('--semente', type=int, default=42, show_default=True)
+@click.option('--filial', help='Banco da filial (FILIAIS); padrão: SQLALCHEMY_DATABASE_URI.')
+@click.option('--snapshots', type=click.Path(file_okay=False),
+              help='Diretório dos snapshots: restaura a massa se já foi gerada, senão gera e salva (só sqlite).')
+@click.option('--metodo', type=click.Choice(['copia', 'backup']), default='copia', show_default=True,
+              help='Restauração do snapshot: troca do arquivo ou API de backup.')
+def semear(clientes, agendamentos, profissionais, semente, filial, snapshots, metodo):
+    """
+    Popula o banco com uma massa de dados para testes e benchmarks. Com
+    --snapshots o banco é substituído pela massa; sem, só grava em banco sem
+    usuários.
+    """
+    from src import app
+    from src.utils import fixtures
+    from src.utils.filiais import filial_valida, usar_filial
+
+    if filial is not None and not filial_valida(app, filial):
+        raise click.BadParameter(f'filial desconhecida: {filial}', param_hint='--filial')
+
+    parametros = {'clientes': clientes, 'agendamentos': agendamentos, 'profissionais': profissionais,
+                  'semente': semente}
+    comeco = time.perf_counter()
+    with usar_filial(filial):
+        try:
+            if snapshots:
+                resultado = fixtures.preparar(snapshots, metodo=metodo, **parametros)
+            else:
+                resultado = fixtures.gerar(**parametros)
+        except ValueError as e:
+            raise click.ClickException(str(e))
+    if not resultado:
+        raise click.ClickException('o banco já tem usuários; use --snapshots para substituir a massa')
+    resultado.setdefault('segundos', round(time.perf_counter() - comeco, 3))
+    click.echo(json.dumps(resultado, ensure_ascii=False))
+
+
+@click.group('snapshot')
+def snapshot():
+    """Snapshots do banco sqlite (salvar e restaurar a massa de testes)."""
+
+
+def _engine_filial(filial):
+    from src import app, db
+    from src.utils.filiais import engine_atual, filial_valida, usar_filial
+
+    if filial is not None and not filial_valida(app, filial):
+        raise click.BadParameter(f'filial desconhecida: {filial}', param_hint='--filial')
+    with usar_filial(filial):
+        return engine_atual(app) or db.engine
+
+
+@snapshot.command('salvar')
+@click.argument('destino', type=click.Path(dir_okay=False))
+@click.option('--filial', help='Banco da filial (FILIAIS); padrão: SQLALCHEMY_DATABASE_URI.')
+def salvar_snapshot(destino, filial):
+    """Copia o banco para DESTINO (API de backup do sqlite)."""
+    from src.utils import fixtures
+
+    try:
+        fixtures.salvar_snapshot(destino, _engine_filial(filial))
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    click.echo(destino)
+
+
+@snapshot.command('restaurar')
+@click.argument('origem', type=click.Path(exists=True, dir_okay=False))
+@click.option('--filial', help='Banco da filial (FILIAIS); padrão: SQLALCHEMY_DATABASE_URI.')
+@click.option('--metodo', type=click.Choice(['copia', 'backup']), default='copia', show_default=True)
+def restaurar_snapshot(origem, filial, metodo):
+    """Substitui o conteúdo do banco pelo snapshot ORIGEM."""
+    from src.utils import fixtures
+
+    comeco = time.perf_counter()
+    try:
+        fixtures.restaurar_snapshot(origem, _engine_filial(filial), metodo)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    click.echo(f'{origem} restaurado em {time.perf_counter() - comeco:.2f} s')
+
+
+@click.command('perfil')
+@click.argument('email')
+@click.argument('perfil', type=click.Choice(['cliente', 'profissional', 'equipe']))
+@click.option('--profissional', type=int, help='Id do profissional ligado ao login (perfil profissional).')
+@click.option('--filial', help='Banco da filial (FILIAIS); padrão: SQLALCHEMY_DATABASE_URI.')
+def perfil(email, perfil, profissional, filial):
+    """
+    Define o PERFIL do usuário EMAIL: equipe gerencia agendas, horários e
+    preços; profissional só a própria agenda (--profissional).
+    """
+    from src import app
+    from src.services import usuario_services
+    from src.utils.filiais import filial_valida, usar_filial
+
+    if filial is not None and not filial_valida(app, filial):
+        raise click.BadParameter(f'filial desconhecida: {filial}', param_hint='--filial')
+    with usar_filial(filial):
+        try:
+            usuario = usuario_services.definir_perfil(email, perfil, profissional)
+        except Exception as e:
+            raise click.ClickException(str(e))
+        click.echo(f'{usuario.email}: {usuario.perfil}' + (f' (profissional {profissional})' if profissional else ''))
+
+
+def registrar(app) -> None:
+    app.cli.add_command(auditar_agenda)
+    app.cli.add_command(lembretes)
+    app.cli.add_command(perfil)
+    app.cli.add_command(semear)
+    app.cli.add_command(snapshot)
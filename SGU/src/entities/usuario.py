@@ -1,10 +1,12 @@
 class Usuario:
     # comstrutor da classe
-    def __init__(self, nome, email, telefone, senha):
+    def __init__(self, nome, email, telefone, senha, versao=None):
         self.__nome = nome
         self.__email = email
         self.__telefone = telefone
         self.__senha = senha
+        # versão da linha no banco (ETag); None para usuário ainda não gravado
+        self.__versao = versao
         
     # get e set para manipular os atributos
     @property
@@ -38,6 +40,10 @@ class Usuario:
     @senha.setter
     def senha(self, senha):
         self.__senha = senha
+
+    @property
+    def versao(self):
+        return self.__versao
              
         
          
\ No newline at end of file
@@ -1,6 +1,6 @@
 # importação das bibliotecas necessárias
 from datetime import datetime
-from sqlalchemy import Column, Integer, DateTime, String, ForeignKey, Float
+from sqlalchemy import Column, Integer, DateTime, String, ForeignKey, Float, Index
 from sqlalchemy.orm import relationship
 from src import db
 
@@ -8,6 +8,14 @@ from src import db
 class AgendamentoModel(db.Model):
 
     __tablename__ = 'tb_agendamentos'
+    __table_args__ = (
+        # agenda do profissional por horário: conflitos e horários livres
+        Index('ix_tb_agendamentos_profissional_atendimento', 'id_profissional', 'dt_atendimento'),
+        # agendamentos de um usuário
+        Index('ix_tb_agendamentos_id_user', 'id_user'),
+        # janela de atendimentos de todos os profissionais (agendador de lembretes)
+        Index('ix_tb_agendamentos_atendimento', 'dt_atendimento'),
+    )
     
     # Campos principais
     id = Column(Integer, primary_key=True, autoincrement=True)
@@ -24,6 +32,10 @@ class AgendamentoModel(db.Model):
     valor_total = Column(Float, nullable=False, default=0.00)
     taxa_cancelamento = Column(Float, nullable=True, default=0.00)
     
+    # versão da linha (controle otimista): cada UPDATE pelo ORM confere e incrementa; exposta como ETag
+    versao = Column(Integer, nullable=False, default=1, server_default='1')
+    __mapper_args__ = {'version_id_col': versao}
+    
     # Relacionamentos
     usuario = relationship("UsuarioModel", backref="agendamentos")
     profissional = relationship("ProfissionalModel", backref="agendamentos")
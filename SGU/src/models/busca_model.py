@@ -0,0 +1,78 @@
+"""
+Índices de busca textual de usuários e serviços
+
+- SQLite: tabelas FTS5 (tb_usuario_busca, tb_servico_busca), rowid = id da
+  tabela de origem, mantidas por triggers em INSERT/UPDATE/DELETE — qualquer
+  escrita (ORM, INSERT em lote, SQL direto) atualiza o índice na mesma
+  transação. ``prefix='2 3'`` cria índices de prefixo para buscas parciais.
+- MySQL: índices FULLTEXT nas próprias tabelas (o InnoDB mantém o índice).
+
+Os DDLs rodam junto com ``db.create_all()``; bancos existentes recebem o
+mesmo DDL pela migração.
+"""
+
+from sqlalchemy import DDL, event
+
+from src.models.servicos_model import ServicoModel
+from src.models.usuario_model import UsuarioModel
+
+TOKENIZADOR = "unicode61 remove_diacritics 2"
+
+# telefone só com dígitos: "(61) 90000-0000" também é encontrado por "6190000"
+_DIGITOS = ("replace(replace(replace(replace(replace(replace({0}, ' ', ''), '-', ''), "
+            "'(', ''), ')', ''), '.', ''), '+', '')")
+
+DDL_SQLITE = {
+    UsuarioModel.__table__: [
+        f"CREATE VIRTUAL TABLE tb_usuario_busca USING fts5("
+        f"nome, email, telefone, telefone_digitos, tokenize='{TOKENIZADOR}', prefix='2 3')",
+        f"CREATE TRIGGER tb_usuario_busca_ai AFTER INSERT ON tb_usuario BEGIN "
+        f"INSERT INTO tb_usuario_busca(rowid, nome, email, telefone, telefone_digitos) "
+        f"VALUES (new.id, new.nome, new.email, new.telefone, {_DIGITOS.format('new.telefone')}); END",
+        f"CREATE TRIGGER tb_usuario_busca_au AFTER UPDATE OF id, nome, email, telefone ON tb_usuario BEGIN "
+        f"DELETE FROM tb_usuario_busca WHERE rowid = old.id; "
+        f"INSERT INTO tb_usuario_busca(rowid, nome, email, telefone, telefone_digitos) "
+        f"VALUES (new.id, new.nome, new.email, new.telefone, {_DIGITOS.format('new.telefone')}); END",
+        "CREATE TRIGGER tb_usuario_busca_ad AFTER DELETE ON tb_usuario BEGIN "
+        "DELETE FROM tb_usuario_busca WHERE rowid = old.id; END",
+    ],
+    ServicoModel.__table__: [
+        f"CREATE VIRTUAL TABLE tb_servico_busca USING fts5("
+        f"descricao, tokenize='{TOKENIZADOR}', prefix='2 3')",
+        "CREATE TRIGGER tb_servico_busca_ai AFTER INSERT ON tb_servico BEGIN "
+        "INSERT INTO tb_servico_busca(rowid, descricao) VALUES (new.id, new.descricao); END",
+        "CREATE TRIGGER tb_servico_busca_au AFTER UPDATE OF id, descricao ON tb_servico BEGIN "
+        "DELETE FROM tb_servico_busca WHERE rowid = old.id; "
+        "INSERT INTO tb_servico_busca(rowid, descricao) VALUES (new.id, new.descricao); END",
+        "CREATE TRIGGER tb_servico_busca_ad AFTER DELETE ON tb_servico BEGIN "
+        "DELETE FROM tb_servico_busca WHERE rowid = old.id; END",
+    ],
+}
+
+DDL_MYSQL = {
+    UsuarioModel.__table__: [
+        "CREATE FULLTEXT INDEX ft_tb_usuario_busca ON tb_usuario (nome, email, telefone)",
+    ],
+    ServicoModel.__table__: [
+        "CREATE FULLTEXT INDEX ft_tb_servico_busca ON tb_servico (descricao)",
+    ],
+}
+
+for _tabela in (UsuarioModel.__table__, ServicoModel.__table__):
+    for _comando in DDL_SQLITE[_tabela]:
+        event.listen(_tabela, 'after_create', DDL(_comando).execute_if(dialect='sqlite'))
+    for _comando in DDL_MYSQL[_tabela]:
+        event.listen(_tabela, 'after_create', DDL(_comando).execute_if(dialect='mysql'))
+    # a tabela FTS não é apagada junto com a de origem (os triggers são)
+    event.listen(_tabela, 'before_drop', DDL(
+        f'DROP TABLE IF EXISTS {_tabela.name}_busca').execute_if(dialect='sqlite'))
+
+TABELAS_BUSCA = ('tb_usuario_busca', 'tb_servico_busca')
+
+
+def incluir_no_autogenerate(objeto, nome, tipo, refletido, comparado_com):
+    """``include_object`` do Alembic: ignora as tabelas FTS5 (e as internas
+    ``*_data``, ``*_idx`` ...), que não são modelos e são criadas pela migração"""
+    if tipo == 'table' and nome and nome.startswith(TABELAS_BUSCA):
+        return False
+    return True
@@ -0,0 +1,11 @@
+from src import db
+
+
+class CalendarioLinkModel(db.Model):
+    __tablename__ = 'tb_calendario_link'
+
+    # versão atual do link .ics de um dono (tipo 'usuario' ou 'profissional'); sem linha = versão 0.
+    # Gerar um link novo incrementa a versão e os tokens das versões anteriores deixam de valer.
+    tipo = db.Column(db.String(20), primary_key=True)
+    id_dono = db.Column(db.Integer, primary_key=True)
+    versao = db.Column(db.Integer, nullable=False, default=1)
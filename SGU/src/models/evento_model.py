@@ -0,0 +1,16 @@
+from datetime import datetime
+from src import db
+
+
+class EventoModel(db.Model):
+    __tablename__ = 'tb_evento'
+    # AUTOINCREMENT no sqlite: ids nunca são reaproveitados, o cursor só avança
+    __table_args__ = {'sqlite_autoincrement': True}
+
+    # id crescente = cursor dos consumidores (/events?after=<id>)
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    # ex.: agendamento.criado, agendamento.editado, agendamento.cancelado
+    tipo = db.Column(db.String(50), nullable=False)
+    id_agendamento = db.Column(db.Integer, nullable=False)
+    dados = db.Column(db.JSON, nullable=False)
+    criado_em = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
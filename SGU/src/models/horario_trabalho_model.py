@@ -0,0 +1,24 @@
+from src import db
+
+
+class HorarioTrabalhoModel(db.Model):
+    __tablename__ = 'tb_horario_trabalho'
+
+    # um profissional pode ter vários períodos no mesmo dia (ex.: manhã e tarde)
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    id_profissional = db.Column(db.Integer, db.ForeignKey('tb_profissional.id'), nullable=False, index=True)
+    dia_semana = db.Column(db.Integer, nullable=False)  # 0 = segunda ... 6 = domingo
+    hora_inicio = db.Column(db.Time, nullable=False)
+    hora_fim = db.Column(db.Time, nullable=False)
+
+
+class ExcecaoHorarioModel(db.Model):
+    __tablename__ = 'tb_excecao_horario'
+
+    # id_profissional nulo = vale para todos (feriado); hora_inicio nula = dia fechado
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    id_profissional = db.Column(db.Integer, db.ForeignKey('tb_profissional.id'), nullable=True, index=True)
+    data = db.Column(db.Date, nullable=False, index=True)
+    hora_inicio = db.Column(db.Time, nullable=True)
+    hora_fim = db.Column(db.Time, nullable=True)
+    descricao = db.Column(db.String(120), nullable=True)
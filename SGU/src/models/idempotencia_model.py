@@ -0,0 +1,16 @@
+from datetime import datetime
+from src import db
+
+
+class IdempotenciaModel(db.Model):
+    __tablename__ = 'tb_idempotencia'
+
+    # hash de quem enviou (usuário ou IP) + header Idempotency-Key, única por endpoint
+    chave = db.Column(db.String(255), primary_key=True)
+    endpoint = db.Column(db.String(80), primary_key=True)
+    hash_requisicao = db.Column(db.String(64), nullable=False)
+    # status_code nulo = requisição original ainda em processamento
+    status_code = db.Column(db.Integer, nullable=True)
+    corpo = db.Column(db.Text, nullable=True)
+    criado_em = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    expira_em = db.Column(db.DateTime, nullable=False, index=True)
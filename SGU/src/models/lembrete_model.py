@@ -0,0 +1,29 @@
+from datetime import datetime
+from src import db
+
+
+class LembreteModel(db.Model):
+    __tablename__ = 'tb_lembrete'
+    __table_args__ = (
+        # um lembrete de cada tipo por agendamento (dois agendadores não criam o mesmo)
+        db.UniqueConstraint('id_agendamento', 'tipo', name='uq_tb_lembrete_agendamento_tipo'),
+        # fila dos workers: pendentes vencidos e reservas expiradas, em ordem de envio
+        db.Index('ix_tb_lembrete_status_proxima_tentativa', 'status', 'proxima_tentativa'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    id_agendamento = db.Column(db.Integer, db.ForeignKey('tb_agendamentos.id'), nullable=False)
+    # antecedência: 24h ou 1h antes do atendimento
+    tipo = db.Column(db.String(10), nullable=False)
+    enviar_em = db.Column(db.DateTime, nullable=False)
+    # pendente -> enviando (reservado por um worker) -> enviado; falhou após o máximo de tentativas;
+    # cancelado se o agendamento foi cancelado/concluído antes do envio
+    status = db.Column(db.String(20), nullable=False, default='pendente')
+    proxima_tentativa = db.Column(db.DateTime, nullable=False)
+    tentativas = db.Column(db.Integer, nullable=False, default=0)
+    # reserva (lease): lote do worker que reservou e até quando; vencida, outro worker pode assumir
+    reservado_por = db.Column(db.String(64), nullable=True, index=True)
+    reservado_ate = db.Column(db.DateTime, nullable=True)
+    enviado_em = db.Column(db.DateTime, nullable=True)
+    erro = db.Column(db.String(255), nullable=True)
+    criado_em = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
@@ -0,0 +1,25 @@
+from datetime import datetime
+from src import db
+
+
+class ListaEsperaModel(db.Model):
+    __tablename__ = 'tb_lista_espera'
+    __table_args__ = (
+        # casamento no cancelamento: pedidos aguardando do profissional cuja janela começa até o horário liberado
+        db.Index('ix_tb_lista_espera_profissional_status_janela', 'id_profissional', 'status', 'janela_inicio'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    id_user = db.Column(db.Integer, db.ForeignKey('tb_usuario.id'), nullable=False, index=True)
+    id_profissional = db.Column(db.Integer, db.ForeignKey('tb_profissional.id'), nullable=False)
+    id_servico = db.Column(db.Integer, db.ForeignKey('tb_servico.id'), nullable=False)
+    # o atendimento inteiro tem que caber em [janela_inicio, janela_fim]
+    janela_inicio = db.Column(db.DateTime, nullable=False)
+    janela_fim = db.Column(db.DateTime, nullable=False)
+    # True: a vaga liberada é agendada direto; False: a vaga é oferecida (evento) e o cliente aceita
+    automatico = db.Column(db.Boolean, nullable=False, default=True)
+    # aguardando -> atendido (agendado) | oferecido -> atendido; ou cancelado
+    status = db.Column(db.String(20), nullable=False, default='aguardando')
+    dt_oferta = db.Column(db.DateTime, nullable=True)
+    id_agendamento = db.Column(db.Integer, db.ForeignKey('tb_agendamentos.id'), nullable=True)
+    criado_em = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
@@ -5,4 +5,6 @@ class ProfissionalModel(db.Model):
 
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     nome = db.Column(db.String(120), nullable=False)
+    # login do profissional (perfil 'profissional'): pode gerir a própria agenda
+    id_usuario = db.Column(db.Integer, db.ForeignKey('tb_usuario.id'), nullable=True, unique=True, index=True)
     
\ No newline at end of file
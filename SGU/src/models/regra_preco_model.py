@@ -0,0 +1,18 @@
+from src import db
+
+
+class RegraPrecoModel(db.Model):
+    __tablename__ = 'tb_regra_preco'
+
+    # horario_pico: acréscimo para serviços que começam em [hora_inicio, hora_fim) do dia_semana
+    #               (dia_semana nulo = todos os dias; id_servico nulo = todos os serviços)
+    # pacote: desconto para agendamentos com min_servicos serviços ou mais
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    tipo = db.Column(db.String(20), nullable=False)
+    percentual = db.Column(db.Float, nullable=False)  # 15 = +15% (pico) / -15% (pacote)
+    dia_semana = db.Column(db.Integer, nullable=True)  # 0 = segunda ... 6 = domingo
+    hora_inicio = db.Column(db.Time, nullable=True)
+    hora_fim = db.Column(db.Time, nullable=True)
+    min_servicos = db.Column(db.Integer, nullable=True)
+    id_servico = db.Column(db.Integer, db.ForeignKey('tb_servico.id'), nullable=True)
+    descricao = db.Column(db.String(120), nullable=True)
@@ -0,0 +1,9 @@
+from src import db
+
+
+class TokenRevogadoModel(db.Model):
+    __tablename__ = 'tb_token_revogado'
+
+    # identificador (jti) do token revogado por logout; a linha só importa até o token expirar
+    jti = db.Column(db.String(32), primary_key=True)
+    expira_em = db.Column(db.DateTime, nullable=False, index=True)
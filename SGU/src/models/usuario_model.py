@@ -1,15 +1,34 @@
 from src import db
 from passlib.hash import pbkdf2_sha256 as sha256
+from sqlalchemy.orm import validates
 
 class UsuarioModel(db.Model):
     __tablename__ = 'tb_usuario'
 
+    # cliente: só os próprios dados; profissional: a própria agenda (tb_profissional.id_usuario); equipe: tudo
+    PERFIS = ('cliente', 'profissional', 'equipe')
+
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     nome = db.Column(db.String(120), nullable=False)
     email = db.Column(db.String(120), nullable=False, unique=True)
+    # email normalizado (sem espaços, minúsculo) usado em todas as buscas por email
+    email_canonical = db.Column(db.String(120), nullable=False, unique=True, index=True)
     telefone = db.Column(db.String(50), nullable=False)
     senha = db.Column(db.String(120), nullable=False)
+    # definido pela equipe (flask perfil), nunca pelo cadastro; vai no token de acesso
+    perfil = db.Column(db.String(20), nullable=False, default='cliente', server_default='cliente')
+    # versão da linha (controle otimista): cada UPDATE pelo ORM confere e incrementa; exposta como ETag
+    versao = db.Column(db.Integer, nullable=False, default=1, server_default='1')
+    __mapper_args__ = {'version_id_col': versao}
+
+    @staticmethod
+    def normalizar_email(email):
+        return email.strip().lower() if email else email
 
+    @validates('email')
+    def _sincronizar_email_canonical(self, _chave, email):
+        self.email_canonical = self.normalizar_email(email)
+        return email
 
     def gen_senha(self, senha):
         self.senha = sha256.hash(senha)
@@ -0,0 +1,54 @@
+from flask import current_app
+from src import ma
+from src.models import agendamento_model
+from marshmallow import fields
+
+class AgendamentoSchema(ma.SQLAlchemyAutoSchema):
+    class Meta:
+        model = agendamento_model.AgendamentoModel
+        include_fk = True
+
+        fields = ('id', 'dt_agendamento', 'dt_atendimento', 'id_user', 'id_profissional',
+                  'id_servico', 'status', 'valor_total', 'taxa_cancelamento')
+        dump_only = ('id', 'dt_agendamento', 'status', 'taxa_cancelamento')
+
+    dt_atendimento = fields.DateTime(required=True)
+    id_user = fields.Integer(required=True)
+    id_profissional = fields.Integer(required=True)
+    id_servico = fields.Integer(required=True)
+    valor_total = fields.Float(load_default=None)  # sem valor: preço de tabela (POST) ou o atual (PUT)
+
+
+# instâncias reutilizadas entre requisições
+agendamento_schema = AgendamentoSchema()
+agendamentos_schema = AgendamentoSchema(many=True)
+
+
+def _iso(valor):
+    return valor.isoformat() if valor is not None else None
+
+
+def _float(valor):
+    return float(valor) if valor is not None else None
+
+
+def _dump_rapido(agendamento):
+    # mesmo resultado do schema (DateTime em ISO 8601, Float como float)
+    return {
+        'id': agendamento.id,
+        'dt_agendamento': _iso(agendamento.dt_agendamento),
+        'dt_atendimento': _iso(agendamento.dt_atendimento),
+        'id_user': agendamento.id_user,
+        'id_profissional': agendamento.id_profissional,
+        'id_servico': agendamento.id_servico,
+        'status': agendamento.status,
+        'valor_total': _float(agendamento.valor_total),
+        'taxa_cancelamento': _float(agendamento.taxa_cancelamento),
+    }
+
+
+def serializar_agendamentos(agendamentos):
+    """dump da listagem (GET /agendamento), com o caminho rápido quando SCHEMA_FAST_PATH_ENABLED"""
+    if current_app.config.get('SCHEMA_FAST_PATH_ENABLED', False):
+        return [_dump_rapido(a) for a in agendamentos]
+    return agendamentos_schema.dump(agendamentos)
@@ -0,0 +1,13 @@
+from src import ma
+from src.models import evento_model
+
+
+class EventoSchema(ma.SQLAlchemyAutoSchema):
+    class Meta:
+        model = evento_model.EventoModel
+
+        fields = ('id', 'tipo', 'id_agendamento', 'dados', 'criado_em')
+
+
+# instância reutilizada entre requisições
+eventos_schema = EventoSchema(many=True)
@@ -0,0 +1,33 @@
+from src import ma
+from src.models import horario_trabalho_model
+from marshmallow import fields, validate
+
+class HorarioTrabalhoSchema(ma.SQLAlchemyAutoSchema):
+    class Meta:
+        model = horario_trabalho_model.HorarioTrabalhoModel
+
+        fields = ('id', 'dia_semana', 'hora_inicio', 'hora_fim')
+        dump_only = ('id',)
+
+    dia_semana = fields.Integer(required=True, validate=validate.Range(min=0, max=6))
+    hora_inicio = fields.Time(required=True)
+    hora_fim = fields.Time(required=True)
+
+
+class ExcecaoHorarioSchema(ma.SQLAlchemyAutoSchema):
+    class Meta:
+        model = horario_trabalho_model.ExcecaoHorarioModel
+        include_fk = True
+
+        fields = ('id', 'id_profissional', 'data', 'hora_inicio', 'hora_fim', 'descricao')
+        dump_only = ('id',)
+
+    id_profissional = fields.Integer(load_default=None, allow_none=True)
+    data = fields.Date(required=True)
+    hora_inicio = fields.Time(load_default=None, allow_none=True)
+    hora_fim = fields.Time(load_default=None, allow_none=True)
+
+
+# instâncias reutilizadas entre requisições
+horarios_trabalho_schema = HorarioTrabalhoSchema(many=True)
+excecao_horario_schema = ExcecaoHorarioSchema()
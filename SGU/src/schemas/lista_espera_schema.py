@@ -0,0 +1,24 @@
+from src import ma
+from src.models import lista_espera_model
+from marshmallow import fields
+
+class ListaEsperaSchema(ma.SQLAlchemyAutoSchema):
+    class Meta:
+        model = lista_espera_model.ListaEsperaModel
+        include_fk = True
+
+        fields = ('id', 'id_user', 'id_profissional', 'id_servico', 'janela_inicio', 'janela_fim',
+                  'automatico', 'status', 'dt_oferta', 'id_agendamento', 'criado_em')
+        dump_only = ('id', 'status', 'dt_oferta', 'id_agendamento', 'criado_em')
+
+    id_user = fields.Integer(required=True)
+    id_profissional = fields.Integer(required=True)
+    id_servico = fields.Integer(required=True)
+    janela_inicio = fields.DateTime(required=True)
+    janela_fim = fields.DateTime(required=True)
+    automatico = fields.Boolean(load_default=True)
+
+
+# instâncias reutilizadas entre requisições
+lista_espera_schema = ListaEsperaSchema()
+listas_espera_schema = ListaEsperaSchema(many=True)
@@ -0,0 +1,33 @@
+from src import ma
+from src.models import regra_preco_model
+from src.services.preco_services import MAX_HORARIOS, MAX_SERVICOS, TIPOS
+from marshmallow import fields, validate
+
+class RegraPrecoSchema(ma.SQLAlchemyAutoSchema):
+    class Meta:
+        model = regra_preco_model.RegraPrecoModel
+        include_fk = True
+
+        fields = ('id', 'tipo', 'percentual', 'dia_semana', 'hora_inicio', 'hora_fim', 'min_servicos',
+                  'id_servico', 'descricao')
+        dump_only = ('id',)
+
+    tipo = fields.String(required=True, validate=validate.OneOf(TIPOS))
+    percentual = fields.Float(required=True)
+    dia_semana = fields.Integer(load_default=None, allow_none=True, validate=validate.Range(min=0, max=6))
+    hora_inicio = fields.Time(load_default=None, allow_none=True)
+    hora_fim = fields.Time(load_default=None, allow_none=True)
+    min_servicos = fields.Integer(load_default=None, allow_none=True)
+    id_servico = fields.Integer(load_default=None, allow_none=True)
+
+
+class CotacaoSchema(ma.Schema):
+    # serviços feitos em sequência, a partir de cada horário candidato
+    servicos = fields.List(fields.Integer(), required=True, validate=validate.Length(min=1, max=MAX_SERVICOS))
+    horarios = fields.List(fields.DateTime(), required=True, validate=validate.Length(min=1, max=MAX_HORARIOS))
+
+
+# instâncias reutilizadas entre requisições
+regra_preco_schema = RegraPrecoSchema()
+regras_preco_schema = RegraPrecoSchema(many=True)
+cotacao_schema = CotacaoSchema()
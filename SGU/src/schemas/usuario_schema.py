@@ -1,3 +1,4 @@
+from flask import current_app
 from src import ma
 from src.models import usuario_model
 from marshmallow import fields
@@ -11,4 +12,43 @@ class UsuarioSchema(ma.SQLAlchemyAutoSchema):
     nome = fields.String(required=True)
     email = fields.String(required=True)
     telefone = fields.String(required=True)
-    senha = fields.String(required=True)   
\ No newline at end of file
+    senha = fields.String(required=True)
+
+
+# instâncias reutilizadas entre requisições (criar o schema copia todos os fields a cada vez)
+usuario_schema = UsuarioSchema()
+usuarios_schema = UsuarioSchema(many=True)
+
+# caminho rápido (SCHEMA_FAST_PATH_ENABLED) para os endpoints mais chamados: trata o caso
+# comum sem passar pelo marshmallow; qualquer outro caso (erro, campo extra, tipo
+# diferente) vai para o schema, que gera exatamente as mesmas mensagens de erro
+CAMPOS_CADASTRO = frozenset(('nome', 'email', 'telefone', 'senha'))
+
+
+def _caminho_rapido():
+    return current_app.config.get('SCHEMA_FAST_PATH_ENABLED', False)
+
+
+def carregar_usuario(dados):
+    """load de um usuário (POST/PUT); levanta ValidationError como o schema"""
+    if (_caminho_rapido() and type(dados) is dict and dados.keys() == CAMPOS_CADASTRO
+            and all(type(valor) is str for valor in dados.values())):
+        return dict(dados)
+    return usuario_schema.load(dados)
+
+
+def _dump_rapido(usuario):
+    if isinstance(usuario, usuario_model.UsuarioModel):
+        return {'id': usuario.id, 'nome': usuario.nome, 'email': usuario.email,
+                'telefone': usuario.telefone, 'senha': usuario.senha}
+    # entidade Usuario (listar_usuario) não tem id
+    return {'nome': usuario.nome, 'email': usuario.email,
+            'telefone': usuario.telefone, 'senha': usuario.senha}
+
+
+def serializar_usuario(usuario):
+    return _dump_rapido(usuario) if _caminho_rapido() else usuario_schema.dump(usuario)
+
+
+def serializar_usuarios(usuarios):
+    return [_dump_rapido(u) for u in usuarios] if _caminho_rapido() else usuarios_schema.dump(usuarios)
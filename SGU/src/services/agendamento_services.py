@@ -3,12 +3,18 @@ Service para gerenciamento de agendamentos
 Adaptado para funcionar com SQLAlchemy Models e Marshmallow Schemas
 """
 
+import heapq
 from datetime import datetime, timedelta, time
+from itertools import islice
 from typing import List, Dict, Optional
+from sqlalchemy import case, select, update
+from sqlalchemy.orm.exc import StaleDataError
 from src.models.agendamento_model import AgendamentoModel
 from src.models.servicos_model import ServicoModel
 from src.models.profissional_model import ProfissionalModel
 from src.models.usuario_model import UsuarioModel
+from src.services import evento_services, horario_services, lista_espera_services, preco_services
+from src.utils.concorrencia import ConflitoVersao, conferir, conflito
 from src import db
 
 
@@ -17,7 +23,7 @@ class AgendamentoService:
     Service responsável pela lógica de negócio dos agendamentos
     """
     
-    # Configurações de horário de funcionamento
+    # Horário de funcionamento padrão (profissionais sem modelo em tb_horario_trabalho)
     HORA_ABERTURA = 9  # 9h
     HORA_FECHAMENTO = 20  # 20h
     HORA_ALMOCO_INICIO = 12  # 12h
@@ -25,13 +31,21 @@ class AgendamentoService:
     
     # Duração padrão em minutos (fallback caso não esteja no banco)
     DURACAO_PADRAO = 60
+    
+    # Nenhum serviço dura mais que isso: limita a busca de conflitos no passado
+    DURACAO_MAXIMA = 24 * 60
+    
+    # Cancelamento com menos de 24h de antecedência paga 20% do valor do serviço
+    ANTECEDENCIA_CANCELAMENTO_GRATUITO = timedelta(hours=24)
+    TAXA_CANCELAMENTO = 0.20
 
 
 def _obter_duracao_servico(servico):
     """Obtém duração do serviço do banco ou usa fallback"""
-    # Primeiro tenta pegar do campo duracao
-    if hasattr(servico, 'duracao') and servico.duracao:
-        return servico.duracao
+    # Primeiro tenta pegar do campo horario_duraçao (minutos)
+    duracao = getattr(servico, 'horario_duraçao', None)
+    if duracao:
+        return duracao
     
     # Se não existir, usa duração padrão
     return AgendamentoService.DURACAO_PADRAO
@@ -72,7 +86,8 @@ def cadastrar_agendamento(novo_agendamento):
             raise Exception("Não é possível agendar para datas passadas")
         
         # Verificar horário de funcionamento
-        if not _verificar_horario_funcionamento(novo_agendamento.dt_atendimento):
+        if not _verificar_horario_funcionamento(novo_agendamento.dt_atendimento,
+                                                novo_agendamento.id_profissional):
             raise Exception("Horário fora do funcionamento do estabelecimento")
         
         # Verificar se o usuário existe
@@ -102,12 +117,15 @@ def cadastrar_agendamento(novo_agendamento):
         ):
             raise Exception("Horário não disponível para o profissional")
         
-        # Se valor_total não foi fornecido, usar o preço do serviço
-        if novo_agendamento.valor_total == 0.00:
-            novo_agendamento.valor_total = float(servico.preco)
+        # Se valor_total não foi fornecido, usar o preço do serviço no horário (tabela + pico)
+        if not novo_agendamento.valor_total:
+            novo_agendamento.valor_total = preco_services.preco_agendamento(
+                servico, novo_agendamento.dt_atendimento)
         
-        # Salvar no banco
+        # Salvar no banco (flush para o evento já ter o id; evento e agendamento no mesmo commit)
         db.session.add(novo_agendamento)
+        db.session.flush()
+        evento_services.registrar(evento_services.AGENDAMENTO_CRIADO, novo_agendamento)
         db.session.commit()
         
         return novo_agendamento
@@ -117,15 +135,19 @@ def cadastrar_agendamento(novo_agendamento):
         raise Exception(str(e))
 
 
-def editar_agendamento(agendamento_id: int, dados_atualizados):
+def editar_agendamento(agendamento_id: int, dados_atualizados, versoes=None):
     """
-    Edita um agendamento existente
+    Edita um agendamento existente.
+    ``versoes``: versões aceitas (If-Match); outra versão levanta ConflitoVersao,
+    assim como uma edição concorrente gravada entre a leitura e o commit.
     """
     try:
         agendamento_existente = AgendamentoModel.query.get(agendamento_id)
         if not agendamento_existente:
             raise Exception("Agendamento não encontrado")
         
+        conferir(agendamento_existente, versoes)
+        
         # Verificar se pode ser editado (não cancelado/concluído)
         if agendamento_existente.status in ['cancelado', 'concluido']:
             raise Exception("Não é possível editar agendamento cancelado ou concluído")
@@ -137,7 +159,8 @@ def editar_agendamento(agendamento_id: int, dados_atualizados):
                 raise Exception("Não é possível agendar para datas passadas")
             
             # Verificar horário de funcionamento
-            if not _verificar_horario_funcionamento(dados_atualizados.dt_atendimento):
+            if not _verificar_horario_funcionamento(dados_atualizados.dt_atendimento,
+                                                    dados_atualizados.id_profissional):
                 raise Exception("Horário fora do funcionamento do estabelecimento")
         
         # Validações se estiver alterando profissional ou serviço
@@ -167,16 +190,31 @@ def editar_agendamento(agendamento_id: int, dados_atualizados):
             ):
                 raise Exception("Horário não disponível para o profissional")
         
+        # valor_total não enviado: mantém o atual, ou recalcula se mudou o serviço ou o horário
+        if dados_atualizados.valor_total is not None:
+            agendamento_existente.valor_total = dados_atualizados.valor_total
+        elif (dados_atualizados.id_servico != agendamento_existente.id_servico or
+              dados_atualizados.dt_atendimento != agendamento_existente.dt_atendimento):
+            # (mudou serviço ou horário: o serviço foi carregado e validado acima)
+            agendamento_existente.valor_total = preco_services.preco_agendamento(
+                servico, dados_atualizados.dt_atendimento)
+        
         # Atualizar campos
         agendamento_existente.dt_atendimento = dados_atualizados.dt_atendimento
         agendamento_existente.id_user = dados_atualizados.id_user
         agendamento_existente.id_profissional = dados_atualizados.id_profissional
         agendamento_existente.id_servico = dados_atualizados.id_servico
-        agendamento_existente.valor_total = dados_atualizados.valor_total
         
+        evento_services.registrar(evento_services.AGENDAMENTO_EDITADO, agendamento_existente)
         db.session.commit()
         return agendamento_existente
         
+    except ConflitoVersao:
+        db.session.rollback()
+        raise
+    except StaleDataError:
+        db.session.rollback()
+        raise conflito(AgendamentoModel, agendamento_id)
     except Exception as e:
         db.session.rollback()
         raise Exception(str(e))
@@ -184,7 +222,9 @@ def editar_agendamento(agendamento_id: int, dados_atualizados):
 
 def excluir_agendamento(agendamento_id: int):
     """
-    Exclui um agendamento (cancelamento)
+    Exclui um agendamento (cancelamento).
+    A vaga liberada vai para a lista de espera na mesma transação; devolve o
+    pedido da lista de espera que foi agendado/recebeu a oferta (ou None).
     """
     try:
         agendamento = AgendamentoModel.query.get(agendamento_id)
@@ -202,14 +242,119 @@ def excluir_agendamento(agendamento_id: int):
         taxa = 0.0
         
         if not _pode_cancelar_gratuito(agendamento):
-            taxa = _calcular_taxa_cancelamento(float(servico.preco))
+            taxa = _calcular_taxa_cancelamento(float(servico.valor))
         
         # Atualizar status para cancelado
         agendamento.status = 'cancelado'
         agendamento.taxa_cancelamento = taxa
         
+        evento_services.registrar(evento_services.AGENDAMENTO_CANCELADO, agendamento)
+        
+        # Vaga liberada: primeiro pedido compatível da lista de espera
+        pedido = lista_espera_services.preencher_vaga(agendamento)
         db.session.commit()
+        return pedido
         
+    except StaleDataError:
+        # editado/cancelado por outra requisição entre a leitura e o commit
+        db.session.rollback()
+        raise conflito(AgendamentoModel, agendamento_id)
+    except Exception as e:
+        db.session.rollback()
+        raise Exception(str(e))
+
+
+def cancelar_agendamentos_profissional(profissional_id: int, inicio: datetime,
+                                        fim: datetime) -> Dict:
+    """
+    Cancela todos os agendamentos ativos do profissional em [inicio, fim)
+    (ex.: profissional doente no dia).
+    A taxa de cada agendamento é calculada pelo banco (CASE sobre a
+    antecedência e o valor do serviço) e todos são cancelados por um único
+    UPDATE, na mesma transação (junto com os eventos do outbox). Devolve o
+    resumo para avisar os clientes. Se algum deles foi cancelado/concluído por
+    outra requisição entre a leitura e o UPDATE, desfaz tudo e levanta
+    ConflitoVersao (nada de taxa ou evento em dobro).
+    """
+    try:
+        if fim <= inicio:
+            raise Exception("Período de cancelamento inválido")
+        
+        profissional = ProfissionalModel.query.get(profissional_id)
+        if not profissional:
+            raise Exception("Profissional não encontrado")
+        
+        taxa = _expressao_taxa_cancelamento(datetime.utcnow())
+        
+        # Agendamentos afetados, com cliente, serviço e taxa (uma consulta, linhas travadas)
+        afetados = db.session.query(
+            AgendamentoModel.id, AgendamentoModel.dt_atendimento,
+            AgendamentoModel.id_servico, AgendamentoModel.valor_total,
+            UsuarioModel.id, UsuarioModel.nome, UsuarioModel.email, UsuarioModel.telefone,
+            ServicoModel.descricao, taxa
+        ).join(
+            UsuarioModel, UsuarioModel.id == AgendamentoModel.id_user
+        ).join(
+            ServicoModel, ServicoModel.id == AgendamentoModel.id_servico
+        ).filter(
+            AgendamentoModel.id_profissional == profissional_id,
+            AgendamentoModel.dt_atendimento >= inicio,
+            AgendamentoModel.dt_atendimento < fim,
+            AgendamentoModel.status.notin_(['cancelado', 'concluido'])
+        ).order_by(AgendamentoModel.dt_atendimento).with_for_update().all()
+        
+        agendamentos = []
+        eventos = []
+        for (id_agendamento, dt_atendimento, id_servico, valor_total,
+             id_user, nome, email, telefone, servico, taxa_cancelamento) in afetados:
+            agendamentos.append({
+                "id_agendamento": id_agendamento,
+                "dt_atendimento": dt_atendimento.isoformat(),
+                "servico": servico,
+                "taxa_cancelamento": float(taxa_cancelamento),
+                "usuario": {"id": id_user, "nome": nome, "email": email, "telefone": telefone}
+            })
+            eventos.append({
+                "id": id_agendamento,
+                "dt_atendimento": dt_atendimento.isoformat(),
+                "id_user": id_user,
+                "id_profissional": profissional_id,
+                "id_servico": id_servico,
+                "status": "cancelado",
+                "valor_total": valor_total,
+                "taxa_cancelamento": float(taxa_cancelamento)
+            })
+        
+        if afetados:
+            resultado = db.session.execute(
+                update(AgendamentoModel)
+                .where(AgendamentoModel.id.in_([a["id_agendamento"] for a in agendamentos]),
+                       AgendamentoModel.status.notin_(['cancelado', 'concluido']))
+                .values(status='cancelado', taxa_cancelamento=taxa, versao=AgendamentoModel.versao + 1),
+                execution_options={'synchronize_session': False}
+            )
+            if resultado.rowcount != len(agendamentos):
+                # outra requisição mudou algum agendamento depois da leitura
+                raise ConflitoVersao('Agendamentos alterados durante o cancelamento; repita a operação')
+            evento_services.registrar_varios(evento_services.AGENDAMENTO_CANCELADO, eventos)
+        
+        # resumo montado antes do commit (que expira o profissional carregado)
+        resumo = {
+            "id_profissional": profissional_id,
+            "profissional": profissional.nome,
+            "inicio": inicio.isoformat(),
+            "fim": fim.isoformat(),
+            "total_cancelados": len(agendamentos),
+            "total_taxas": round(sum(a["taxa_cancelamento"] for a in agendamentos), 2),
+            "agendamentos": agendamentos
+        }
+        
+        db.session.commit()
+        return resumo
+        
+    except ConflitoVersao:
+        db.session.rollback()
+        raise
     except Exception as e:
         db.session.rollback()
         raise Exception(str(e))
@@ -232,50 +377,24 @@ def listar_horarios_disponiveis(profissional_id: int, data_str: str) -> Dict:
         data_inicio = datetime.combine(data, time.min)
         data_fim = datetime.combine(data, time.max)
         
-        agendamentos = AgendamentoModel.query.filter(
+        # Agendamentos e serviços em uma única consulta (JOIN)
+        agendamentos = db.session.query(AgendamentoModel.dt_atendimento, ServicoModel).join(
+            ServicoModel, ServicoModel.id == AgendamentoModel.id_servico
+        ).filter(
             AgendamentoModel.id_profissional == profissional_id,
             AgendamentoModel.dt_atendimento >= data_inicio,
             AgendamentoModel.dt_atendimento <= data_fim,
             AgendamentoModel.status != 'cancelado'
         ).all()
         
-        # Gerar slots de horário (intervalos de 30 min)
-        horarios_disponiveis = []
-        horarios_ocupados = set()
+        # Marcar horários ocupados (slots de 30 min)
+        horarios_ocupados = _marcar_horarios_ocupados(
+            (dt_atendimento, _obter_duracao_servico(servico))
+            for dt_atendimento, servico in agendamentos
+        )
         
-        # Marcar horários ocupados
-        for agendamento in agendamentos:
-            servico = ServicoModel.query.get(agendamento.id_servico)
-            duracao = _obter_duracao_servico(servico)
-            
-            inicio = agendamento.dt_atendimento
-            fim = inicio + timedelta(minutes=duracao)
-            
-            # Marcar todos os slots ocupados
-            slot_atual = inicio
-            while slot_atual < fim:
-                horarios_ocupados.add(slot_atual.strftime("%H:%M"))
-                slot_atual += timedelta(minutes=30)
-        
-        # Gerar horários disponíveis
-        data_completa = datetime.combine(data, time(AgendamentoService.HORA_ABERTURA))
-        
-        while data_completa.hour < AgendamentoService.HORA_FECHAMENTO:
-            # Pular horário de almoço
-            if (data_completa.hour >= AgendamentoService.HORA_ALMOCO_INICIO and 
-                data_completa.hour < AgendamentoService.HORA_ALMOCO_FIM):
-                data_completa += timedelta(minutes=30)
-                continue
-            
-            horario_str = data_completa.strftime("%H:%M")
-            
-            if horario_str not in horarios_ocupados:
-                horarios_disponiveis.append({
-                    "horario": horario_str,
-                    "timestamp": data_completa.isoformat()
-                })
-            
-            data_completa += timedelta(minutes=30)
+        horarios_disponiveis = _gerar_horarios_disponiveis(
+            data, horarios_ocupados, horario_services.mascara_do_dia(profissional_id, data))
         
         return {
             "data": data.isoformat(),
@@ -302,6 +421,63 @@ def listar_agendamentos_usuario(user_id: int, status: str = None) -> List:
         raise Exception(f"Erro ao listar agendamentos do usuário: {str(e)}")
 
 
+def buscar_proximos_horarios(servico_id: int, inicio: datetime, fim: datetime,
+                             limite: int = 5) -> List[Dict]:
+    """
+    Busca os ``limite`` horários livres mais cedo para o serviço, com qualquer
+    profissional, entre ``inicio`` e ``fim``.
+    Todos os agendamentos da janela vêm em uma única consulta; cada profissional
+    vira um gerador de horários livres (varredura sobre intervalos ordenados) e
+    os geradores são intercalados por um heap (heapq.merge).
+    """
+    try:
+        servico = ServicoModel.query.get(servico_id)
+        if not servico:
+            raise Exception("Serviço não encontrado")
+        
+        if fim <= inicio:
+            raise Exception("Janela de busca inválida")
+        
+        duracao = timedelta(minutes=_obter_duracao_servico(servico))
+        inicio = _proximo_slot(max(inicio, datetime.now()))
+        
+        profissionais = {p.id: p.nome for p in ProfissionalModel.query.order_by(ProfissionalModel.id)}
+        
+        # Intervalos ocupados de todos os profissionais, já ordenados
+        agendamentos = db.session.query(
+            AgendamentoModel.id_profissional, AgendamentoModel.dt_atendimento, ServicoModel
+        ).join(
+            ServicoModel, ServicoModel.id == AgendamentoModel.id_servico
+        ).filter(
+            AgendamentoModel.status != 'cancelado',
+            AgendamentoModel.dt_atendimento < fim,
+            AgendamentoModel.dt_atendimento > inicio - timedelta(minutes=AgendamentoService.DURACAO_MAXIMA)
+        ).order_by(AgendamentoModel.id_profissional, AgendamentoModel.dt_atendimento).all()
+        
+        ocupados = {id_profissional: [] for id_profissional in profissionais}
+        for id_profissional, dt_atendimento, servico_agendado in agendamentos:
+            if id_profissional in ocupados:
+                ocupados[id_profissional].append((
+                    dt_atendimento,
+                    dt_atendimento + timedelta(minutes=_obter_duracao_servico(servico_agendado))
+                ))
+        
+        geradores = [
+            _horarios_livres(id_profissional, _unir_intervalos(intervalos), inicio, fim, duracao)
+            for id_profissional, intervalos in ocupados.items()
+        ]
+        
+        return [{
+            "id_profissional": id_profissional,
+            "profissional": profissionais[id_profissional],
+            "inicio": slot.isoformat(),
+            "fim": (slot + duracao).isoformat()
+        } for slot, id_profissional in islice(heapq.merge(*geradores), limite)]
+        
+    except Exception as e:
+        raise Exception(f"Erro ao buscar próximos horários: {str(e)}")
+
+
 # Funções auxiliares privadas
 def _validar_dados_basicos(dt_atendimento: datetime, id_user: int,
                           id_profissional: int, id_servico: int) -> bool:
@@ -321,74 +497,169 @@ def _validar_dados_basicos(dt_atendimento: datetime, id_user: int,
     return True
 
 
-def _verificar_horario_funcionamento(dt_atendimento: datetime) -> bool:
-    """Verifica se o horário está dentro do funcionamento"""
-    hora = dt_atendimento.hour
-    
-    # Verificar se está no horário de funcionamento
-    if hora < AgendamentoService.HORA_ABERTURA or hora >= AgendamentoService.HORA_FECHAMENTO:
-        return False
-    
-    # Verificar se não é horário de almoço
-    if (hora >= AgendamentoService.HORA_ALMOCO_INICIO and 
-        hora < AgendamentoService.HORA_ALMOCO_FIM):
-        return False
-    
-    return True
+def _verificar_horario_funcionamento(dt_atendimento: datetime, id_profissional: int = None) -> bool:
+    """Verifica se o horário está dentro do expediente do profissional (consulta à máscara compilada)"""
+    return horario_services.no_expediente(id_profissional, dt_atendimento)
 
 
 def _verificar_disponibilidade(profissional_id: int, dt_inicio: datetime,
                               dt_fim: datetime) -> bool:
     """Verifica se o horário está disponível para o profissional"""
-    agendamentos_conflito = AgendamentoModel.query.filter(
-        AgendamentoModel.id_profissional == profissional_id,
-        AgendamentoModel.status != 'cancelado',
-        AgendamentoModel.dt_atendimento < dt_fim
-    ).all()
-    
-    for agendamento in agendamentos_conflito:
-        # Calcular fim do agendamento existente
-        servico = ServicoModel.query.get(agendamento.id_servico)
-        duracao = _obter_duracao_servico(servico)
-        ag_fim = agendamento.dt_atendimento + timedelta(minutes=duracao)
-        
-        # Verificar sobreposição
-        if not (dt_fim <= agendamento.dt_atendimento or dt_inicio >= ag_fim):
-            return False
-    
-    return True
+    return not _existe_conflito(profissional_id, dt_inicio, dt_fim)
 
 
 def _verificar_disponibilidade_edicao(profissional_id: int, dt_inicio: datetime,
                                      dt_fim: datetime, agendamento_id: int) -> bool:
     """Verifica disponibilidade excluindo o próprio agendamento que está sendo editado"""
-    agendamentos_conflito = AgendamentoModel.query.filter(
+    return not _existe_conflito(profissional_id, dt_inicio, dt_fim, agendamento_id)
+
+
+def _existe_conflito(profissional_id: int, dt_inicio: datetime, dt_fim: datetime,
+                     ignorar_id: int = None) -> bool:
+    """
+    Procura agendamento ativo do profissional que sobreponha [dt_inicio, dt_fim).
+    Uma consulta só (JOIN com o serviço para obter a duração), limitada aos
+    agendamentos que começam até DURACAO_MAXIMA antes do início.
+    """
+    consulta = db.session.query(AgendamentoModel.dt_atendimento, ServicoModel).join(
+        ServicoModel, ServicoModel.id == AgendamentoModel.id_servico
+    ).filter(
         AgendamentoModel.id_profissional == profissional_id,
         AgendamentoModel.status != 'cancelado',
         AgendamentoModel.dt_atendimento < dt_fim,
-        AgendamentoModel.id != agendamento_id  # Excluir o próprio agendamento
-    ).all()
+        AgendamentoModel.dt_atendimento > dt_inicio - timedelta(minutes=AgendamentoService.DURACAO_MAXIMA)
+    )
     
-    for agendamento in agendamentos_conflito:
+    if ignorar_id is not None:
+        consulta = consulta.filter(AgendamentoModel.id != ignorar_id)  # Excluir o próprio agendamento
+    
+    for dt_atendimento, servico in consulta:
         # Calcular fim do agendamento existente
-        servico = ServicoModel.query.get(agendamento.id_servico)
-        duracao = _obter_duracao_servico(servico)
-        ag_fim = agendamento.dt_atendimento + timedelta(minutes=duracao)
+        ag_fim = dt_atendimento + timedelta(minutes=_obter_duracao_servico(servico))
         
         # Verificar sobreposição
-        if not (dt_fim <= agendamento.dt_atendimento or dt_inicio >= ag_fim):
-            return False
+        if not (dt_fim <= dt_atendimento or dt_inicio >= ag_fim):
+            return True
     
-    return True
+    return False
+
+
+def _marcar_horarios_ocupados(intervalos) -> set:
+    """Recebe pares (inicio, duracao em minutos) e devolve os slots "HH:MM" ocupados"""
+    horarios_ocupados = set()
+    
+    for inicio, duracao in intervalos:
+        fim = inicio + timedelta(minutes=duracao)
+        
+        # Marcar todos os slots ocupados
+        slot_atual = inicio
+        while slot_atual < fim:
+            horarios_ocupados.add(slot_atual.strftime("%H:%M"))
+            slot_atual += timedelta(minutes=30)
+    
+    return horarios_ocupados
+
+
+def _gerar_horarios_disponiveis(data, horarios_ocupados: set, mascara: int) -> List[Dict]:
+    """Gera os slots de 30 min do dia que estão livres, dentro da máscara de expediente"""
+    horarios_disponiveis = []
+    
+    for indice in range(horario_services.SLOTS_DIA):
+        # Pular slots fora do expediente (antes/depois do funcionamento, almoço, folga)
+        if not mascara >> indice & 1:
+            continue
+        
+        data_completa = datetime.combine(data, time()) + timedelta(minutes=indice * horario_services.MINUTOS_SLOT)
+        horario_str = data_completa.strftime("%H:%M")
+        
+        if horario_str not in horarios_ocupados:
+            horarios_disponiveis.append({
+                "horario": horario_str,
+                "timestamp": data_completa.isoformat()
+            })
+    
+    return horarios_disponiveis
+
+
+def _proximo_slot(momento: datetime) -> datetime:
+    """Arredonda para cima até o próximo início de slot de 30 min"""
+    base = momento.replace(second=0, microsecond=0)
+    resto = base.minute % 30
+    if resto or momento > base:
+        base += timedelta(minutes=30 - resto)
+    return base
+
+
+def _unir_intervalos(intervalos: List[tuple]) -> List[tuple]:
+    """Une intervalos (inicio, fim) ordenados por início que se sobrepõem"""
+    unidos = []
+    for inicio, fim in intervalos:
+        if unidos and inicio <= unidos[-1][1]:
+            unidos[-1] = (unidos[-1][0], max(unidos[-1][1], fim))
+        else:
+            unidos.append((inicio, fim))
+    return unidos
+
+
+def _horarios_livres(id_profissional: int, ocupados: List[tuple], inicio: datetime,
+                     fim: datetime, duracao: timedelta):
+    """
+    Gera, em ordem, pares (inicio do slot, id_profissional) em que cabe ``duracao``
+    sem sobrepor ``ocupados`` (intervalos disjuntos e ordenados) e dentro do expediente
+    """
+    passo = timedelta(minutes=horario_services.MINUTOS_SLOT)
+    n_slots = horario_services.slots_necessarios(duracao.total_seconds() / 60)
+    necessarios = (1 << n_slots) - 1
+    i = 0
+    data = inicio.date()
+    
+    while data <= fim.date():
+        mascara = horario_services.mascara_do_dia(id_profissional, data)
+        slot = max(datetime.combine(data, time()), inicio)
+        
+        while slot.date() == data and slot + duracao <= fim:
+            # Expediente: todos os slots da duração precisam estar na máscara
+            if mascara >> horario_services.indice_slot(slot) & necessarios != necessarios:
+                slot += passo
+                continue
+            
+            # Descarta intervalos que terminaram antes do slot
+            while i < len(ocupados) and ocupados[i][1] <= slot:
+                i += 1
+            
+            if i < len(ocupados) and ocupados[i][0] < slot + duracao:
+                # Conflito: pula para o primeiro slot depois do intervalo ocupado
+                slot = _proximo_slot(ocupados[i][1])
+                continue
+            
+            yield slot, id_profissional
+            slot += passo
+        
+        data += timedelta(days=1)
 
 
 def _pode_cancelar_gratuito(agendamento) -> bool:
     """Verifica se o cancelamento pode ser gratuito (mais de 24h de antecedência)"""
     agora = datetime.utcnow()
     diferenca = agendamento.dt_atendimento - agora
-    return diferenca.total_seconds() > 24 * 3600  # 24 horas em segundos
+    return diferenca > AgendamentoService.ANTECEDENCIA_CANCELAMENTO_GRATUITO
 
 
 def _calcular_taxa_cancelamento(valor_servico: float) -> float:
     """Calcula taxa de cancelamento (20% do valor do serviço)"""
-    return valor_servico * 0.20
\ No newline at end of file
+    return valor_servico * AgendamentoService.TAXA_CANCELAMENTO
+
+
+def _expressao_taxa_cancelamento(agora: datetime):
+    """
+    Mesma regra de _pode_cancelar_gratuito/_calcular_taxa_cancelamento como
+    expressão SQL, para calcular a taxa de vários agendamentos de uma vez
+    """
+    valor_servico = select(ServicoModel.valor).where(
+        ServicoModel.id == AgendamentoModel.id_servico
+    ).correlate_except(ServicoModel).scalar_subquery()
+    
+    return case(
+        (AgendamentoModel.dt_atendimento > agora + AgendamentoService.ANTECEDENCIA_CANCELAMENTO_GRATUITO, 0.0),
+        else_=valor_servico * AgendamentoService.TAXA_CANCELAMENTO
+    )
\ No newline at end of file
@@ -0,0 +1,310 @@
+"""
+Service de relatórios (ocupação, cancelamentos/faltas e previsão de demanda)
+
+Os agendamentos do período são lidos em colunas, sem objetos do ORM: um
+SELECT só com profissional, serviço, horário (segundos desde a época,
+calculado pelo banco) e status (código inteiro), lido em lotes
+(``yield_per``) e convertido para arrays NumPy. Todas as métricas são
+calculadas sobre os arrays (bincount, máscaras), sem laço por agendamento.
+
+As colunas e os relatórios ficam em cache por filial e período. O cache
+vale até ANALYTICS_CACHE_TTL segundos e enquanto nenhum evento novo entrar
+no outbox (``tb_evento``): conferir isso custa uma consulta pela chave
+primária.
+
+Status considerados: cancelado, concluido e faltou (não compareceu).
+Agendamentos passados ainda em "agendado" são contados como pendentes.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from itertools import chain
+from typing import Dict, Optional
+
+import numpy as np
+from flask import current_app
+from sqlalchemy import Integer, case, cast, func, select
+
+from src import db
+from src.models.agendamento_model import AgendamentoModel
+from src.models.evento_model import EventoModel
+from src.models.servicos_model import ServicoModel
+from src.utils.filiais import filial_atual
+
+# códigos de status nos arrays
+AGENDADO, CONCLUIDO, CANCELADO, FALTOU = 0, 1, 2, 3
+
+HORAS_SEMANA = 7 * 24
+SEGUNDOS_SEMANA = HORAS_SEMANA * 3600
+MINUTOS_SLOT = 30
+SLOTS_SEMANA = HORAS_SEMANA * 60 // MINUTOS_SLOT
+
+LOTE = 10_000  # linhas por lote na leitura em colunas
+MAX_PERIODOS = 16  # períodos guardados no cache (LRU)
+
+_cache: 'OrderedDict[tuple, Dict]' = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _epoch(coluna):
+    """Segundos desde 1970 calculados pelo banco (sem converter datetime linha a linha no Python)"""
+    dialeto = db.session.get_bind().dialect.name
+    if dialeto == 'mysql':
+        return cast(func.unix_timestamp(coluna), Integer)
+    if dialeto == 'postgresql':
+        return cast(func.extract('epoch', coluna), Integer)
+    return cast(func.strftime('%s', coluna), Integer)
+
+
+def _para_epoch(momento: datetime) -> int:
+    # datas são gravadas sem fuso: mesma conta que o banco faz (como se fosse UTC)
+    return int((momento - datetime(1970, 1, 1)).total_seconds())
+
+
+def _segunda_feira(dia: date) -> date:
+    return dia - timedelta(days=dia.weekday())
+
+
+def _duracoes() -> np.ndarray:
+    """Duração (min) por id de serviço, indexável com o array de serviços"""
+    from src.services.agendamento_services import _obter_duracao_servico
+
+    servicos = ServicoModel.query.all()
+    duracoes = np.full(max([s.id for s in servicos], default=0) + 1, 0, dtype=np.int32)
+    for servico in servicos:
+        duracoes[servico.id] = _obter_duracao_servico(servico)
+    return duracoes
+
+
+def _ler_colunas(inicio: date, fim: date) -> Dict[str, np.ndarray]:
+    """Agendamentos com atendimento em [inicio, fim] como arrays (leitura em lotes)"""
+    codigo_status = case(
+        (AgendamentoModel.status == 'cancelado', CANCELADO),
+        (AgendamentoModel.status == 'concluido', CONCLUIDO),
+        (AgendamentoModel.status == 'faltou', FALTOU),
+        else_=AGENDADO
+    )
+    consulta = select(
+        AgendamentoModel.id_profissional, AgendamentoModel.id_servico,
+        _epoch(AgendamentoModel.dt_atendimento), codigo_status
+    ).where(
+        AgendamentoModel.dt_atendimento >= datetime.combine(inicio, datetime.min.time()),
+        AgendamentoModel.dt_atendimento < datetime.combine(fim + timedelta(days=1), datetime.min.time())
+    )
+
+    # Core direto na conexão da sessão (mesma transação/filial), sem a camada de resultados do ORM;
+    # np.fromiter sobre os valores achatados evita o NumPy inspecionar cada Row
+    resultado = db.session.connection().execution_options(yield_per=LOTE).execute(consulta)
+    lotes = [np.fromiter(chain.from_iterable(linhas), dtype=np.int64, count=4 * len(linhas)).reshape(-1, 4)
+             for linhas in resultado.partitions()]
+    tabela = np.concatenate(lotes) if lotes else np.empty((0, 4), dtype=np.int64)
+
+    return {
+        'profissional': tabela[:, 0].astype(np.int32),
+        'servico': tabela[:, 1].astype(np.int32),
+        'epoch': tabela[:, 2],
+        'status': tabela[:, 3].astype(np.int8),
+    }
+
+
+def _periodo(inicio: date, fim: date) -> Dict:
+    """Entrada do cache do período (colunas + relatórios já calculados)"""
+    if fim < inicio:
+        raise Exception("Período inválido: fim antes do início")
+
+    chave = (filial_atual(), inicio, fim)
+    ttl = current_app.config.get('ANALYTICS_CACHE_TTL', 300)
+    ultimo_evento = db.session.query(func.max(EventoModel.id)).scalar() or 0
+
+    with _cache_lock:
+        entrada = _cache.get(chave)
+        if entrada and entrada['evento'] == ultimo_evento and time.monotonic() - entrada['lido_em'] < ttl:
+            _cache.move_to_end(chave)
+            return entrada
+
+    entrada = {
+        'evento': ultimo_evento,
+        'lido_em': time.monotonic(),
+        'colunas': _ler_colunas(inicio, fim),
+        'duracoes': _duracoes(),
+        'relatorios': {},
+    }
+    with _cache_lock:
+        _cache[chave] = entrada
+        _cache.move_to_end(chave)
+        while len(_cache) > MAX_PERIODOS:
+            _cache.popitem(last=False)
+    return entrada
+
+
+def _em_cache(inicio: date, fim: date, nome: str, calcular, *parametros):
+    entrada = _periodo(inicio, fim)
+    chave = (nome,) + parametros
+    if chave not in entrada['relatorios']:
+        entrada['relatorios'][chave] = calcular(entrada, inicio, fim, *parametros)
+    return entrada['relatorios'][chave]
+
+
+def invalidar_cache() -> None:
+    with _cache_lock:
+        _cache.clear()
+
+
+def ocupacao(inicio: date, fim: date, id_profissional: Optional[int] = None) -> Dict:
+    """
+    Mapa de calor por profissional: semanas x horas da semana (0 = segunda 00h).
+    Cada célula é a fração da hora ocupada por agendamentos não cancelados.
+    """
+    return _em_cache(inicio, fim, 'ocupacao', _calcular_ocupacao, id_profissional)
+
+
+def taxas(inicio: date, fim: date) -> Dict:
+    """Taxas de cancelamento e de falta no total, por profissional e por serviço"""
+    return _em_cache(inicio, fim, 'taxas', _calcular_taxas)
+
+
+def demanda(inicio: date, fim: date, semanas: int = 4) -> Dict:
+    """
+    Agendamentos (não cancelados) por semana completa e por serviço no
+    período e previsão para as semanas seguintes
+    """
+    return _em_cache(inicio, fim, 'demanda', _calcular_demanda, semanas)
+
+
+def _calcular_ocupacao(entrada, inicio: date, fim: date, id_profissional) -> Dict:
+    colunas = entrada['colunas']
+    origem = _segunda_feira(inicio)
+    semanas = (_segunda_feira(fim) - origem).days // 7 + 1
+
+    ativos = colunas['status'] != CANCELADO
+    if id_profissional is not None:
+        ativos &= colunas['profissional'] == id_profissional
+    profissionais, indice_prof = np.unique(colunas['profissional'][ativos], return_inverse=True)
+
+    # cada agendamento ocupa ceil(duração / 30) slots de 30 min a partir do slot de início
+    slot_inicio = (colunas['epoch'][ativos] - _para_epoch(datetime.combine(origem, datetime.min.time()))) \
+        // (MINUTOS_SLOT * 60)
+    n_slots = np.maximum(1, -(-entrada['duracoes'][colunas['servico'][ativos]] // MINUTOS_SLOT))
+    deslocamento = np.arange(n_slots.sum()) - np.repeat(np.cumsum(n_slots) - n_slots, n_slots)
+    slots = np.repeat(slot_inicio, n_slots) + deslocamento
+    profs = np.repeat(indice_prof, n_slots)
+    dentro = (slots >= 0) & (slots < semanas * SLOTS_SEMANA)
+
+    # contagem por (profissional, semana, slot) -> horas: 2 slots = 1 hora
+    celulas = np.bincount(profs[dentro] * semanas * SLOTS_SEMANA + slots[dentro],
+                          minlength=len(profissionais) * semanas * SLOTS_SEMANA)
+    horas = celulas.reshape(len(profissionais), semanas, HORAS_SEMANA, 60 // MINUTOS_SLOT).sum(axis=3)
+    fracao = np.minimum(horas / (60 // MINUTOS_SLOT), 1.0)
+
+    return {
+        'inicio': inicio.isoformat(),
+        'fim': fim.isoformat(),
+        'semanas': [(origem + timedelta(weeks=i)).isoformat() for i in range(semanas)],
+        'profissionais': [
+            {
+                'id_profissional': int(prof),
+                'ocupacao_media': round(float(fracao[i].mean()), 4),
+                'ocupacao': np.round(fracao[i], 3).tolist(),
+            }
+            for i, prof in enumerate(profissionais)
+        ],
+    }
+
+
+def _resumo_taxas(status: np.ndarray, ids: np.ndarray, agora: int, epoch: np.ndarray, chave: str):
+    """Contagens e taxas agrupadas por ``ids`` (um bincount por contagem)"""
+    valores, grupo = np.unique(ids, return_inverse=True)
+    tamanho = len(valores)
+    total = np.bincount(grupo, minlength=tamanho)
+    cancelados = np.bincount(grupo, weights=status == CANCELADO, minlength=tamanho)
+    concluidos = np.bincount(grupo, weights=status == CONCLUIDO, minlength=tamanho)
+    faltas = np.bincount(grupo, weights=status == FALTOU, minlength=tamanho)
+    pendentes = np.bincount(grupo, weights=(status == AGENDADO) & (epoch < agora), minlength=tamanho)
+    encerrados = concluidos + faltas
+    with np.errstate(divide='ignore', invalid='ignore'):
+        taxa_cancelamento = np.where(total > 0, cancelados / total, 0.0)
+        taxa_falta = np.where(encerrados > 0, faltas / encerrados, 0.0)
+
+    return [
+        {
+            chave: int(valores[i]),
+            'total': int(total[i]),
+            'cancelados': int(cancelados[i]),
+            'concluidos': int(concluidos[i]),
+            'faltas': int(faltas[i]),
+            'pendentes': int(pendentes[i]),
+            'taxa_cancelamento': round(float(taxa_cancelamento[i]), 4),
+            'taxa_falta': round(float(taxa_falta[i]), 4),
+        }
+        for i in range(tamanho)
+    ]
+
+
+def _calcular_taxas(entrada, inicio: date, fim: date) -> Dict:
+    colunas = entrada['colunas']
+    status, epoch = colunas['status'], colunas['epoch']
+    agora = _para_epoch(datetime.now())
+
+    geral = _resumo_taxas(status, np.zeros(len(status), dtype=np.int32), agora, epoch, 'grupo')
+    geral = geral[0] if geral else {'total': 0, 'cancelados': 0, 'concluidos': 0, 'faltas': 0,
+                                    'pendentes': 0, 'taxa_cancelamento': 0.0, 'taxa_falta': 0.0}
+    geral.pop('grupo', None)
+
+    return {
+        'inicio': inicio.isoformat(),
+        'fim': fim.isoformat(),
+        # taxa_falta = faltas / (concluídos + faltas): só agendamentos já encerrados
+        **geral,
+        'por_profissional': _resumo_taxas(status, colunas['profissional'], agora, epoch, 'id_profissional'),
+        'por_servico': _resumo_taxas(status, colunas['servico'], agora, epoch, 'id_servico'),
+    }
+
+
+def _holt(serie: np.ndarray, passos: int, alfa: float = 0.5, beta: float = 0.3) -> np.ndarray:
+    """
+    Suavização exponencial dupla (nível + tendência), vetorizada sobre as
+    linhas (serviços). A tendência começa em zero: poucas semanas de
+    histórico não bastam para estimá-la pela primeira diferença.
+    """
+    if serie.shape[1] == 0:
+        return np.zeros((len(serie), passos))
+    nivel = serie[:, 0].astype(float)
+    tendencia = np.zeros(len(serie))
+    for t in range(1, serie.shape[1]):
+        anterior = nivel
+        nivel = alfa * serie[:, t] + (1 - alfa) * (nivel + tendencia)
+        tendencia = beta * (nivel - anterior) + (1 - beta) * tendencia
+    return np.maximum(0.0, nivel[:, None] + tendencia[:, None] * np.arange(1, passos + 1))
+
+
+def _calcular_demanda(entrada, inicio: date, fim: date, semanas: int) -> Dict:
+    colunas = entrada['colunas']
+    # só semanas completas (segunda a domingo) dentro do período: semana parcial distorce a série
+    origem = inicio + timedelta(days=-inicio.weekday() % 7)
+    n_semanas = max(0, ((fim + timedelta(days=1)) - origem).days // 7)
+
+    semana = (colunas['epoch'] - _para_epoch(datetime.combine(origem, datetime.min.time()))) \
+        // SEGUNDOS_SEMANA
+    ativos = (colunas['status'] != CANCELADO) & (semana >= 0) & (semana < n_semanas)
+    servicos, indice = np.unique(colunas['servico'][ativos], return_inverse=True)
+    serie = np.bincount(indice * n_semanas + semana[ativos],
+                        minlength=len(servicos) * n_semanas).reshape(len(servicos), n_semanas)
+    previsao = _holt(serie, semanas)
+
+    proxima = origem + timedelta(weeks=n_semanas)
+    return {
+        'inicio': inicio.isoformat(),
+        'fim': fim.isoformat(),
+        'semanas': [(origem + timedelta(weeks=i)).isoformat() for i in range(n_semanas)],
+        'semanas_previstas': [(proxima + timedelta(weeks=i)).isoformat() for i in range(semanas)],
+        'servicos': [
+            {
+                'id_servico': int(servico),
+                'historico': serie[i].tolist(),
+                'previsao': np.round(previsao[i], 1).tolist(),
+            }
+            for i, servico in enumerate(servicos)
+        ],
+    }
@@ -0,0 +1,145 @@
+"""
+Auditoria de sobreposição de agendamentos (double booking)
+
+O check-then-insert de ``cadastrar_agendamento`` tem corrida e a duração
+dos serviços pode cair no padrão (``_obter_duracao_servico``): a tabela pode
+já ter dois agendamentos ativos do mesmo profissional no mesmo horário.
+
+A auditoria lê ``tb_agendamentos`` em lotes, já ordenada por profissional e
+início (ordem do índice ix_tb_agendamentos_profissional_atendimento, sem
+sort no banco), e passa uma linha de varredura: um heap com os
+agendamentos ainda em andamento, ordenado pelo fim. Cada linha nova tira
+do heap os que já acabaram e sobrepõe todos os que restam. Custo
+O(n log n + k) para k pares, memória proporcional aos agendamentos
+simultâneos de um profissional.
+"""
+
+import heapq
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+from sqlalchemy import select
+
+from src import db
+from src.models.agendamento_model import AgendamentoModel
+from src.models.servicos_model import ServicoModel
+
+LOTE = 10_000
+
+# (id_profissional, id_a, inicio_a, fim_a, id_b, inicio_b, fim_b); a começa antes (ou junto) de b
+Par = Tuple[int, int, datetime, datetime, int, datetime, datetime]
+
+
+def varrer(linhas: Iterable[Tuple[int, int, datetime, datetime]]) -> Iterator[Par]:
+    """
+    Todos os pares sobrepostos de ``linhas`` = (id, id_profissional, inicio, fim),
+    que devem vir ordenadas por (id_profissional, inicio).
+    """
+    ativos = []  # heap de (fim, id, inicio) do profissional atual
+    profissional = anterior = None
+    for id_agendamento, id_profissional, inicio, fim in linhas:
+        if id_profissional != profissional:
+            ativos = []
+            profissional, anterior = id_profissional, None
+        elif inicio < anterior:
+            raise ValueError('Agendamentos fora de ordem (esperado: profissional, início)')
+        anterior = inicio
+
+        while ativos and ativos[0][0] <= inicio:
+            heapq.heappop(ativos)
+        for fim_b, id_b, inicio_b in ativos:
+            yield id_profissional, id_b, inicio_b, fim_b, id_agendamento, inicio, fim
+        heapq.heappush(ativos, (fim, id_agendamento, inicio))
+
+
+class Auditoria:
+    """
+    Itera os pares sobrepostos (à medida que são encontrados) e acumula o
+    resumo em ``resumo()`` — use depois de consumir o iterador.
+    """
+
+    def __init__(self, inicio: Optional[datetime] = None, fim: Optional[datetime] = None,
+                 id_profissional: Optional[int] = None, lote: int = LOTE):
+        self.inicio = inicio
+        self.fim = fim
+        self.id_profissional = id_profissional
+        self.lote = lote
+        self.linhas = 0
+        self.profissionais = set()
+        self.pares = 0
+        self.envolvidos = set()
+        self.servicos_duracao_padrao = []
+        self.segundos = 0.0
+
+    def _duracoes(self) -> Dict[int, timedelta]:
+        from src.services.agendamento_services import _obter_duracao_servico
+
+        # mesma duração que o cadastro usa; serviços sem duração caem no padrão (e vão para o resumo)
+        duracoes = {}
+        for servico in ServicoModel.query.all():
+            duracoes[servico.id] = timedelta(minutes=_obter_duracao_servico(servico))
+            if not getattr(servico, 'duracao', None):
+                self.servicos_duracao_padrao.append(servico.id)
+        return duracoes
+
+    def _linhas(self, duracoes: Dict[int, timedelta]) -> Iterator[Tuple[int, int, datetime, datetime]]:
+        from src.services.agendamento_services import AgendamentoService
+
+        padrao = timedelta(minutes=AgendamentoService.DURACAO_PADRAO)
+        consulta = select(
+            AgendamentoModel.id, AgendamentoModel.id_profissional,
+            AgendamentoModel.dt_atendimento, AgendamentoModel.id_servico
+        ).where(
+            AgendamentoModel.status != 'cancelado'
+        ).order_by(
+            AgendamentoModel.id_profissional, AgendamentoModel.dt_atendimento, AgendamentoModel.id
+        )
+        if self.id_profissional is not None:
+            consulta = consulta.where(AgendamentoModel.id_profissional == self.id_profissional)
+        if self.inicio is not None:
+            consulta = consulta.where(AgendamentoModel.dt_atendimento >= self.inicio)
+        if self.fim is not None:
+            consulta = consulta.where(AgendamentoModel.dt_atendimento < self.fim)
+
+        # Core na conexão da sessão: lotes de linhas, sem objetos do ORM
+        resultado = db.session.connection().execution_options(yield_per=self.lote).execute(consulta)
+        for linhas in resultado.partitions():
+            self.linhas += len(linhas)
+            for id_agendamento, id_profissional, inicio, id_servico in linhas:
+                yield id_agendamento, id_profissional, inicio, inicio + duracoes.get(id_servico, padrao)
+
+    def __iter__(self) -> Iterator[Par]:
+        comeco = time.perf_counter()
+        try:
+            for par in varrer(self._linhas(self._duracoes())):
+                self.pares += 1
+                self.profissionais.add(par[0])
+                self.envolvidos.update((par[1], par[4]))
+                yield par
+        finally:
+            self.segundos = time.perf_counter() - comeco
+
+    def resumo(self) -> Dict:
+        return {
+            'agendamentos_lidos': self.linhas,
+            'pares_sobrepostos': self.pares,
+            'agendamentos_envolvidos': len(self.envolvidos),
+            'profissionais_afetados': sorted(self.profissionais),
+            'servicos_com_duracao_padrao': self.servicos_duracao_padrao,
+            'segundos': round(self.segundos, 3),
+        }
+
+
+def dados_par(par: Par) -> Dict:
+    id_profissional, id_a, inicio_a, fim_a, id_b, inicio_b, fim_b = par
+    return {
+        'id_profissional': id_profissional,
+        'id_agendamento_a': id_a,
+        'inicio_a': inicio_a.isoformat(),
+        'fim_a': fim_a.isoformat(),
+        'id_agendamento_b': id_b,
+        'inicio_b': inicio_b.isoformat(),
+        'fim_b': fim_b.isoformat(),
+        'minutos_sobrepostos': (min(fim_a, fim_b) - inicio_b).total_seconds() / 60,
+    }
@@ -0,0 +1,122 @@
+"""
+Service de busca de usuários (nome, email, telefone) e serviços (descrição)
+
+Busca por prefixo em cada palavra digitada ("jo sil" encontra "João da
+Silva"), ordenada por relevância e paginada. Usa o índice do banco (veja
+``src.models.busca_model``): FTS5 + bm25 no SQLite, FULLTEXT em modo
+booleano no MySQL; outros bancos caem em LIKE por prefixo, sem ranking.
+"""
+
+import re
+from typing import Dict, List, Tuple
+
+from sqlalchemy import or_, text
+
+from src import db
+from src.models.servicos_model import ServicoModel
+from src.models.usuario_model import UsuarioModel
+
+TIPOS = ('usuario', 'servico')
+MAX_PALAVRAS = 8
+
+# pesos do bm25 por coluna (nome pesa mais que email, que pesa mais que telefone)
+_SQLITE = {
+    'usuario': "SELECT 'usuario' AS tipo, rowid AS id, bm25(tb_usuario_busca, 10.0, 5.0, 1.0, 1.0) AS relevancia "
+               "FROM tb_usuario_busca WHERE tb_usuario_busca MATCH :consulta",
+    'servico': "SELECT 'servico' AS tipo, rowid AS id, bm25(tb_servico_busca) AS relevancia "
+               "FROM tb_servico_busca WHERE tb_servico_busca MATCH :consulta",
+}
+
+# MATCH ... AGAINST devolve relevância maior = melhor; negada para ordenar como o bm25 (menor = melhor)
+_MYSQL = {
+    'usuario': "SELECT 'usuario' AS tipo, id, -MATCH(nome, email, telefone) AGAINST (:consulta IN BOOLEAN MODE) AS relevancia "
+               "FROM tb_usuario WHERE MATCH(nome, email, telefone) AGAINST (:consulta IN BOOLEAN MODE)",
+    'servico': "SELECT 'servico' AS tipo, id, -MATCH(descricao) AGAINST (:consulta IN BOOLEAN MODE) AS relevancia "
+               "FROM tb_servico WHERE MATCH(descricao) AGAINST (:consulta IN BOOLEAN MODE)",
+}
+
+
+def _palavras(termo: str) -> List[str]:
+    # só letras/dígitos: nada da sintaxe de consulta do FTS chega ao banco
+    return re.findall(r'\w+', termo.lower())[:MAX_PALAVRAS]
+
+
+def _consulta(dialeto: str, palavras: List[str]) -> str:
+    if dialeto == 'mysql':
+        return ' '.join(f'+{p}*' for p in palavras)
+    return ' '.join(f'"{p}"*' for p in palavras)
+
+
+def _ranking_indice(dialeto: str, tipos, palavras, limite: int, deslocamento: int) -> List[Tuple[str, int, float]]:
+    """(tipo, id, relevância) da página, em uma única consulta ao índice"""
+    consultas = _MYSQL if dialeto == 'mysql' else _SQLITE
+    sql = ' UNION ALL '.join(consultas[tipo] for tipo in tipos)
+    linhas = db.session.execute(
+        text(f'{sql} ORDER BY relevancia, id LIMIT :limite OFFSET :deslocamento'),
+        {'consulta': _consulta(dialeto, palavras), 'limite': limite, 'deslocamento': deslocamento}
+    ).all()
+    return [(tipo, id_, float(relevancia)) for tipo, id_, relevancia in linhas]
+
+
+def _ranking_like(tipos, palavras, limite: int, deslocamento: int) -> List[Tuple[str, int, float]]:
+    """Alternativa sem índice textual: todas as palavras como prefixo de alguma coluna"""
+    resultados = []
+    colunas = {
+        'usuario': (UsuarioModel, (UsuarioModel.nome, UsuarioModel.email, UsuarioModel.telefone), UsuarioModel.nome),
+        'servico': (ServicoModel, (ServicoModel.descricao,), ServicoModel.descricao),
+    }
+    for tipo in tipos:
+        modelo, campos, ordem = colunas[tipo]
+        filtros = [or_(*[or_(campo.ilike(f'{p}%'), campo.ilike(f'% {p}%')) for campo in campos]) for p in palavras]
+        ids = db.session.query(modelo.id).filter(*filtros).order_by(ordem).limit(limite + deslocamento)
+        resultados += [(tipo, id_, 0.0) for (id_,) in ids]
+    return resultados[deslocamento:deslocamento + limite]
+
+
+def _dados(tipos_ids: List[Tuple[str, int, float]]) -> Dict[Tuple[str, int], Dict]:
+    """Carrega os registros da página (uma consulta por tipo, pela chave primária)"""
+    dados = {}
+    ids_usuarios = [id_ for tipo, id_, _ in tipos_ids if tipo == 'usuario']
+    if ids_usuarios:
+        for u in db.session.query(UsuarioModel.id, UsuarioModel.nome, UsuarioModel.email,
+                                  UsuarioModel.telefone).filter(UsuarioModel.id.in_(ids_usuarios)):
+            dados[('usuario', u.id)] = {'id': u.id, 'nome': u.nome, 'email': u.email, 'telefone': u.telefone}
+
+    ids_servicos = [id_ for tipo, id_, _ in tipos_ids if tipo == 'servico']
+    if ids_servicos:
+        for s in db.session.query(ServicoModel.id, ServicoModel.descricao,
+                                  ServicoModel.valor).filter(ServicoModel.id.in_(ids_servicos)):
+            dados[('servico', s.id)] = {'id': s.id, 'descricao': s.descricao, 'valor': s.valor}
+    return dados
+
+
+def buscar(termo: str, tipos=TIPOS, pagina: int = 1, por_pagina: int = 20) -> Dict:
+    """
+    Busca ranqueada e paginada em usuários e/ou serviços.
+    ``tem_mais`` indica se há próxima página (busca uma linha a mais em vez de COUNT).
+    """
+    tipos = [tipo for tipo in TIPOS if tipo in tipos]
+    if not tipos:
+        raise Exception(f"Tipo de busca inválido (use {', '.join(TIPOS)})")
+
+    palavras = _palavras(termo or '')
+    resposta = {'q': termo, 'pagina': pagina, 'por_pagina': por_pagina, 'tem_mais': False, 'resultados': []}
+    if not palavras:
+        return resposta
+
+    deslocamento = (pagina - 1) * por_pagina
+    dialeto = db.engine.dialect.name
+    if dialeto in ('sqlite', 'mysql'):
+        pagina_atual = _ranking_indice(dialeto, tipos, palavras, por_pagina + 1, deslocamento)
+    else:
+        pagina_atual = _ranking_like(tipos, palavras, por_pagina + 1, deslocamento)
+
+    resposta['tem_mais'] = len(pagina_atual) > por_pagina
+    pagina_atual = pagina_atual[:por_pagina]
+
+    dados = _dados(pagina_atual)
+    resposta['resultados'] = [
+        {'tipo': tipo, 'relevancia': relevancia, **dados[(tipo, id_)]}
+        for tipo, id_, relevancia in pagina_atual if (tipo, id_) in dados
+    ]
+    return resposta
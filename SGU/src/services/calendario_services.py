@@ -0,0 +1,360 @@
+"""
+Service dos calendários .ics (assinatura da agenda em apps de calendário)
+
+Cada profissional e cada cliente tem um feed iCalendar. Os apps consultam o
+feed a cada poucos minutos, então o feed montado fica em memória, por
+filial e dono, e é atualizado de forma incremental pelo outbox
+(``tb_evento``): cada evento de agendamento traz o estado completo, e só os
+VEVENTs daquele agendamento são refeitos.
+
+Uma consulta ao feed em cache não vai ao banco: o outbox só é relido quando
+um commit deste processo gravou eventos ou a cada ICS_REVALIDACAO_SEGUNDOS
+(para enxergar escritas de outros processos). Com o ETag fraco (hash do
+estado dos agendamentos, igual em todos os processos) e o Last-Modified, a
+view responde 304 à maioria das consultas.
+
+O link do feed leva um token assinado (filial, tipo, id do dono e versão do
+link): apps de calendário não mandam o cabeçalho Authorization. O token não
+expira (o app guarda a URL); para revogar um link vazado gera-se outro
+(``emitir_token(..., rotacionar=True)``), o que incrementa a versão do dono
+em ``tb_calendario_link`` e invalida os anteriores: neste processo na hora,
+nos demais em até ICS_REVALIDACAO_SEGUNDOS.
+"""
+
+import hashlib
+import threading
+import time as relogio
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Optional, Tuple
+
+from flask import current_app
+from itsdangerous import BadSignature, URLSafeSerializer
+
+from src import db
+from src.models.agendamento_model import AgendamentoModel
+from src.models.calendario_link_model import CalendarioLinkModel
+from src.models.profissional_model import ProfissionalModel
+from src.models.servicos_model import ServicoModel
+from src.models.usuario_model import UsuarioModel
+from src.services import evento_services
+from src.utils.filiais import filial_atual
+
+TIPOS = {'usuario': UsuarioModel, 'profissional': ProfissionalModel}
+SALT = 'sgu-calendario'
+LOTE_EVENTOS = 500
+
+# (inicio, fim, resumo, descrição) de um agendamento no feed
+Estado = Tuple[datetime, datetime, str, str]
+# o que a view devolve: (corpo, etag, última modificação)
+Versao = Tuple[bytes, str, datetime]
+
+
+class _Feed:
+    def __init__(self, titulo: str):
+        self.titulo = titulo
+        self.estados: Dict[int, Estado] = {}
+        self.blocos: Dict[int, str] = {}
+        self.versao: Optional[Versao] = None
+
+    def alterar(self, id_agendamento: int, estado: Optional[Estado], agora: datetime) -> bool:
+        """Aplica o estado (None = remove); True se o feed mudou"""
+        if self.estados.get(id_agendamento) == estado:
+            return False
+        if estado is None:
+            del self.estados[id_agendamento]
+            del self.blocos[id_agendamento]
+        else:
+            self.estados[id_agendamento] = estado
+            self.blocos[id_agendamento] = _vevent(id_agendamento, estado, agora)
+        return True
+
+    def renderizar(self, agora: datetime) -> None:
+        ids = sorted(self.estados, key=lambda id_agendamento: (self.estados[id_agendamento][0], id_agendamento))
+        corpo = ''.join([
+            _linhas(('BEGIN:VCALENDAR', 'VERSION:2.0', 'PRODID:-//SGU//Agenda//PT-BR', 'CALSCALE:GREGORIAN',
+                     f'X-WR-CALNAME:{_escapar(self.titulo)}', 'X-PUBLISHED-TTL:PT15M')),
+            *[self.blocos[id_agendamento] for id_agendamento in ids],
+            _linhas(('END:VCALENDAR',)),
+        ]).encode()
+        # ETag fraco: mesmo estado = mesmo ETag em qualquer processo (o DTSTAMP pode variar)
+        etag = hashlib.blake2b(repr([(i, self.estados[i]) for i in ids]).encode(), digest_size=16).hexdigest()
+        # Last-Modified nunca volta nem repete o segundo anterior (resolução do HTTP)
+        modificado_em = agora.replace(microsecond=0)
+        if self.versao is not None and modificado_em <= self.versao[2]:
+            modificado_em = self.versao[2] + timedelta(seconds=1)
+        self.versao = (corpo, etag, modificado_em)
+
+
+class _EstadoFilial:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.feeds: 'OrderedDict[Tuple[str, int], _Feed]' = OrderedDict()
+        self.ultimo_evento: Optional[int] = None
+        self.verificado_em = float('-inf')
+        self.pendente = False
+        # (tipo, id do dono) -> (versão do link, instante da leitura)
+        self.links: Dict[Tuple[str, int], Tuple[int, float]] = {}
+
+
+_filiais: Dict[Optional[str], _EstadoFilial] = {}
+_filiais_lock = threading.Lock()
+
+
+def _estado_filial() -> _EstadoFilial:
+    filial = filial_atual()
+    estado = _filiais.get(filial)
+    if estado is None:
+        with _filiais_lock:
+            estado = _filiais.setdefault(filial, _EstadoFilial())
+    return estado
+
+
+@evento_services.ao_commit
+def _marcar_pendente() -> None:
+    # commit deste processo com eventos: a próxima consulta relê o outbox
+    _estado_filial().pendente = True
+
+
+def _escapar(texto: str) -> str:
+    return (texto.replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+            .replace('\r\n', '\\n').replace('\n', '\\n'))
+
+
+def _dobrar(linha: str) -> str:
+    """Linhas de no máximo 75 octetos (RFC 5545), continuação começando com espaço"""
+    if len(linha.encode()) <= 75:
+        return linha
+    partes, atual = [], ''
+    for caractere in linha:
+        if len((atual + caractere).encode()) > (75 if not partes else 74):
+            partes.append(atual)
+            atual = ''
+        atual += caractere
+    partes.append(atual)
+    return '\r\n '.join(partes)
+
+
+def _linhas(linhas: Iterable[str]) -> str:
+    return ''.join(_dobrar(linha) + '\r\n' for linha in linhas)
+
+
+def _data_ics(momento: datetime) -> str:
+    # horário local sem fuso ("floating"), como gravado no banco
+    return momento.strftime('%Y%m%dT%H%M%S')
+
+
+def _vevent(id_agendamento: int, estado: Estado, agora: datetime) -> str:
+    inicio, fim, resumo, descricao = estado
+    filial = filial_atual()
+    return _linhas((
+        'BEGIN:VEVENT',
+        f'UID:agendamento-{id_agendamento}{"-" + filial if filial else ""}@sgu',
+        f'DTSTAMP:{_data_ics(agora)}Z',
+        f'DTSTART:{_data_ics(inicio)}',
+        f'DTEND:{_data_ics(fim)}',
+        f'SUMMARY:{_escapar(resumo)}',
+        f'DESCRIPTION:{_escapar(descricao)}',
+        'STATUS:CONFIRMED',
+        'END:VEVENT',
+    ))
+
+
+def _servicos() -> Dict[int, Tuple[str, int]]:
+    """(descrição, duração em min) por id de serviço"""
+    from src.services.agendamento_services import _obter_duracao_servico
+
+    return {s.id: (s.descricao, _obter_duracao_servico(s)) for s in ServicoModel.query.all()}
+
+
+def _estado(tipo: str, inicio: datetime, id_servico: int, profissional: str, cliente: str,
+            servicos: Dict[int, Tuple[str, int]]) -> Estado:
+    from src.services.agendamento_services import AgendamentoService
+
+    descricao, duracao = servicos.get(id_servico, ('Atendimento', AgendamentoService.DURACAO_PADRAO))
+    contraparte = f'Profissional: {profissional}' if tipo == 'usuario' else f'Cliente: {cliente}'
+    return inicio, inicio + timedelta(minutes=duracao), descricao, contraparte
+
+
+def _construir(tipo: str, id_dono: int) -> _Feed:
+    """Feed a partir dos agendamentos ativos do dono (desde ICS_DIAS_PASSADOS dias atrás)"""
+    dono = db.session.get(TIPOS[tipo], id_dono)
+    if not dono:
+        raise LookupError(f'{tipo.capitalize()} não encontrado')
+
+    coluna = AgendamentoModel.id_user if tipo == 'usuario' else AgendamentoModel.id_profissional
+    desde = datetime.now() - timedelta(days=current_app.config.get('ICS_DIAS_PASSADOS', 30))
+    linhas = db.session.query(
+        AgendamentoModel.id, AgendamentoModel.dt_atendimento, AgendamentoModel.id_servico,
+        ProfissionalModel.nome, UsuarioModel.nome
+    ).join(
+        ProfissionalModel, ProfissionalModel.id == AgendamentoModel.id_profissional
+    ).join(
+        UsuarioModel, UsuarioModel.id == AgendamentoModel.id_user
+    ).filter(
+        coluna == id_dono,
+        AgendamentoModel.status != 'cancelado',
+        AgendamentoModel.dt_atendimento >= desde
+    ).all()
+
+    servicos = _servicos()
+    agora = datetime.utcnow()
+    feed = _Feed(f'Agenda - {dono.nome}')
+    for id_agendamento, inicio, id_servico, profissional, cliente in linhas:
+        feed.alterar(id_agendamento, _estado(tipo, inicio, id_servico, profissional, cliente, servicos), agora)
+    feed.renderizar(agora)
+    return feed
+
+
+def _aplicar(estado_filial: _EstadoFilial, eventos) -> None:
+    """Refaz, nos feeds em cache, os agendamentos citados pelos eventos"""
+    feeds = estado_filial.feeds
+    ids_cacheados = {id_agendamento for feed in feeds.values() for id_agendamento in feed.estados}
+    relevantes = [
+        e.dados for e in eventos
+        if e.tipo.startswith('agendamento.') and (
+            e.id_agendamento in ids_cacheados or ('usuario', e.dados['id_user']) in feeds
+            or ('profissional', e.dados['id_profissional']) in feeds)
+    ]
+    if not relevantes:
+        return
+
+    # nomes de todos os agendamentos do lote em duas consultas
+    profissionais = dict(db.session.query(ProfissionalModel.id, ProfissionalModel.nome).filter(
+        ProfissionalModel.id.in_({d['id_profissional'] for d in relevantes})))
+    clientes = dict(db.session.query(UsuarioModel.id, UsuarioModel.nome).filter(
+        UsuarioModel.id.in_({d['id_user'] for d in relevantes})))
+    servicos = _servicos()
+
+    agora = datetime.utcnow()
+    alterados = set()
+    for dados in relevantes:
+        id_agendamento = dados['id']
+        donos = {('usuario', dados['id_user']), ('profissional', dados['id_profissional'])}
+        for chave, feed in feeds.items():
+            novo = None
+            if chave in donos and dados['status'] != 'cancelado':
+                novo = _estado(chave[0], datetime.fromisoformat(dados['dt_atendimento']), dados['id_servico'],
+                               profissionais.get(dados['id_profissional'], ''),
+                               clientes.get(dados['id_user'], ''), servicos)
+            elif id_agendamento not in feed.estados:
+                continue
+            if feed.alterar(id_agendamento, novo, agora):
+                alterados.add(chave)
+
+    for chave in alterados:
+        feeds[chave].renderizar(agora)
+
+
+def _sincronizar(estado_filial: _EstadoFilial) -> None:
+    """Lê o outbox se houve commit local com eventos ou se a revalidação venceu"""
+    intervalo = current_app.config.get('ICS_REVALIDACAO_SEGUNDOS', 30)
+    if not estado_filial.pendente and relogio.monotonic() - estado_filial.verificado_em < intervalo:
+        return
+
+    # antes da leitura: um commit durante a sincronização marca de novo
+    estado_filial.pendente = False
+    estado_filial.verificado_em = relogio.monotonic()
+
+    if estado_filial.ultimo_evento is None or not estado_filial.feeds:
+        # nada em cache para atualizar: só avança o cursor
+        estado_filial.ultimo_evento = evento_services.ultimo_evento_id()
+        return
+
+    while True:
+        eventos = evento_services.listar_eventos(estado_filial.ultimo_evento, LOTE_EVENTOS)
+        if not eventos:
+            return
+        _aplicar(estado_filial, eventos)
+        estado_filial.ultimo_evento = eventos[-1].id
+        if len(eventos) < LOTE_EVENTOS:
+            return
+
+
+def _versao_atual(tipo: str, id_dono: int) -> int:
+    return db.session.query(CalendarioLinkModel.versao).filter_by(tipo=tipo, id_dono=id_dono).scalar() or 0
+
+
+def _versao_link(estado_filial: _EstadoFilial, tipo: str, id_dono: int) -> int:
+    """Versão do link do dono, relida do banco a cada ICS_REVALIDACAO_SEGUNDOS (rotação em outro processo)"""
+    intervalo = current_app.config.get('ICS_REVALIDACAO_SEGUNDOS', 30)
+    versao, lido_em = estado_filial.links.get((tipo, id_dono), (0, float('-inf')))
+    if relogio.monotonic() - lido_em >= intervalo:
+        versao = _versao_atual(tipo, id_dono)
+        estado_filial.links[(tipo, id_dono)] = (versao, relogio.monotonic())
+    return versao
+
+
+def feed(tipo: str, id_dono: int, versao_link: int = 0) -> Versao:
+    """
+    (corpo, etag, última modificação) do feed; sem consulta ao banco quando
+    está em cache e atualizado. Link de versão antiga (rotacionado) levanta LookupError.
+    """
+    if tipo not in TIPOS:
+        raise LookupError('Tipo de calendário inválido')
+
+    estado_filial = _estado_filial()
+    with estado_filial.lock:
+        if _versao_link(estado_filial, tipo, id_dono) != versao_link:
+            raise LookupError('Calendário não encontrado')
+        _sincronizar(estado_filial)
+
+        chave = (tipo, id_dono)
+        atual = estado_filial.feeds.get(chave)
+        if atual is not None:
+            estado_filial.feeds.move_to_end(chave)
+            return atual.versao
+
+        atual = estado_filial.feeds[chave] = _construir(tipo, id_dono)
+        while len(estado_filial.feeds) > current_app.config.get('ICS_MAX_FEEDS', 1000):
+            estado_filial.feeds.popitem(last=False)
+        return atual.versao
+
+
+def invalidar_cache() -> None:
+    """Descarta os feeds da filial atual (remontados na próxima consulta)"""
+    estado_filial = _estado_filial()
+    with estado_filial.lock:
+        estado_filial.feeds.clear()
+
+
+def _serializador() -> URLSafeSerializer:
+    chave = current_app.config.get('SECRET_KEY')
+    if not chave:
+        raise RuntimeError('SECRET_KEY não configurada')
+    return URLSafeSerializer(chave, salt=SALT)
+
+
+def emitir_token(tipo: str, id_dono: int, rotacionar: bool = False) -> str:
+    """
+    Token do link de assinatura (não expira: o app de calendário guarda a URL).
+    ``rotacionar``: nova versão do link; os tokens anteriores do dono deixam de valer.
+    """
+    if not rotacionar:
+        versao = _versao_atual(tipo, id_dono)
+    else:
+        registro = db.session.get(CalendarioLinkModel, (tipo, id_dono))
+        if registro is None:
+            registro = CalendarioLinkModel(tipo=tipo, id_dono=id_dono, versao=1)
+            db.session.add(registro)
+        else:
+            registro.versao = CalendarioLinkModel.versao + 1  # incremento no UPDATE (rotações simultâneas)
+        db.session.commit()
+        versao = registro.versao
+
+        estado_filial = _estado_filial()
+        with estado_filial.lock:
+            estado_filial.links[(tipo, id_dono)] = (versao, relogio.monotonic())
+
+    return _serializador().dumps({'tipo': tipo, 'id': id_dono, 'filial': filial_atual(), 'v': versao})
+
+
+def ler_token(token: str) -> Optional[Dict]:
+    try:
+        dados = _serializador().loads(token)
+    except BadSignature:
+        return None
+    if dados.get('tipo') not in TIPOS:
+        return None
+    dados.setdefault('v', 0)  # links emitidos antes da rotação valem como versão 0
+    return dados
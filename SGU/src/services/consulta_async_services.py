@@ -0,0 +1,121 @@
+"""
+Versões assíncronas das consultas de leitura de agendamentos e usuários
+Mesma regra de negócio dos services síncronos, executadas com AsyncSession
+"""
+
+import asyncio
+from datetime import datetime, time, timedelta
+from typing import Dict, List
+
+from sqlalchemy import select
+
+from src.entities.usuario import Usuario
+from src.models.agendamento_model import AgendamentoModel
+from src.models.profissional_model import ProfissionalModel
+from src.models.servicos_model import ServicoModel
+from src.models.usuario_model import UsuarioModel
+from src.services import horario_services
+from src.services.agendamento_services import (
+    _gerar_horarios_disponiveis,
+    _marcar_horarios_ocupados,
+    _obter_duracao_servico,
+)
+from src.utils.async_db import no_loop_do_banco, sessao_async
+
+
+def _para_entidade(usuario_db):
+    return Usuario(usuario_db.nome, usuario_db.email, usuario_db.telefone, usuario_db.senha)
+
+
+@no_loop_do_banco
+async def listar_agendamentos() -> List:
+    """Lista todos os agendamentos"""
+    async with sessao_async() as sessao:
+        return (await sessao.scalars(select(AgendamentoModel))).all()
+
+
+@no_loop_do_banco
+async def listar_agendamento_id(agendamento_id: int):
+    """Lista um agendamento específico por ID"""
+    async with sessao_async() as sessao:
+        return await sessao.get(AgendamentoModel, agendamento_id)
+
+
+@no_loop_do_banco
+async def listar_agendamentos_usuario(user_id: int, status: str = None) -> List:
+    """Lista agendamentos de um usuário específico"""
+    consulta = select(AgendamentoModel).where(AgendamentoModel.id_user == user_id)
+    if status:
+        consulta = consulta.where(AgendamentoModel.status == status)
+
+    async with sessao_async() as sessao:
+        return (await sessao.scalars(consulta)).all()
+
+
+async def listar_horarios_disponiveis(profissional_id: int, data_str: str) -> Dict:
+    """
+    Lista horários disponíveis para um profissional em uma data específica
+    Agendamentos e serviços vêm numa única consulta (JOIN)
+    """
+    return (await listar_horarios_periodo(profissional_id, data_str, 1))[0]
+
+
+async def listar_horarios_periodo(profissional_id: int, data_str: str, dias: int) -> List[Dict]:
+    """Consulta vários dias em paralelo (uma conexão por dia)"""
+    inicio = datetime.strptime(data_str, '%Y-%m-%d').date()
+    datas = [inicio + timedelta(days=i) for i in range(dias)]
+    # máscaras de expediente vêm do cache compilado, ainda na thread da requisição
+    return await _horarios_dos_dias(
+        profissional_id, [(data, horario_services.mascara_do_dia(profissional_id, data)) for data in datas])
+
+
+@no_loop_do_banco
+async def _horarios_dos_dias(profissional_id: int, datas_mascaras) -> List[Dict]:
+    return list(await asyncio.gather(
+        *(_horarios_do_dia(profissional_id, data, mascara) for data, mascara in datas_mascaras)))
+
+
+async def _horarios_do_dia(profissional_id: int, data, mascara: int) -> Dict:
+    async with sessao_async() as sessao:
+        if not await sessao.get(ProfissionalModel, profissional_id):
+            raise Exception("Profissional não encontrado")
+
+        resultado = await sessao.execute(
+            select(AgendamentoModel.dt_atendimento, ServicoModel)
+            .join(ServicoModel, ServicoModel.id == AgendamentoModel.id_servico)
+            .where(
+                AgendamentoModel.id_profissional == profissional_id,
+                AgendamentoModel.dt_atendimento >= datetime.combine(data, time.min),
+                AgendamentoModel.dt_atendimento <= datetime.combine(data, time.max),
+                AgendamentoModel.status != 'cancelado',
+            )
+        )
+        horarios_ocupados = _marcar_horarios_ocupados(
+            (inicio, _obter_duracao_servico(servico)) for inicio, servico in resultado
+        )
+
+    return {
+        "data": data.isoformat(),
+        "horarios_disponiveis": _gerar_horarios_disponiveis(data, horarios_ocupados, mascara)
+    }
+
+
+@no_loop_do_banco
+async def listar_usuario() -> List[Usuario]:
+    async with sessao_async() as sessao:
+        return [_para_entidade(u) for u in (await sessao.scalars(select(UsuarioModel))).all()]
+
+
+@no_loop_do_banco
+async def listar_usuario_id(id):
+    async with sessao_async() as sessao:
+        usuario_db = await sessao.get(UsuarioModel, id)
+        return _para_entidade(usuario_db) if usuario_db else None
+
+
+@no_loop_do_banco
+async def listar_usuario_email(email):
+    async with sessao_async() as sessao:
+        usuario_db = (await sessao.scalars(select(UsuarioModel).where(
+            UsuarioModel.email_canonical == UsuarioModel.normalizar_email(email)))).first()
+        return _para_entidade(usuario_db) if usuario_db else None
@@ -0,0 +1,144 @@
+"""
+Outbox de eventos dos agendamentos
+
+Os services de agendamento gravam o evento em ``tb_evento`` na mesma
+transação da alteração: se o commit falhar, o evento também não existe.
+Consumidores (lembretes, analytics, caches) leem de forma incremental pelo
+id do último evento visto, em vez de reler ``listar_agendamentos``.
+Leitores em long-poll são acordados no commit (mesmo processo) e, para
+commits de outros processos, consultam o banco a cada
+EVENTOS_INTERVALO_CONSULTA segundos.
+
+O cursor é o id, mas id maior não quer dizer commit depois: no MySQL
+(InnoDB) o id é reservado no INSERT e duas transações podem fazer commit
+fora de ordem (o evento 11 aparece antes do 10). Um consumidor que
+avançasse para 11 nunca receberia o 10. Por isso a leitura para antes da
+primeira lacuna de ids cujo evento seguinte ainda é recente (menos de
+EVENTOS_ESPERA_LACUNA segundos): o 10 e o 11 vêm na consulta seguinte.
+Lacuna mais antiga que isso é id perdido em rollback e é pulada. No sqlite
+as escritas são serializadas e as lacunas só vêm de rollback.
+"""
+
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, List
+
+from flask import current_app
+from sqlalchemy import event, insert
+
+from src import db
+from src.models.evento_model import EventoModel
+
+AGENDAMENTO_CRIADO = 'agendamento.criado'
+AGENDAMENTO_EDITADO = 'agendamento.editado'
+AGENDAMENTO_CANCELADO = 'agendamento.cancelado'
+# vaga liberada oferecida a um pedido da lista de espera (id_agendamento = o cancelado)
+VAGA_OFERECIDA = 'lista_espera.vaga_oferecida'
+
+_novos_eventos = threading.Condition()
+# chamados após o commit de uma transação com eventos (ex.: caches do processo)
+_ouvintes_commit: List[Callable[[], None]] = []
+
+
+def dados_agendamento(agendamento) -> Dict:
+    """Estado do agendamento gravado no evento"""
+    return {
+        'id': agendamento.id,
+        'dt_atendimento': agendamento.dt_atendimento.isoformat(),
+        'id_user': agendamento.id_user,
+        'id_profissional': agendamento.id_profissional,
+        'id_servico': agendamento.id_servico,
+        'status': agendamento.status,
+        'valor_total': agendamento.valor_total,
+        'taxa_cancelamento': agendamento.taxa_cancelamento,
+    }
+
+
+def registrar(tipo: str, agendamento, dados: Dict = None) -> None:
+    """
+    Adiciona o evento à transação atual (não faz commit; o agendamento já deve ter id).
+    ``dados`` substitui o estado do agendamento quando o evento é de outro tipo.
+    """
+    db.session.add(EventoModel(tipo=tipo, id_agendamento=agendamento.id,
+                               dados=dados if dados is not None else dados_agendamento(agendamento)))
+    db.session.info['eventos_pendentes'] = True
+
+
+def registrar_varios(tipo: str, estados: Iterable[Dict]) -> None:
+    """Vários eventos em um único INSERT (executemany); cada estado é um dict de dados_agendamento"""
+    agora = datetime.utcnow()
+    linhas = [{'tipo': tipo, 'id_agendamento': estado['id'], 'dados': estado, 'criado_em': agora}
+              for estado in estados]
+    if linhas:
+        db.session.execute(insert(EventoModel), linhas)
+        db.session.info['eventos_pendentes'] = True
+
+
+def ao_commit(funcao: Callable[[], None]) -> Callable[[], None]:
+    """Registra ``funcao`` para depois de cada commit com eventos neste processo (decorator)"""
+    _ouvintes_commit.append(funcao)
+    return funcao
+
+
+@event.listens_for(db.session, 'after_commit')
+def _notificar(sessao):
+    if sessao.info.pop('eventos_pendentes', False):
+        for ouvinte in _ouvintes_commit:
+            ouvinte()
+        with _novos_eventos:
+            _novos_eventos.notify_all()
+
+
+@event.listens_for(db.session, 'after_rollback')
+def _descartar(sessao):
+    sessao.info.pop('eventos_pendentes', None)
+
+
+def _ate_lacuna(apos: int, eventos: List[EventoModel]) -> List[EventoModel]:
+    """Eventos até antes da primeira lacuna de ids recente (commit de id menor ainda pode chegar)"""
+    espera = current_app.config.get('EVENTOS_ESPERA_LACUNA', 5)
+    recente = datetime.utcnow() - timedelta(seconds=espera)
+    anterior = apos
+    for i, evento in enumerate(eventos):
+        if evento.id != anterior + 1 and evento.criado_em > recente:
+            return eventos[:i]
+        anterior = evento.id
+    return eventos
+
+
+def listar_eventos(apos: int = 0, limite: int = 100) -> List[EventoModel]:
+    """Eventos com id > apos, em ordem (busca pela chave primária), sem passar de uma lacuna recente"""
+    eventos = EventoModel.query.filter(EventoModel.id > apos).order_by(EventoModel.id).limit(limite).all()
+    return _ate_lacuna(apos, eventos)
+
+
+def ultimo_evento_id() -> int:
+    """Id do evento mais recente (0 sem eventos), sem passar de uma lacuna recente"""
+    # as lacunas que importam são dos últimos segundos: basta olhar os últimos eventos
+    ultimos = db.session.query(EventoModel.id, EventoModel.criado_em).order_by(
+        EventoModel.id.desc()).limit(100).all()
+    if not ultimos:
+        return 0
+    ultimos.reverse()
+    return _ate_lacuna(ultimos[0].id - 1, ultimos)[-1].id
+
+
+def aguardar_eventos(apos: int = 0, limite: int = 100, espera: float = 0) -> List[EventoModel]:
+    """
+    Long-poll: devolve assim que houver eventos depois de ``apos`` ou quando
+    ``espera`` segundos se passarem (lista vazia)
+    """
+    intervalo = current_app.config.get('EVENTOS_INTERVALO_CONSULTA', 1.0)
+    prazo = time.monotonic() + espera
+
+    while True:
+        eventos = listar_eventos(apos, limite)
+        restante = prazo - time.monotonic()
+        if eventos or restante <= 0:
+            return eventos
+
+        # encerra a transação de leitura: no WAL ela fixaria o snapshot e a conexão
+        db.session.rollback()
+        with _novos_eventos:
+            _novos_eventos.wait(min(restante, intervalo))
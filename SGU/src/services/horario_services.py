@@ -0,0 +1,151 @@
+"""
+Service de horários de trabalho por profissional
+
+Os modelos semanais (tb_horario_trabalho) e as exceções/feriados
+(tb_excecao_horario) são compilados uma vez em máscaras de bits: cada bit
+é um slot de 30 min do dia (bit 0 = 00:00, bit 18 = 09:00 ...). Verificar
+se um horário está no expediente vira um deslocamento de bits.
+Profissionais sem modelo usam o horário padrão de AgendamentoService.
+"""
+
+import threading
+import time as relogio
+from datetime import date, datetime, time
+from typing import Dict, List, Optional, Tuple
+
+from src import db
+from src.models.horario_trabalho_model import ExcecaoHorarioModel, HorarioTrabalhoModel
+from src.utils.filiais import filial_atual
+
+MINUTOS_SLOT = 30
+SLOTS_DIA = 24 * 60 // MINUTOS_SLOT
+
+# Cache das máscaras compiladas, por filial (recarregado após alterações ou quando o TTL vence)
+_caches: Dict[Optional[str], Dict] = {}
+_cache_lock = threading.Lock()
+CACHE_TTL = 300
+
+
+def indice_slot(momento) -> int:
+    """Índice do slot de 30 min que contém o horário"""
+    return (momento.hour * 60 + momento.minute) // MINUTOS_SLOT
+
+
+def mascara_periodo(hora_inicio: time, hora_fim: time) -> int:
+    """Bits dos slots entre hora_inicio (inclusive) e hora_fim (exclusive)"""
+    inicio = indice_slot(hora_inicio)
+    fim = -(-(hora_fim.hour * 60 + hora_fim.minute) // MINUTOS_SLOT)  # arredonda para cima
+    if fim <= inicio:
+        return 0
+    return ((1 << (fim - inicio)) - 1) << inicio
+
+
+def mascara_padrao() -> int:
+    """Expediente padrão: abertura até o almoço e do fim do almoço ao fechamento"""
+    from src.services.agendamento_services import AgendamentoService
+
+    return (mascara_periodo(time(AgendamentoService.HORA_ABERTURA), time(AgendamentoService.HORA_ALMOCO_INICIO)) |
+            mascara_periodo(time(AgendamentoService.HORA_ALMOCO_FIM), time(AgendamentoService.HORA_FECHAMENTO)))
+
+
+def _compilar() -> Tuple[Dict[int, Tuple[int, ...]], Dict[Tuple[Optional[int], date], int]]:
+    modelos: Dict[int, List[int]] = {}
+    for h in HorarioTrabalhoModel.query.all():
+        semana = modelos.setdefault(h.id_profissional, [0] * 7)
+        semana[h.dia_semana] |= mascara_periodo(h.hora_inicio, h.hora_fim)
+
+    excecoes: Dict[Tuple[Optional[int], date], int] = {}
+    for e in ExcecaoHorarioModel.query.all():
+        chave = (e.id_profissional, e.data)
+        mascara = mascara_periodo(e.hora_inicio, e.hora_fim) if e.hora_inicio and e.hora_fim else 0
+        excecoes[chave] = excecoes.get(chave, 0) | mascara
+
+    return {k: tuple(v) for k, v in modelos.items()}, excecoes
+
+
+def _carregar():
+    with _cache_lock:
+        cache = _caches.setdefault(filial_atual(), {'modelos': None, 'excecoes': None, 'padrao': 0,
+                                                    'carregado_em': 0.0})
+        if cache['modelos'] is None or relogio.monotonic() - cache['carregado_em'] > CACHE_TTL:
+            cache['modelos'], cache['excecoes'] = _compilar()
+            cache['padrao'] = mascara_padrao()
+            cache['carregado_em'] = relogio.monotonic()
+        return cache['modelos'], cache['excecoes'], cache['padrao']
+
+
+def invalidar_cache() -> None:
+    """Descarta as máscaras da filial atual"""
+    with _cache_lock:
+        _caches.pop(filial_atual(), None)
+
+
+def mascara_do_dia(id_profissional: Optional[int], data: date) -> int:
+    """Máscara de slots de expediente do profissional na data"""
+    modelos, excecoes, padrao = _carregar()
+
+    if (id_profissional, data) in excecoes:
+        return excecoes[(id_profissional, data)]
+    if (None, data) in excecoes:
+        return excecoes[(None, data)]
+
+    semana = modelos.get(id_profissional)
+    if semana is None:
+        return padrao
+    return semana[data.weekday()]
+
+
+def slots_necessarios(duracao_minutos: float) -> int:
+    return max(1, -(-int(duracao_minutos) // MINUTOS_SLOT))
+
+
+def no_expediente(id_profissional: Optional[int], momento: datetime, duracao_minutos: float = MINUTOS_SLOT) -> bool:
+    """True se todos os slots de [momento, momento + duração) estão no expediente"""
+    bits = ((1 << slots_necessarios(duracao_minutos)) - 1) << indice_slot(momento)
+    return mascara_do_dia(id_profissional, momento.date()) & bits == bits
+
+
+def listar_horarios_trabalho(id_profissional: int) -> List[HorarioTrabalhoModel]:
+    return HorarioTrabalhoModel.query.filter_by(id_profissional=id_profissional).order_by(
+        HorarioTrabalhoModel.dia_semana, HorarioTrabalhoModel.hora_inicio).all()
+
+
+def definir_horarios_trabalho(id_profissional: int, periodos: List[Dict]) -> List[HorarioTrabalhoModel]:
+    """Substitui o modelo semanal do profissional pelos períodos informados"""
+    try:
+        HorarioTrabalhoModel.query.filter_by(id_profissional=id_profissional).delete()
+        novos = [HorarioTrabalhoModel(id_profissional=id_profissional, **periodo) for periodo in periodos]
+        for periodo in novos:
+            if periodo.hora_fim <= periodo.hora_inicio or not 0 <= periodo.dia_semana <= 6:
+                raise Exception("Período de trabalho inválido")
+        db.session.add_all(novos)
+        db.session.commit()
+        invalidar_cache()
+        return novos
+    except Exception as e:
+        db.session.rollback()
+        raise Exception(str(e))
+
+
+def cadastrar_excecao(excecao: ExcecaoHorarioModel) -> ExcecaoHorarioModel:
+    """Cadastra feriado (dia fechado) ou horário especial em uma data"""
+    try:
+        if (excecao.hora_inicio is None) != (excecao.hora_fim is None):
+            raise Exception("Informe hora_inicio e hora_fim, ou nenhum dos dois para dia fechado")
+        db.session.add(excecao)
+        db.session.commit()
+        invalidar_cache()
+        return excecao
+    except Exception as e:
+        db.session.rollback()
+        raise Exception(str(e))
+
+
+def excluir_excecao(id_excecao: int) -> bool:
+    excecao = ExcecaoHorarioModel.query.get(id_excecao)
+    if not excecao:
+        return False
+    db.session.delete(excecao)
+    db.session.commit()
+    invalidar_cache()
+    return True
@@ -0,0 +1,243 @@
+"""
+Service dos lembretes de atendimento (24h e 1h antes do ``dt_atendimento``)
+
+Um ciclo do despachante (``despachar``) tem três passos:
+
+1. agendar: cria em ``tb_lembrete`` os lembretes que vencem até o próximo
+   ciclo. A consulta é uma janela pelo índice de ``dt_atendimento``, com
+   anti-join nos lembretes já criados.
+2. reservar: cada worker marca um lote de lembretes vencidos com o id do
+   lote e um prazo (lease). A marcação é um UPDATE condicional (só pega quem
+   ainda está livre), então dois workers nunca reservam o mesmo lembrete;
+   reserva vencida (worker caiu) volta para a fila.
+3. enviar: as mensagens do lote são divididas entre as conexões do pool SMTP
+   e enviadas em paralelo; o resultado volta ao banco em um executemany.
+   Falha reagenda com backoff exponencial até LEMBRETE_MAX_TENTATIVAS.
+
+Antes do envio o agendamento é conferido de novo: cancelado/concluído
+cancela o lembrete, horário alterado reagenda.
+"""
+
+import os
+import random
+import socket
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+from typing import Dict, List, Optional
+
+from flask import current_app
+from sqlalchemy import and_, bindparam, exists, insert, or_, select, update
+from sqlalchemy.exc import IntegrityError
+
+from src import db
+from src.models.agendamento_model import AgendamentoModel
+from src.models.lembrete_model import LembreteModel
+from src.models.profissional_model import ProfissionalModel
+from src.models.servicos_model import ServicoModel
+from src.models.usuario_model import UsuarioModel
+from src.utils.smtp import pool_smtp
+
+ANTECEDENCIAS = {'24h': timedelta(hours=24), '1h': timedelta(hours=1)}
+
+
+def _config(nome: str, padrao):
+    return current_app.config.get(nome, padrao)
+
+
+def agendar(agora: Optional[datetime] = None) -> int:
+    """
+    Cria os lembretes que vencem até ``agora`` + LEMBRETE_HORIZONTE_SEGUNDOS.
+    Lembrete que já venceu há mais de LEMBRETE_ATRASO_MAXIMO_SEGUNDOS não é
+    criado (ex.: agendamento feito 3h antes não recebe o de 24h).
+    """
+    agora = agora or datetime.now()
+    horizonte = timedelta(seconds=_config('LEMBRETE_HORIZONTE_SEGUNDOS', 900))
+    atraso_maximo = timedelta(seconds=_config('LEMBRETE_ATRASO_MAXIMO_SEGUNDOS', 3600))
+
+    linhas = []
+    for tipo, antecedencia in ANTECEDENCIAS.items():
+        ja_criado = exists().where(LembreteModel.id_agendamento == AgendamentoModel.id, LembreteModel.tipo == tipo)
+        janela = db.session.execute(select(AgendamentoModel.id, AgendamentoModel.dt_atendimento).where(
+            AgendamentoModel.dt_atendimento > max(agora, agora + antecedencia - atraso_maximo),
+            AgendamentoModel.dt_atendimento <= agora + antecedencia + horizonte,
+            AgendamentoModel.status == 'agendado',
+            ~ja_criado
+        ))
+        linhas += [{'id_agendamento': id_agendamento, 'tipo': tipo, 'enviar_em': dt_atendimento - antecedencia,
+                    'proxima_tentativa': dt_atendimento - antecedencia, 'status': 'pendente', 'tentativas': 0,
+                    'criado_em': datetime.utcnow()}
+                   for id_agendamento, dt_atendimento in janela]
+
+    if not linhas:
+        return 0
+    try:
+        db.session.execute(insert(LembreteModel), linhas)
+        db.session.commit()
+    except IntegrityError:
+        # outro worker criou os mesmos lembretes ao mesmo tempo; o que faltar entra no próximo ciclo
+        db.session.rollback()
+        return 0
+    return len(linhas)
+
+
+def _disponivel(agora: datetime):
+    """Lembretes que um worker pode reservar: pendentes vencidos ou com reserva expirada"""
+    return or_(
+        and_(LembreteModel.status == 'pendente', LembreteModel.proxima_tentativa <= agora),
+        and_(LembreteModel.status == 'enviando', LembreteModel.reservado_ate < agora),
+    )
+
+
+def reservar(limite: int, agora: Optional[datetime] = None) -> Optional[str]:
+    """Reserva até ``limite`` lembretes vencidos para este worker; devolve o id do lote (None se nada venceu)"""
+    agora = agora or datetime.now()
+    lease = timedelta(seconds=_config('LEMBRETE_LEASE_SEGUNDOS', 300))
+
+    # SKIP LOCKED nos bancos com lock de linha (no sqlite a escrita já é serializada)
+    ids = db.session.execute(
+        select(LembreteModel.id).where(_disponivel(agora)).order_by(LembreteModel.proxima_tentativa)
+        .limit(limite).with_for_update(skip_locked=True)
+    ).scalars().all()
+    if not ids:
+        db.session.rollback()
+        return None
+
+    lote = f'{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:12]}'
+    # condição repetida no UPDATE: o que outro worker pegou nesse meio-tempo fica de fora
+    resultado = db.session.execute(
+        update(LembreteModel).where(LembreteModel.id.in_(ids), _disponivel(agora))
+        .values(status='enviando', reservado_por=lote, reservado_ate=agora + lease),
+        execution_options={'synchronize_session': False}
+    )
+    db.session.commit()
+    return lote if resultado.rowcount else None
+
+
+def _mensagem(remetente: str, email: str, nome: str, servico: str, profissional: str,
+              dt_atendimento: datetime) -> EmailMessage:
+    mensagem = EmailMessage()
+    mensagem['From'] = remetente
+    mensagem['To'] = email
+    mensagem['Subject'] = f'Lembrete: {servico} em {dt_atendimento:%d/%m às %H:%M}'
+    mensagem.set_content(
+        f'Olá, {nome}!\n\n'
+        f'Lembramos do seu atendimento de {servico} com {profissional} '
+        f'em {dt_atendimento:%d/%m/%Y às %H:%M}.\n\n'
+        'Se não puder comparecer, cancele pelo app para liberar o horário.\n'
+    )
+    return mensagem
+
+
+def _backoff(tentativas: int) -> timedelta:
+    base = _config('LEMBRETE_BACKOFF_SEGUNDOS', 60)
+    # exponencial com jitter: workers que falharam juntos não tentam de novo juntos
+    return timedelta(seconds=base * 2 ** (tentativas - 1) * random.uniform(1.0, 1.25))
+
+
+def enviar_lote(lote: str, agora: Optional[datetime] = None) -> Dict[str, int]:
+    """Confere os agendamentos do lote reservado, envia as mensagens e grava o resultado"""
+    agora = agora or datetime.now()
+    linhas = db.session.execute(select(
+        LembreteModel.id, LembreteModel.tipo, LembreteModel.enviar_em, LembreteModel.tentativas,
+        AgendamentoModel.status, AgendamentoModel.dt_atendimento,
+        UsuarioModel.nome, UsuarioModel.email, ServicoModel.descricao, ProfissionalModel.nome
+    ).join(
+        AgendamentoModel, AgendamentoModel.id == LembreteModel.id_agendamento
+    ).join(
+        UsuarioModel, UsuarioModel.id == AgendamentoModel.id_user
+    ).join(
+        ServicoModel, ServicoModel.id == AgendamentoModel.id_servico
+    ).join(
+        ProfissionalModel, ProfissionalModel.id == AgendamentoModel.id_profissional
+    ).where(LembreteModel.reservado_por == lote)).all()
+
+    remetente = _config('LEMBRETE_REMETENTE', 'SGU <nao-responda@sgu.local>')
+    resultados: List[Dict] = []
+    envios = []  # (id, tentativas, mensagem)
+    for (id_lembrete, tipo, enviar_em, tentativas, status, dt_atendimento,
+         nome, email, servico, profissional) in linhas:
+        esperado = dt_atendimento - ANTECEDENCIAS[tipo]
+        if status != 'agendado' or dt_atendimento <= agora:
+            resultados.append({'_id': id_lembrete, 'status': 'cancelado'})
+        elif esperado != enviar_em and esperado > agora:
+            # horário do atendimento mudou: lembrete volta para a fila no novo horário
+            resultados.append({'_id': id_lembrete, 'status': 'pendente', 'enviar_em': esperado,
+                               'proxima_tentativa': esperado})
+        else:
+            envios.append((id_lembrete, tentativas,
+                           _mensagem(remetente, email, nome, servico, profissional, dt_atendimento)))
+
+    enviados = falhas = 0
+    if envios:
+        # uma fatia do lote por conexão do pool, enviadas em paralelo
+        pool = pool_smtp(current_app)
+        fatias = [envios[i::pool.tamanho] for i in range(min(pool.tamanho, len(envios)))]
+        with ThreadPoolExecutor(max_workers=len(fatias)) as executor:
+            respostas = list(executor.map(lambda fatia: pool.enviar([m for _, _, m in fatia]), fatias))
+
+        maximo = _config('LEMBRETE_MAX_TENTATIVAS', 5)
+        for fatia, erros in zip(fatias, respostas):
+            for (id_lembrete, tentativas, _), erro in zip(fatia, erros):
+                if erro is None:
+                    enviados += 1
+                    resultados.append({'_id': id_lembrete, 'status': 'enviado', 'enviado_em': datetime.utcnow(),
+                                       'tentativas': tentativas + 1, 'erro': None})
+                else:
+                    falhas += 1
+                    resultados.append({'_id': id_lembrete, 'tentativas': tentativas + 1, 'erro': erro,
+                                       'status': 'falhou' if tentativas + 1 >= maximo else 'pendente',
+                                       'proxima_tentativa': agora + _backoff(tentativas + 1)})
+
+    _gravar(lote, resultados)
+    return {
+        'reservados': len(linhas),
+        'enviados': enviados,
+        'falhas': falhas,
+        'reagendados': sum(1 for r in resultados if r['status'] == 'pendente' and 'enviar_em' in r),
+        'cancelados': sum(1 for r in resultados if r['status'] == 'cancelado'),
+    }
+
+
+def _gravar(lote: str, resultados: List[Dict]) -> None:
+    """Resultado do lote em um executemany por formato de linha; libera a reserva"""
+    tabela = LembreteModel.__table__
+    por_colunas: Dict[tuple, List[Dict]] = {}
+    for resultado in resultados:
+        por_colunas.setdefault(tuple(sorted(resultado)), []).append(resultado)
+
+    for colunas, linhas in por_colunas.items():
+        valores = {coluna: bindparam(coluna) for coluna in colunas if coluna != '_id'}
+        db.session.execute(
+            # só quem ainda tem a reserva grava (reserva vencida pode ter ido para outro worker)
+            update(tabela).where(tabela.c.id == bindparam('_id'), tabela.c.reservado_por == lote)
+            .values(**valores, reservado_por=None, reservado_ate=None),
+            linhas
+        )
+    db.session.commit()
+
+
+def despachar(limite: Optional[int] = None, agora: Optional[datetime] = None) -> Dict:
+    """Um ciclo completo (agendar, reservar e enviar lotes até esvaziar a fila) com métricas"""
+    limite = limite or _config('LEMBRETE_LOTE', 200)
+    comeco = time.perf_counter()
+    metricas = {'criados': agendar(agora), 'lotes': 0, 'reservados': 0, 'enviados': 0, 'falhas': 0,
+                'reagendados': 0, 'cancelados': 0}
+
+    while True:
+        lote = reservar(limite, agora)
+        if lote is None:
+            break
+        metricas['lotes'] += 1
+        resultado = enviar_lote(lote, agora)
+        for chave, valor in resultado.items():
+            metricas[chave] += valor
+        if resultado['reservados'] < limite:
+            break  # lote incompleto: fila vazia
+
+    metricas['segundos'] = round(time.perf_counter() - comeco, 3)
+    metricas['enviados_por_segundo'] = round(metricas['enviados'] / metricas['segundos'], 1) \
+        if metricas['segundos'] else 0.0
+    return metricas
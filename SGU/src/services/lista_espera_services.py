@@ -0,0 +1,216 @@
+"""
+Service da lista de espera
+
+Clientes se inscrevem para um profissional, serviço e janela de horário.
+Quando um agendamento é cancelado, ``preencher_vaga`` procura pelo índice
+(id_profissional, status, janela_inicio) só os pedidos daquele
+profissional cuja janela cruza o horário liberado e, em ordem de
+inscrição, agenda (ou oferece) a vaga ao primeiro que couber — na mesma
+transação do cancelamento. Os pedidos são lidos em páginas de
+MAX_CANDIDATOS até achar um que caiba (o encaixe depende da duração do
+serviço de cada pedido e é conferido em Python).
+"""
+
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from sqlalchemy import and_, or_
+
+from src import db
+from src.models.agendamento_model import AgendamentoModel
+from src.models.lista_espera_model import ListaEsperaModel
+from src.models.profissional_model import ProfissionalModel
+from src.models.servicos_model import ServicoModel
+from src.models.usuario_model import UsuarioModel
+from src.services import evento_services, horario_services, preco_services
+
+# pedidos lidos (e travados) por página na busca de quem fica com a vaga liberada
+MAX_CANDIDATOS = 20
+
+
+def listar_pedidos(id_user: int = None, status: str = None) -> List[ListaEsperaModel]:
+    """Pedidos da lista de espera (opcionalmente de um usuário e/ou com um status)"""
+    consulta = ListaEsperaModel.query
+    if id_user is not None:
+        consulta = consulta.filter(ListaEsperaModel.id_user == id_user)
+    if status:
+        consulta = consulta.filter(ListaEsperaModel.status == status)
+    return consulta.order_by(ListaEsperaModel.criado_em, ListaEsperaModel.id).all()
+
+
+def listar_pedido_id(id_pedido: int) -> Optional[ListaEsperaModel]:
+    return db.session.get(ListaEsperaModel, id_pedido)
+
+
+def cadastrar_pedido(pedido: ListaEsperaModel) -> ListaEsperaModel:
+    """Inscreve o cliente na lista de espera"""
+    try:
+        if pedido.janela_fim <= pedido.janela_inicio:
+            raise Exception("Janela de horário inválida")
+
+        if pedido.janela_fim <= datetime.now():
+            raise Exception("A janela de horário já passou")
+
+        if not db.session.get(UsuarioModel, pedido.id_user):
+            raise Exception("Usuário não encontrado")
+
+        if not db.session.get(ProfissionalModel, pedido.id_profissional):
+            raise Exception("Profissional não encontrado")
+
+        servico = db.session.get(ServicoModel, pedido.id_servico)
+        if not servico:
+            raise Exception("Serviço não encontrado")
+
+        if pedido.janela_fim - pedido.janela_inicio < timedelta(minutes=_duracao(servico)):
+            raise Exception("A janela de horário é menor que a duração do serviço")
+
+        pedido.status = 'aguardando'
+        db.session.add(pedido)
+        db.session.commit()
+        return pedido
+
+    except Exception as e:
+        db.session.rollback()
+        raise Exception(str(e))
+
+
+def cancelar_pedido(id_pedido: int) -> ListaEsperaModel:
+    """Retira o pedido da lista de espera"""
+    try:
+        pedido = db.session.get(ListaEsperaModel, id_pedido)
+        if not pedido:
+            raise Exception("Pedido não encontrado")
+
+        if pedido.status not in ('aguardando', 'oferecido'):
+            raise Exception("Pedido já foi atendido ou cancelado")
+
+        pedido.status = 'cancelado'
+        db.session.commit()
+        return pedido
+
+    except Exception as e:
+        db.session.rollback()
+        raise Exception(str(e))
+
+
+def aceitar_oferta(id_pedido: int) -> ListaEsperaModel:
+    """Agenda a vaga oferecida ao pedido, se ela ainda estiver livre"""
+    try:
+        pedido = db.session.get(ListaEsperaModel, id_pedido, with_for_update=True)
+        if not pedido:
+            raise Exception("Pedido não encontrado")
+
+        if pedido.status != 'oferecido':
+            raise Exception("Não há vaga oferecida para este pedido")
+
+        servico = db.session.get(ServicoModel, pedido.id_servico)
+        if not _vaga_livre(pedido, servico, pedido.dt_oferta):
+            # vaga ocupada (ou já passou): o pedido volta para a fila
+            pedido.status = 'aguardando'
+            pedido.dt_oferta = None
+            db.session.commit()
+            raise Exception("A vaga oferecida não está mais disponível")
+
+        _agendar(pedido, servico, pedido.dt_oferta)
+        db.session.commit()
+        return pedido
+
+    except Exception as e:
+        db.session.rollback()
+        raise Exception(str(e))
+
+
+def preencher_vaga(cancelado: AgendamentoModel) -> Optional[ListaEsperaModel]:
+    """
+    Chamado no cancelamento, antes do commit (não faz commit).
+    Procura o primeiro pedido aguardando, em ordem de inscrição, cujo
+    atendimento caiba a partir do horário liberado e dentro da janela, e o
+    agenda (automatico) ou registra a oferta no outbox. Devolve o pedido
+    atendido/oferecido ou None.
+    """
+    inicio = cancelado.dt_atendimento
+    if inicio <= datetime.now():
+        return None
+
+    servico_cancelado = db.session.get(ServicoModel, cancelado.id_servico)
+    fim = inicio + timedelta(minutes=_duracao(servico_cancelado))
+
+    # busca pelo índice: profissional + status + janela começando antes do fim da vaga
+    # (quem cancelou não recebe a própria vaga)
+    consulta = db.session.query(ListaEsperaModel, ServicoModel).join(
+        ServicoModel, ServicoModel.id == ListaEsperaModel.id_servico
+    ).filter(
+        ListaEsperaModel.id_profissional == cancelado.id_profissional,
+        ListaEsperaModel.status == 'aguardando',
+        ListaEsperaModel.janela_inicio < fim,
+        ListaEsperaModel.janela_fim > inicio,
+        ListaEsperaModel.id_user != cancelado.id_user
+    ).order_by(
+        ListaEsperaModel.criado_em, ListaEsperaModel.id
+    )
+
+    ultimo = None
+    while True:
+        pagina = consulta
+        if ultimo is not None:
+            # próxima página em ordem de inscrição, depois do último pedido lido
+            pagina = pagina.filter(or_(
+                ListaEsperaModel.criado_em > ultimo.criado_em,
+                and_(ListaEsperaModel.criado_em == ultimo.criado_em, ListaEsperaModel.id > ultimo.id)))
+        candidatos = pagina.limit(MAX_CANDIDATOS).with_for_update(of=ListaEsperaModel).all()
+
+        for pedido, servico in candidatos:
+            inicio_pedido = max(inicio, pedido.janela_inicio)
+            if inicio_pedido + timedelta(minutes=_duracao(servico)) > pedido.janela_fim:
+                continue
+            if not _vaga_livre(pedido, servico, inicio_pedido):
+                continue
+
+            if pedido.automatico:
+                _agendar(pedido, servico, inicio_pedido)
+            else:
+                pedido.status = 'oferecido'
+                pedido.dt_oferta = inicio_pedido
+                evento_services.registrar(evento_services.VAGA_OFERECIDA, cancelado, dados={
+                    'id_lista_espera': pedido.id,
+                    'id_user': pedido.id_user,
+                    'id_profissional': pedido.id_profissional,
+                    'id_servico': pedido.id_servico,
+                    'dt_atendimento': inicio_pedido.isoformat(),
+                })
+            return pedido
+
+        if len(candidatos) < MAX_CANDIDATOS:
+            return None
+        ultimo = candidatos[-1][0]
+
+
+def _duracao(servico) -> int:
+    from src.services.agendamento_services import _obter_duracao_servico
+
+    return _obter_duracao_servico(servico)
+
+
+def _vaga_livre(pedido: ListaEsperaModel, servico, inicio: datetime) -> bool:
+    """Horário futuro, no expediente do profissional e sem conflito na agenda"""
+    from src.services.agendamento_services import _existe_conflito
+
+    if inicio is None or inicio <= datetime.now():
+        return False
+    duracao = _duracao(servico)
+    if not horario_services.no_expediente(pedido.id_profissional, inicio, duracao):
+        return False
+    return not _existe_conflito(pedido.id_profissional, inicio, inicio + timedelta(minutes=duracao))
+
+
+def _agendar(pedido: ListaEsperaModel, servico: ServicoModel, inicio: datetime) -> AgendamentoModel:
+    """Cria o agendamento do pedido (flush + evento, sem commit), com o preço do horário (tabela + pico)"""
+    agendamento = AgendamentoModel(inicio, pedido.id_user, pedido.id_profissional, pedido.id_servico,
+                                   preco_services.preco_agendamento(servico, inicio))
+    db.session.add(agendamento)
+    db.session.flush()
+    evento_services.registrar(evento_services.AGENDAMENTO_CRIADO, agendamento)
+
+    pedido.status = 'atendido'
+    pedido.id_agendamento = agendamento.id
+    return agendamento
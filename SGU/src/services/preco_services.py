@@ -0,0 +1,229 @@
+"""
+Service de preços: cotação de serviços (avulsos ou em pacote) por horário
+
+O preço de um agendamento parte do valor de tabela de cada serviço e aplica:
+- horário de pico (tb_regra_preco, tipo ``horario_pico``): acréscimo
+  percentual para o serviço que começa no período; com várias regras no mesmo
+  horário vale a maior (a do serviço ou a geral)
+- pacote (tipo ``pacote``): desconto percentual sobre o total quando o
+  agendamento tem ``min_servicos`` serviços ou mais; vale a faixa mais alta
+  atingida
+
+Os serviços de um pacote são feitos em sequência: cada um começa quando o
+anterior termina, e o pico é conferido no horário de início de cada um.
+Cancelar com menos de 24h de antecedência custa 20% do valor de tabela
+(``_calcular_taxa_cancelamento``, mesma regra do cancelamento).
+
+Serviços e regras são compilados uma vez por filial (como as máscaras de
+``horario_services``) em uma tabela em memória: valor e duração por serviço
+e o percentual de pico por dia da semana e slot de 30 min. Cotar centenas de
+horários candidatos não vai ao banco. O preço gravado no agendamento
+(``preco_agendamento``) usa o valor do serviço já carregado do banco; da
+tabela só sai o percentual de pico.
+"""
+
+import threading
+import time as relogio
+from datetime import datetime, timedelta
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from src import db
+from src.models.regra_preco_model import RegraPrecoModel
+from src.models.servicos_model import ServicoModel
+from src.services.horario_services import MINUTOS_SLOT, SLOTS_DIA, indice_slot
+from src.utils.filiais import filial_atual
+
+TIPOS = ('horario_pico', 'pacote')
+MAX_SERVICOS = 10
+MAX_HORARIOS = 1000
+MAX_PERCENTUAL_PICO = 100  # acréscimo de pico no máximo dobra o preço
+
+# Cache da tabela compilada, por filial (recarregado após alterações ou quando o TTL vence)
+_caches: Dict[Optional[str], Tuple[float, '_Tabela']] = {}
+_cache_lock = threading.Lock()
+CACHE_TTL = 300
+RECARGA_MINIMA = 30  # serviço desconhecido recompila a tabela no máximo uma vez nesse intervalo
+
+
+class _Tabela(NamedTuple):
+    servicos: Dict[int, Tuple[float, float]]  # id -> (valor, duração em minutos)
+    pico: Dict[Optional[int], Tuple[Tuple[float, ...], ...]]  # id_servico (None = geral) -> [dia][slot] -> %
+    pacotes: Tuple[Tuple[int, float], ...]  # (min_servicos, %) do maior para o menor
+
+
+def _faixa_slots(regra: RegraPrecoModel) -> range:
+    fim = -(-(regra.hora_fim.hour * 60 + regra.hora_fim.minute) // MINUTOS_SLOT)  # arredonda para cima
+    return range(indice_slot(regra.hora_inicio), min(fim, SLOTS_DIA))
+
+
+def _compilar() -> _Tabela:
+    from src.services.agendamento_services import _obter_duracao_servico
+
+    servicos = {s.id: (float(s.valor), _obter_duracao_servico(s)) for s in ServicoModel.query.all()}
+
+    grades: Dict[Optional[int], List[List[float]]] = {None: [[0.0] * SLOTS_DIA for _ in range(7)]}
+    pacotes: Dict[int, float] = {}
+    for regra in RegraPrecoModel.query.all():
+        if regra.tipo == 'pacote':
+            pacotes[regra.min_servicos] = max(pacotes.get(regra.min_servicos, 0.0), regra.percentual)
+            continue
+        grade = grades.setdefault(regra.id_servico, [[0.0] * SLOTS_DIA for _ in range(7)])
+        for dia in (range(7) if regra.dia_semana is None else (regra.dia_semana,)):
+            for slot in _faixa_slots(regra):
+                grade[dia][slot] = max(grade[dia][slot], regra.percentual)
+
+    # grade de um serviço com regra própria já inclui as regras gerais (vale a maior)
+    geral = grades[None]
+    pico = {id_servico: tuple(tuple(max(a, b) for a, b in zip(dia, dia_geral))
+                              for dia, dia_geral in zip(grade, geral))
+            for id_servico, grade in grades.items()}
+    return _Tabela(servicos, pico, tuple(sorted(pacotes.items(), reverse=True)))
+
+
+def _carregar(idade_maxima: Optional[float] = None) -> _Tabela:
+    """Tabela da filial atual, recompilada se tiver mais de ``idade_maxima`` segundos (padrão CACHE_TTL)"""
+    idade_maxima = CACHE_TTL if idade_maxima is None else idade_maxima
+    with _cache_lock:
+        carregado_em, tabela = _caches.get(filial_atual(), (0.0, None))
+        if tabela is None or relogio.monotonic() - carregado_em > idade_maxima:
+            tabela = _compilar()
+            _caches[filial_atual()] = (relogio.monotonic(), tabela)
+        return tabela
+
+
+def invalidar_cache() -> None:
+    """Descarta a tabela de preços da filial atual"""
+    with _cache_lock:
+        _caches.pop(filial_atual(), None)
+
+
+def _tabela_com(ids_servicos: Sequence[int]) -> _Tabela:
+    """
+    Tabela que conhece todos os serviços pedidos. Um id fora da tabela pode
+    ser serviço novo: recompila, mas só se a tabela tiver mais de
+    RECARGA_MINIMA segundos (ids inexistentes repetidos não furam o cache);
+    se ainda faltar, lê só esses serviços do banco.
+    """
+    from src.services.agendamento_services import _obter_duracao_servico
+
+    tabela = _carregar()
+    if any(i not in tabela.servicos for i in ids_servicos):
+        tabela = _carregar(idade_maxima=RECARGA_MINIMA)
+        faltando = {i for i in ids_servicos if i not in tabela.servicos}
+        if faltando:
+            novos = {s.id: (float(s.valor), _obter_duracao_servico(s))
+                     for s in ServicoModel.query.filter(ServicoModel.id.in_(faltando))}
+            if len(novos) < len(faltando):
+                raise Exception(f"Serviço não encontrado: {', '.join(map(str, sorted(faltando - novos.keys())))}")
+            tabela = tabela._replace(servicos={**tabela.servicos, **novos})
+    return tabela
+
+
+def _desconto_pacote(tabela: _Tabela, quantidade: int) -> float:
+    for minimo, percentual in tabela.pacotes:
+        if quantidade >= minimo:
+            return percentual
+    return 0.0
+
+
+def cotar(ids_servicos: Sequence[int], horarios: Sequence[datetime]) -> Dict:
+    """
+    Preço dos serviços (na ordem informada, um após o outro) para cada horário
+    de início candidato. Não consulta o banco com a tabela em cache.
+    """
+    from src.services.agendamento_services import AgendamentoService, _calcular_taxa_cancelamento
+
+    if not ids_servicos or len(ids_servicos) > MAX_SERVICOS:
+        raise Exception(f"Informe de 1 a {MAX_SERVICOS} serviços")
+    if len(horarios) > MAX_HORARIOS:
+        raise Exception(f"No máximo {MAX_HORARIOS} horários por cotação")
+
+    tabela = _tabela_com(ids_servicos)
+    itens = [(tabela.servicos[i], tabela.pico.get(i, tabela.pico[None])) for i in ids_servicos]
+    valor_tabela = sum(valor for (valor, _), _ in itens)
+    desconto = _desconto_pacote(tabela, len(ids_servicos))
+    taxa = round(_calcular_taxa_cancelamento(valor_tabela), 2)
+
+    cotacoes = []
+    for inicio in horarios:
+        momento = inicio
+        subtotal = acrescimo = 0.0
+        for (valor, duracao), grade in itens:
+            percentual = grade[momento.weekday()][indice_slot(momento)]
+            acrescimo += valor * percentual / 100
+            subtotal += valor * (1 + percentual / 100)
+            momento += timedelta(minutes=duracao)
+        valor_desconto = subtotal * desconto / 100
+        cotacoes.append({
+            'dt_atendimento': inicio.isoformat(),
+            'dt_fim': momento.isoformat(),
+            'acrescimo_pico': round(acrescimo, 2),
+            'desconto_pacote': round(valor_desconto, 2),
+            'valor_total': round(subtotal - valor_desconto, 2),
+            'taxa_cancelamento': taxa,
+            'cancelamento_gratuito_ate': (inicio - AgendamentoService.ANTECEDENCIA_CANCELAMENTO_GRATUITO).isoformat(),
+        })
+
+    return {
+        'servicos': [{'id': i, 'valor': valor, 'duracao': duracao}
+                     for i, ((valor, duracao), _) in zip(ids_servicos, itens)],
+        'valor_tabela': round(valor_tabela, 2),
+        'percentual_pacote': desconto,
+        'cotacoes': cotacoes,
+    }
+
+
+def preco_agendamento(servico: ServicoModel, dt_atendimento: datetime) -> float:
+    """
+    valor_total de um agendamento avulso (tabela + pico), para quem não informou
+    o valor. O valor de tabela é o do serviço carregado (a tabela em cache pode
+    não ter um serviço novo ou um valor alterado); do cache só vem o pico.
+    """
+    tabela = _carregar()
+    grade = tabela.pico.get(servico.id, tabela.pico[None])
+    percentual = grade[dt_atendimento.weekday()][indice_slot(dt_atendimento)]
+    return round(float(servico.valor) * (1 + percentual / 100), 2)
+
+
+def listar_regras() -> List[RegraPrecoModel]:
+    return RegraPrecoModel.query.order_by(RegraPrecoModel.tipo, RegraPrecoModel.id).all()
+
+
+def _validar_regra(regra: RegraPrecoModel) -> None:
+    if regra.tipo not in TIPOS:
+        raise Exception(f"Tipo de regra inválido (use {' ou '.join(TIPOS)})")
+    if regra.percentual is None or regra.percentual <= 0 or (regra.tipo == 'pacote' and regra.percentual >= 100):
+        raise Exception("Percentual inválido")
+    if regra.tipo == 'horario_pico':
+        if regra.percentual > MAX_PERCENTUAL_PICO:
+            raise Exception(f"Acréscimo de horário de pico limitado a {MAX_PERCENTUAL_PICO}%")
+        if regra.hora_inicio is None or regra.hora_fim is None or regra.hora_fim <= regra.hora_inicio:
+            raise Exception("Informe hora_inicio e hora_fim (fim depois do início) para horário de pico")
+        if regra.dia_semana is not None and not 0 <= regra.dia_semana <= 6:
+            raise Exception("dia_semana deve ser de 0 (segunda) a 6 (domingo)")
+        if regra.id_servico is not None and not db.session.get(ServicoModel, regra.id_servico):
+            raise Exception("Serviço não encontrado")
+    elif regra.min_servicos is None or regra.min_servicos < 2:
+        raise Exception("Pacote precisa de min_servicos a partir de 2")
+
+
+def cadastrar_regra(regra: RegraPrecoModel) -> RegraPrecoModel:
+    try:
+        _validar_regra(regra)
+        db.session.add(regra)
+        db.session.commit()
+        invalidar_cache()
+        return regra
+    except Exception as e:
+        db.session.rollback()
+        raise Exception(str(e))
+
+
+def excluir_regra(id_regra: int) -> bool:
+    regra = db.session.get(RegraPrecoModel, id_regra)
+    if not regra:
+        return False
+    db.session.delete(regra)
+    db.session.commit()
+    invalidar_cache()
+    return True
@@ -1,6 +1,11 @@
+from functools import lru_cache
+from sqlalchemy.orm.exc import StaleDataError
 from ..models.usuario_model import UsuarioModel
+from ..models.profissional_model import ProfissionalModel
 from ..entities.usuario import Usuario
+from ..utils.concorrencia import ConflitoVersao, conferir, conflito
 from src import db
+from passlib.hash import pbkdf2_sha256 as sha256
 
 
 def cadastrar_usuario(usuario_entity):
@@ -26,7 +31,9 @@ def listar_usuario():
 
 
 def listar_usuario_email(email):
-    usuario_db = UsuarioModel.query.filter_by(email=email).first()
+    # busca pelo email normalizado (indexado), ignorando maiúsculas/espaços
+    usuario_db = UsuarioModel.query.filter_by(
+        email_canonical=UsuarioModel.normalizar_email(email)).first()
     
     if usuario_db:
         return Usuario(usuario_db.nome,
@@ -36,6 +43,63 @@ def listar_usuario_email(email):
         
     return None
 
+
+def definir_perfil(email, perfil, id_profissional=None):
+    """
+    Muda o perfil do usuário (cliente, profissional ou equipe). O perfil
+    profissional liga o login ao profissional ``id_profissional``; os
+    outros desfazem a ligação.
+    """
+    if perfil not in UsuarioModel.PERFIS:
+        raise Exception(f"Perfil inválido (use {', '.join(UsuarioModel.PERFIS)})")
+    if (perfil == 'profissional') != (id_profissional is not None):
+        raise Exception("Informe o profissional só para o perfil profissional")
+
+    usuario_db = UsuarioModel.query.filter_by(
+        email_canonical=UsuarioModel.normalizar_email(email)).first()
+    if not usuario_db:
+        raise Exception("Usuário não encontrado")
+
+    profissional = None
+    if id_profissional is not None:
+        profissional = db.session.get(ProfissionalModel, id_profissional)
+        if not profissional:
+            raise Exception("Profissional não encontrado")
+
+    # um login por profissional: desfaz a ligação anterior do usuário antes da nova
+    ProfissionalModel.query.filter_by(id_usuario=usuario_db.id).update(
+        {'id_usuario': None}, synchronize_session=False)
+    if profissional:
+        profissional.id_usuario = usuario_db.id
+    usuario_db.perfil = perfil
+    db.session.commit()
+    return usuario_db
+
+
+def conferir_senha(id, senha):
+    """Confere a senha atual do usuário (pbkdf2), ex.: antes de trocá-la"""
+    usuario_db = UsuarioModel.query.get(id)
+    return bool(usuario_db and isinstance(senha, str) and usuario_db.verficar_senha(senha))
+
+
+@lru_cache(maxsize=1)
+def _senha_ficticia():
+    # hash de referência: email inexistente também paga uma verificação pbkdf2,
+    # assim o tempo de resposta do login não revela quais emails estão cadastrados
+    return sha256.hash('sgu-senha-ficticia')
+
+
+def autenticar_usuario(email, senha):
+    """Confere email e senha (pbkdf2); retorna o id do usuário ou None"""
+    usuario_db = UsuarioModel.query.filter_by(
+        email_canonical=UsuarioModel.normalizar_email(email)).first()
+
+    if not usuario_db:
+        sha256.verify(senha, _senha_ficticia())
+        return None
+
+    return usuario_db.id if usuario_db.verficar_senha(senha) else None
+
    
 def listar_usuario_id(id): 
     try:
@@ -45,72 +109,65 @@ def listar_usuario_id(id):
             return Usuario(usuario_encontrado.nome,
                            usuario_encontrado.email,
                            usuario_encontrado.telefone,
-                           usuario_encontrado.senha)
+                           usuario_encontrado.senha,
+                           usuario_encontrado.versao)
     except Exception as e:
         print(f'Erro ao listar usuario por id {e}')
         return None
 
-def editar_usuario(id, usuario_entity):
-    usuario_db = UsuarioModel.query.get(id)
-    
-    if not usuario_db:
-       return None
-        
-    usuario_db.nome = usuario_entity.nome
-    usuario_db.telefone = usuario_entity.telefone
-    
-    if usuario_entity.senha:
-        usuario_db.gen_senha(usuario_entity.senha)
-        
-    db.session.commit()    
-    
-    return Usuario(
-        nome=usuario_db.nome,
-        email=usuario_db.email,
-        telefone=usuario_db.telefone,
-        senha=usuario_db.senha
-    )
-    
-    
 def excluir_usuario(id):
     usuario_db = UsuarioModel.query.get(id)
     if not usuario_db:
         return False 
     db.session.delete(usuario_db)
-    db.session.commit()
+    try:
+        db.session.commit()
+    except StaleDataError:
+        # alterado por outra requisição entre a leitura e o DELETE
+        db.session.rollback()
+        raise conflito(UsuarioModel, id)
     return True 
     
-def editar_usuario(id, usuario_entity):
+def editar_usuario(id, usuario_entity, versoes=None):
+    """
+    Altera nome, telefone e (se informada) a senha; o email não muda.
+    ``versoes``: versões aceitas (If-Match); outra versão, ou uma edição
+    concorrente gravada antes do commit, levanta ConflitoVersao.
+    """
     usuario_db = UsuarioModel.query.get(id)
     
     if not usuario_db:
         return None
 
+    try:
+        conferir(usuario_db, versoes)
+    except ConflitoVersao:
+        db.session.rollback()
+        raise
+
     usuario_db.nome = usuario_entity.nome
     usuario_db.telefone = usuario_entity.telefone
 
     if usuario_entity.senha:
         usuario_db.gen_senha(usuario_entity.senha)
 
-    db.session.commit()
+    try:
+        # flush antes de montar a entidade: o UPDATE confere a versão lida e gera a nova
+        db.session.flush()
+    except StaleDataError:
+        db.session.rollback()
+        raise conflito(UsuarioModel, id)
 
-    return Usuario(
+    # monta a entidade antes do commit (evita um SELECT extra após expirar a instância)
+    usuario_atualizado = Usuario(
         nome = usuario_db.nome,
         email= usuario_db.email,
         telefone=usuario_db.telefone,
-        senha=usuario_db.senha
-    )      
+        senha=usuario_db.senha,
+        versao=usuario_db.versao
+    )
 
-def listar_usuario_email(email):
-    usuario_db = UsuarioModel.query.filter_by(email = email).first()
+    db.session.commit()
 
-    if usuario_db:
-        return Usuario(
-            usuario_db.nome,
-            usuario_db.email,
-            usuario_db.telefone,
-            usuario_db.senha
-        )
-    
-    return None
+    return usuario_atualizado
 
@@ -0,0 +1,113 @@
+"""
+Engine assíncrono (SQLAlchemy asyncio) para as consultas de leitura
+
+Usa a mesma URL do ``db.engine`` da app trocando o driver: sqlite ->
+aiosqlite, mysql -> asyncmy. O Flask executa cada view ``async def`` em um
+event loop novo por requisição; como o pool assíncrono fica preso ao loop
+em que foi criado, as consultas rodam em um loop dedicado (thread de fundo)
+que é dono do engine, e a view só aguarda o resultado.
+Com várias filiais há um engine assíncrono por filial (URL do banco da filial),
+em um ``PoolEngines`` próprio com o mesmo limite (FILIAL_MAX_ENGINES, LRU)
+dos engines síncronos.
+"""
+
+import asyncio
+import threading
+from contextvars import ContextVar
+from functools import wraps
+
+from flask import current_app
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from src import db
+from src.utils.filiais import PoolEngines, filial_atual, url_filial
+from src.utils.sqlite_tuning import aplicar_pragmas
+
+DRIVERS_ASYNC = {
+    'sqlite': 'sqlite+aiosqlite',
+    'mysql': 'mysql+asyncmy',
+}
+
+_fabrica_atual = ContextVar('fabrica_sessoes_async')
+_loop = None
+_loop_lock = threading.Lock()
+
+
+def url_assincrona(url):
+    """Converte a URL síncrona para o driver assíncrono equivalente"""
+    backend = url.get_backend_name()
+    if backend not in DRIVERS_ASYNC:
+        raise RuntimeError(f'Banco {backend} não tem driver assíncrono configurado')
+    return url.set(drivername=DRIVERS_ASYNC[backend])
+
+
+def criar_engine_async(app, filial=None):
+    if filial is not None and app.config.get('FILIAL_DATABASE_URL'):
+        url = url_assincrona(url_filial(app, filial))
+    else:
+        with app.app_context():
+            url = url_assincrona(db.engine.url)
+
+    engine = create_async_engine(url, pool_size=app.config.get('ASYNC_DB_POOL_SIZE', 10))
+
+    if url.get_backend_name() == 'sqlite' and app.config.get('SQLITE_PERFORMANCE_MODE'):
+        pragmas = app.config.get('SQLITE_PRAGMAS', {})
+
+        @event.listens_for(engine.sync_engine, 'connect')
+        def _ao_conectar(dbapi_connection, _connection_record):
+            aplicar_pragmas(dbapi_connection, pragmas)
+
+    return engine
+
+
+def _descartar(engine):
+    # o pool assíncrono é do loop do banco: o dispose (corrotina) roda lá, sem esperar
+    asyncio.run_coroutine_threadsafe(engine.dispose(), _loop_do_banco())
+
+
+def engines_async(app) -> PoolEngines:
+    """Pool de engines assíncronos da app (filial None = banco padrão), criado na primeira chamada"""
+    pool = app.extensions.get('sgu_async')
+    if pool is None:
+        pool = app.extensions.setdefault('sgu_async', PoolEngines(
+            app.config.get('FILIAL_MAX_ENGINES', 8), lambda filial: criar_engine_async(app, filial), _descartar))
+    return pool
+
+
+def _fabrica_sessoes(app, filial=None):
+    # o engine sai do pool (criado e descartado sob o lock dele); a fábrica em si é barata
+    return async_sessionmaker(engines_async(app).obter(filial), expire_on_commit=False)
+
+
+def _loop_do_banco():
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name='sgu-async-db', daemon=True).start()
+    return _loop
+
+
+def no_loop_do_banco(funcao):
+    """
+    Executa a corrotina no loop dedicado do banco.
+    Deve decorar as funções públicas chamadas pelas views (com app context).
+    """
+    @wraps(funcao)
+    async def wrapper(*args, **kwargs):
+        # a ContextVar da filial não passa para o loop do banco: a fábrica já é a da filial
+        fabrica = _fabrica_sessoes(current_app._get_current_object(), filial_atual())
+
+        async def executar():
+            _fabrica_atual.set(fabrica)
+            return await funcao(*args, **kwargs)
+
+        futuro = asyncio.run_coroutine_threadsafe(executar(), _loop_do_banco())
+        return await asyncio.wrap_future(futuro)
+    return wrapper
+
+
+def sessao_async() -> AsyncSession:
+    """Abre uma AsyncSession (só dentro de funções decoradas com no_loop_do_banco)"""
+    return _fabrica_atual.get()()
@@ -0,0 +1,184 @@
+"""
+Autenticação por token assinado (login uma vez, verificação barata depois)
+
+O POST /login confere a senha (pbkdf2, caro de propósito) uma única vez e
+devolve um token assinado com ``SECRET_KEY`` (itsdangerous, HMAC + data de
+emissão). Nas requisições seguintes o decorator ``autenticado`` só confere
+a assinatura e a validade do token: nenhum hash de senha e nenhuma consulta
+ao banco por requisição.
+
+Logout revoga o ``jti`` do token em ``tb_token_revogado``. Cada processo
+mantém os jtis revogados (e ainda não expirados) em memória e os recarrega
+do banco no máximo a cada AUTH_REVOCATION_REFRESH_SECONDS, para enxergar
+logouts feitos em outros processos.
+
+Com várias filiais, o token leva a filial em que foi emitido e só vale nela
+(o mesmo id de usuário é outra pessoa em outra filial); a lista de
+revogados é mantida por filial.
+
+Autorização: ``somente_equipe`` e ``equipe_ou_profissional`` (depois de
+``autenticado``) conferem o perfil do usuário (``tb_usuario.perfil``, e
+``tb_profissional.id_usuario`` para o profissional). O perfil não vai no
+token: é lido do banco (uma consulta pela chave) só nesses endpoints, para
+que mudar o perfil valha na hora.
+"""
+
+import secrets
+import threading
+import time
+from datetime import datetime, timedelta
+from functools import wraps
+from typing import Dict, Optional, Tuple
+
+from flask import current_app, g, jsonify, make_response, request
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+
+from src import db
+from src.models.profissional_model import ProfissionalModel
+from src.models.token_revogado_model import TokenRevogadoModel
+from src.models.usuario_model import UsuarioModel
+from src.utils.filiais import filial_atual
+
+SALT = 'sgu-token'
+
+_revogados: Dict[Optional[str], Dict[str, datetime]] = {}  # filial -> {jti: expira_em}
+_revogados_carregados_em: Dict[Optional[str], float] = {}
+_revogados_lock = threading.Lock()
+
+
+def _serializador() -> URLSafeTimedSerializer:
+    chave = current_app.config.get('SECRET_KEY')
+    if not chave:
+        raise RuntimeError('SECRET_KEY não configurada')
+    return URLSafeTimedSerializer(chave, salt=SALT)
+
+
+def emitir_token(id_usuario: int) -> Dict:
+    validade = current_app.config.get('AUTH_TOKEN_TTL_SECONDS', 8 * 3600)
+    token = _serializador().dumps({'sub': id_usuario, 'jti': secrets.token_hex(16), 'filial': filial_atual()})
+    return {
+        'token': token,
+        'tipo': 'Bearer',
+        'expira_em': (datetime.utcnow() + timedelta(seconds=validade)).isoformat(),
+    }
+
+
+def _carregar_revogados():
+    """jtis revogados da filial atual; recarrega do banco quando o intervalo vence"""
+    filial = filial_atual()
+    intervalo = current_app.config.get('AUTH_REVOCATION_REFRESH_SECONDS', 30)
+    if time.monotonic() - _revogados_carregados_em.get(filial, float('-inf')) < intervalo:
+        return _revogados[filial]
+
+    with _revogados_lock:
+        if time.monotonic() - _revogados_carregados_em.get(filial, float('-inf')) >= intervalo:
+            revogados = TokenRevogadoModel.query.filter(
+                TokenRevogadoModel.expira_em > datetime.utcnow()).all()
+            _revogados[filial] = {r.jti: r.expira_em for r in revogados}
+            _revogados_carregados_em[filial] = time.monotonic()
+        return _revogados[filial]
+
+
+def verificar_token(token: str) -> Optional[Dict]:
+    """Dados do token (sub, jti, emitido_em) se assinatura e validade conferem e não foi revogado"""
+    validade = current_app.config.get('AUTH_TOKEN_TTL_SECONDS', 8 * 3600)
+    try:
+        dados, emitido_em = _serializador().loads(token, max_age=validade, return_timestamp=True)
+    except BadSignature:  # inclui SignatureExpired
+        return None
+
+    if dados.get('filial') != filial_atual():
+        return None
+    if dados.get('jti') in _carregar_revogados():
+        return None
+    dados['emitido_em'] = emitido_em
+    return dados
+
+
+def revogar_token(dados: Dict) -> None:
+    """Logout: o token deixa de valer neste processo na hora e nos demais no próximo recarregamento"""
+    validade = current_app.config.get('AUTH_TOKEN_TTL_SECONDS', 8 * 3600)
+    expira_em = dados['emitido_em'].replace(tzinfo=None) + timedelta(seconds=validade)
+
+    # aproveita a escrita para apagar as revogações de tokens que já expiraram
+    TokenRevogadoModel.query.filter(TokenRevogadoModel.expira_em < datetime.utcnow()).delete(
+        synchronize_session=False)
+    if not db.session.get(TokenRevogadoModel, dados['jti']):
+        db.session.add(TokenRevogadoModel(jti=dados['jti'], expira_em=expira_em))
+    db.session.commit()
+
+    with _revogados_lock:
+        _revogados.setdefault(filial_atual(), {})[dados['jti']] = expira_em
+
+
+def _nao_autorizado(mensagem):
+    resposta = make_response(jsonify({'message': mensagem}), 401)
+    resposta.headers['WWW-Authenticate'] = 'Bearer'
+    return resposta
+
+
+def autenticado(funcao):
+    """
+    Exige ``Authorization: Bearer <token>``. O id do usuário fica em
+    ``g.id_usuario`` e os dados do token em ``g.token``.
+    """
+    @wraps(funcao)
+    def wrapper(*args, **kwargs):
+        cabecalho = request.headers.get('Authorization', '')
+        tipo, _, token = cabecalho.partition(' ')
+        if tipo.lower() != 'bearer' or not token:
+            return _nao_autorizado('Token de acesso não informado')
+
+        dados = verificar_token(token.strip())
+        if dados is None:
+            return _nao_autorizado('Token inválido, expirado ou revogado')
+
+        g.id_usuario = dados['sub']
+        g.token = dados
+        return funcao(*args, **kwargs)
+    return wrapper
+
+
+def _permissoes() -> Tuple[Optional[str], Optional[int]]:
+    """(perfil, id do profissional ligado) do usuário autenticado; uma consulta por requisição"""
+    if 'permissoes' not in g:
+        linha = db.session.query(UsuarioModel.perfil, ProfissionalModel.id).outerjoin(
+            ProfissionalModel, ProfissionalModel.id_usuario == UsuarioModel.id
+        ).filter(UsuarioModel.id == g.id_usuario).first()
+        g.permissoes = tuple(linha) if linha else (None, None)
+    return g.permissoes
+
+
+def equipe() -> bool:
+    """Usuário autenticado é da equipe"""
+    return _permissoes()[0] == 'equipe'
+
+
+def gerencia_profissional(id_profissional: int) -> bool:
+    """Usuário autenticado é da equipe ou é o próprio profissional"""
+    perfil, proprio = _permissoes()
+    return perfil == 'equipe' or (perfil == 'profissional' and proprio == id_profissional)
+
+
+def _proibido(mensagem):
+    return make_response(jsonify({'message': mensagem}), 403)
+
+
+def somente_equipe(funcao):
+    """Depois de ``autenticado``: 403 para quem não é da equipe"""
+    @wraps(funcao)
+    def wrapper(*args, **kwargs):
+        if not equipe():
+            return _proibido('Acesso restrito à equipe')
+        return funcao(*args, **kwargs)
+    return wrapper
+
+
+def equipe_ou_profissional(funcao):
+    """Depois de ``autenticado``: só a equipe ou o profissional ``id_profissional`` da rota"""
+    @wraps(funcao)
+    def wrapper(*args, **kwargs):
+        if not gerencia_profissional(kwargs['id_profissional']):
+            return _proibido('Acesso restrito à equipe e ao próprio profissional')
+        return funcao(*args, **kwargs)
+    return wrapper
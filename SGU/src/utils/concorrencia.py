@@ -0,0 +1,73 @@
+"""
+Controle otimista de concorrência (coluna ``versao`` + ETag/If-Match)
+
+``AgendamentoModel`` e ``UsuarioModel`` têm ``version_id_col``: todo UPDATE
+pelo ORM leva ``WHERE versao = <versão lida>`` e incrementa a versão. Se
+outra requisição gravou no meio-tempo, o UPDATE não acha a linha e o
+SQLAlchemy levanta ``StaleDataError``, sem lock nenhum. UPDATEs em lote
+(Core) precisam incrementar ``versao`` eles mesmos.
+
+Na API a versão é o ETag (``"3"``) do GET/PUT. Um PUT com ``If-Match``
+diferente da versão atual é recusado com 412 antes das regras de negócio;
+sem ``If-Match`` o PUT grava sobre a versão que leu e só o conflito entre a
+leitura e o commit é recusado, com 409 (não houve precondição que falhasse).
+Nos dois casos a resposta traz o ETag da versão gravada.
+"""
+
+from typing import Optional, Set
+
+from flask import jsonify, make_response, request
+
+from src import db
+
+
+class ConflitoVersao(Exception):
+    """O registro mudou desde a versão que o cliente (ou o próprio request) leu"""
+
+    def __init__(self, mensagem: str = 'O registro foi alterado por outra requisição; leia de novo e reenvie',
+                 versao_atual: Optional[int] = None):
+        super().__init__(mensagem)
+        self.versao_atual = versao_atual
+
+
+def versoes_if_match() -> Optional[Set[int]]:
+    """Versões aceitas pelo If-Match da requisição; None sem o cabeçalho ou com ``*``"""
+    if not request.if_match or request.if_match.star_tag:
+        return None
+    # ETag fraco não serve para If-Match (comparação forte); tag que não é número não casa com nenhuma versão
+    return {int(tag) for tag in request.if_match.as_set() if tag.isdigit()}
+
+
+def conferir(registro, versoes: Optional[Set[int]]) -> None:
+    """Levanta ConflitoVersao se a versão lida do registro não está entre as esperadas"""
+    if versoes is not None and registro.versao not in versoes:
+        raise ConflitoVersao(versao_atual=registro.versao)
+
+
+def conflito(modelo, id_registro) -> ConflitoVersao:
+    """ConflitoVersao com a versão gravada agora (chamar depois do rollback)"""
+    versao = db.session.query(modelo.versao).filter(modelo.id == id_registro).scalar()
+    return ConflitoVersao(versao_atual=versao)
+
+
+def com_versao(resposta, versao: Optional[int]):
+    """Resposta com o ETag da versão (e 304 para GET com If-None-Match igual)"""
+    if versao is not None:
+        resposta.set_etag(str(versao))
+        if request.method == 'GET':
+            resposta.make_conditional(request)
+    return resposta
+
+
+def resposta_conflito(erro: ConflitoVersao):
+    """
+    412 Precondition Failed se o If-Match não casou; sem If-Match (corrida entre
+    leitura e gravação) 409 Conflict. Leva o ETag da versão atual, quando conhecida.
+    """
+    corpo = {'message': str(erro)}
+    if erro.versao_atual is not None:
+        corpo['versao_atual'] = erro.versao_atual
+    resposta = make_response(jsonify(corpo), 412 if versoes_if_match() is not None else 409)
+    if erro.versao_atual is not None:
+        resposta.set_etag(str(erro.versao_atual))
+    return resposta
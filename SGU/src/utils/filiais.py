@@ -0,0 +1,187 @@
+"""
+Várias filiais em um mesmo processo: um banco por filial
+
+A filial vem do cabeçalho ``X-Filial`` (FILIAL_HEADER) e fica em uma
+ContextVar durante a requisição. A sessão do Flask-SQLAlchemy
+(``SessaoFilial``) escolhe o engine a cada comando: sem filial, o banco
+padrão (SQLALCHEMY_DATABASE_URI); com filial, o engine da filial, criado a
+partir de FILIAL_DATABASE_URL (``{filial}`` no nome do banco). Assim todos
+os services (``Model.query``, ``db.session.execute``...) passam a atender a
+filial da requisição sem mudança.
+
+Os engines ficam em um pool limitado (FILIAL_MAX_ENGINES, LRU): o menos
+usado é descartado (``dispose``) quando o limite é atingido, o que limita o
+total de conexões abertas a FILIAL_MAX_ENGINES x FILIAL_POOL_SIZE.
+
+Jobs e scripts usam ``with usar_filial('centro'):``. Migrações de uma
+filial: ``DATABASE_URL=<url da filial> flask --app migracoes db upgrade``.
+"""
+
+import os
+import re
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Optional
+
+from flask import current_app, g, jsonify, make_response, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine, make_url
+
+from src.utils.sqlite_tuning import configurar_sqlite
+
+# nome da filial vai para a URL do banco: só letras minúsculas, dígitos, _ e -
+NOME_VALIDO = re.compile(r'^[a-z0-9_-]{1,40}$')
+
+_filial_atual: ContextVar[Optional[str]] = ContextVar('filial_atual', default=None)
+
+
+def filial_atual() -> Optional[str]:
+    """Filial da requisição/job atual (None = banco padrão)"""
+    return _filial_atual.get()
+
+
+class PoolEngines:
+    """
+    Engines por filial; no máximo ``limite`` abertos ao mesmo tempo (descarta o menos usado).
+    ``descartar`` fecha o engine removido (padrão: ``dispose``).
+    """
+
+    def __init__(self, limite: int, criar: Callable[[str], Engine],
+                 descartar: Optional[Callable[[Engine], None]] = None):
+        self.limite = max(1, limite)
+        self._criar = criar
+        self._descartar = descartar or Engine.dispose
+        self._engines: 'OrderedDict[str, Engine]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.criados = 0
+        self.descartados = 0
+
+    def obter(self, filial: str) -> Engine:
+        with self._lock:
+            engine = self._engines.get(filial)
+            if engine is not None:
+                self._engines.move_to_end(filial)
+                return engine
+
+            engine = self._engines[filial] = self._criar(filial)
+            self.criados += 1
+            while len(self._engines) > self.limite:
+                # conexões em uso continuam válidas; as devolvidas ao pool antigo são fechadas
+                _, antigo = self._engines.popitem(last=False)
+                self._descartar(antigo)
+                self.descartados += 1
+            return engine
+
+    def __len__(self):
+        return len(self._engines)
+
+    def descartar_todos(self) -> None:
+        with self._lock:
+            for engine in self._engines.values():
+                self._descartar(engine)
+            self._engines.clear()
+
+
+def url_filial(app, filial: str):
+    """URL do banco da filial; sqlite com caminho relativo fica na pasta instance (como o padrão)"""
+    url = make_url(app.config['FILIAL_DATABASE_URL'].format(filial=filial))
+    if url.get_backend_name() == 'sqlite' and url.database and url.database != ':memory:' \
+            and not os.path.isabs(url.database):
+        os.makedirs(app.instance_path, exist_ok=True)
+        url = url.set(database=os.path.join(app.instance_path, url.database))
+    return url
+
+
+def _criar_engine(app, filial: str) -> Engine:
+    url = url_filial(app, filial)
+    opcoes = {} if url.get_backend_name() == 'sqlite' else {'pool_size': app.config.get('FILIAL_POOL_SIZE', 5),
+                                                            'pool_recycle': 3600}
+    engine = create_engine(url, **opcoes)
+    if app.config.get('SQLITE_PERFORMANCE_MODE'):
+        configurar_sqlite(engine, app.config.get('SQLITE_PRAGMAS', {}))
+    return engine
+
+
+def engines(app) -> PoolEngines:
+    """Pool de engines das filiais da app (criado na primeira chamada)"""
+    pool = app.extensions.get('sgu_filiais')
+    if pool is None:
+        pool = app.extensions.setdefault('sgu_filiais', PoolEngines(
+            app.config.get('FILIAL_MAX_ENGINES', 8), lambda filial: _criar_engine(app, filial)))
+    return pool
+
+
+def filial_valida(app, filial: str) -> bool:
+    """Só filiais listadas em FILIAIS: um cabeçalho qualquer não cria engine nem banco novo"""
+    return bool(filial) and bool(NOME_VALIDO.match(filial)) and filial in (app.config.get('FILIAIS') or ())
+
+
+def engine_atual(app) -> Optional[Engine]:
+    """Engine da filial atual, ou None para o banco padrão"""
+    filial = _filial_atual.get()
+    if filial is None or not app.config.get('FILIAL_DATABASE_URL'):
+        return None
+    return engines(app).obter(filial)
+
+
+class SessaoFilial(Session):
+    """Sessão do Flask-SQLAlchemy que roteia cada comando para o banco da filial atual"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None:
+            engine = engine_atual(current_app)
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+@contextmanager
+def usar_filial(filial: Optional[str]):
+    """
+    Executa o bloco no banco da filial (jobs, scripts). Encerra a sessão
+    atual na entrada e na saída, para nenhuma transação misturar bancos.
+    """
+    from src import app, db
+
+    if filial is not None and not filial_valida(app, filial):
+        raise ValueError(f'Filial inválida: {filial}')
+
+    db.session.remove()
+    token = _filial_atual.set(filial)
+    try:
+        yield
+    finally:
+        db.session.remove()
+        _filial_atual.reset(token)
+
+
+def criar_tabelas(filial: str) -> None:
+    """Cria as tabelas (e índices de busca) no banco da filial; idempotente"""
+    from src import app, db
+
+    db.metadata.create_all(engines(app).obter(filial))
+
+
+def configurar_filiais(app) -> None:
+    """Resolve a filial de cada requisição pelo cabeçalho (sem cabeçalho: banco padrão)"""
+
+    @app.before_request
+    def _resolver_filial():
+        if not app.config.get('FILIAL_DATABASE_URL'):
+            return None
+
+        filial = request.headers.get(app.config.get('FILIAL_HEADER', 'X-Filial'), '').strip().lower()
+        if not filial:
+            return None
+        if not filial_valida(app, filial):
+            return make_response(jsonify({'message': 'Filial desconhecida'}), 404)
+        g.token_filial = _filial_atual.set(filial)
+
+    @app.teardown_request
+    def _limpar_filial(_erro=None):
+        token = g.pop('token_filial', None)
+        if token is not None:
+            _filial_atual.reset(token)
@@ -0,0 +1,247 @@
+"""
+Massa de dados para testes e benchmarks: geração em lote e snapshots SQLite
+
+Semear pelos services (``cadastrar_usuario``: um pbkdf2 e um commit por
+usuário; ``cadastrar_agendamento``: validações e commit por agendamento)
+leva horas na escala de benchmark. Aqui a massa é gravada direto nas
+tabelas com ``insert()`` em executemany, em lotes, dentro de uma transação,
+e todos os clientes recebem o mesmo hash de senha, calculado uma vez.
+
+Com a mesma semente a massa é sempre a mesma (mesmos ids). Gerada uma vez,
+ela vira um snapshot (cópia do arquivo SQLite pela API de backup, consistente
+mesmo com o banco aberto em WAL) e as execuções seguintes só restauram o
+arquivo: ``preparar(diretorio, ...)`` faz as duas coisas, com o snapshot
+identificado pelos parâmetros e pelo esquema (mudou um modelo, gera de novo).
+
+Restauração:
+- ``copia``: substitui o arquivo do banco (mais rápido); nenhuma outra
+  conexão pode estar aberta nele
+- ``backup``: copia as páginas para dentro do banco aberto pela API de
+  backup (serve para ``:memory:`` e com outras conexões abertas)
+
+Uso: ``flask --app migracoes semear --agendamentos 1000000 --snapshots .snapshots``
+"""
+
+import hashlib
+import json
+import os
+import random
+import shutil
+import sqlite3
+import time
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from itertools import accumulate
+from typing import Dict, Iterator, List, Optional
+
+from passlib.hash import pbkdf2_sha256 as sha256
+from sqlalchemy import func, insert, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+from src import db
+from src.models.agendamento_model import AgendamentoModel
+from src.models.profissional_model import ProfissionalModel
+from src.models.servicos_model import ServicoModel
+from src.models.usuario_model import UsuarioModel
+
+SENHA_PADRAO = 'senha'
+PROFISSIONAIS = 20
+# (duração em minutos, valor)
+SERVICOS = ((30, 40.0), (45, 60.0), (60, 80.0), (90, 120.0), (30, 35.0), (60, 90.0), (120, 150.0), (45, 55.0))
+HORAS = (9, 10, 11, 13, 14, 15, 16, 17, 18)
+
+
+@lru_cache(maxsize=None)
+def hash_senha(senha: str = SENHA_PADRAO) -> str:
+    """pbkdf2 da senha, calculado uma vez por processo e repetido em todos os clientes"""
+    return sha256.hash(senha)
+
+
+def email_cliente(i: int) -> str:
+    return f'cliente{i}@massa.sgu'
+
+
+def _usuarios(clientes: int) -> Iterator[Dict]:
+    senha = hash_senha()
+    for i in range(1, clientes + 1):
+        email = email_cliente(i)
+        yield {'nome': f'Cliente {i}', 'email': email, 'email_canonical': email,
+               'telefone': f'1199{i:07d}', 'senha': senha}
+
+
+def _agendamentos(agendamentos: int, clientes: int, profissionais: int, semente: int,
+                  hoje: date) -> Iterator[Dict]:
+    # 60 dias para trás e 30 para frente, dias úteis, profissionais populares com mais agenda
+    aleatorio = random.Random(semente)
+    sortear, escolher, inteiro = aleatorio.random, aleatorio.choices, aleatorio.randrange
+    base = datetime.combine(hoje, datetime.min.time())
+    # dias e horários possíveis calculados uma vez (fim de semana vai para a segunda seguinte)
+    dias = [base + timedelta(days=d + (7 - (base + timedelta(days=d)).weekday()
+                                      if (base + timedelta(days=d)).weekday() >= 5 else 0))
+            for d in range(-60, 30)]
+    horarios = [timedelta(hours=h, minutes=m) for h in HORAS for m in (0, 30)]
+    antecedencias = [timedelta(days=d) for d in range(1, 20)]
+    ids_profissionais = range(1, profissionais + 1)
+    acumulados = list(accumulate(1 / i for i in ids_profissionais))
+    for _ in range(agendamentos):
+        inicio = dias[inteiro(len(dias))] + horarios[inteiro(len(horarios))]
+        servico = inteiro(len(SERVICOS))
+        if inicio < base:
+            status = 'concluido' if sortear() < 0.85 else 'cancelado'
+        else:
+            status = 'agendado' if sortear() < 0.9 else 'cancelado'
+        yield {'dt_agendamento': inicio - antecedencias[inteiro(len(antecedencias))], 'dt_atendimento': inicio,
+               'id_user': inteiro(1, clientes + 1),
+               'id_profissional': escolher(ids_profissionais, cum_weights=acumulados)[0],
+               'id_servico': servico + 1, 'valor_total': SERVICOS[servico][1], 'taxa_cancelamento': 0.0,
+               'status': status}
+
+
+def _inserir(tabela, linhas: Iterator[Dict], lote: int) -> int:
+    # índices (exceto os de unique) criados depois da carga: uma ordenação no fim em vez de um insert por linha
+    conexao = db.session.connection()
+    for indice in tabela.indexes:
+        indice.drop(conexao)
+    total = 0
+    buffer: List[Dict] = []
+    for linha in linhas:
+        buffer.append(linha)
+        if len(buffer) >= lote:
+            db.session.execute(insert(tabela), buffer)
+            total += len(buffer)
+            buffer = []
+    if buffer:
+        db.session.execute(insert(tabela), buffer)
+        total += len(buffer)
+    for indice in tabela.indexes:
+        indice.create(conexao)
+    return total
+
+
+def gerar(clientes: int = 1000, agendamentos: int = 10_000, profissionais: int = PROFISSIONAIS,
+          semente: int = 42, lote: int = 50_000, hoje: Optional[date] = None) -> Dict[str, int]:
+    """
+    Cria as tabelas e grava a massa no banco atual (filial ou padrão) em uma
+    transação. Não grava nada se já houver usuários (idempotente).
+    """
+    db.metadata.create_all(db.session.get_bind())
+    if db.session.execute(select(func.count(UsuarioModel.id))).scalar():
+        db.session.rollback()
+        return {}
+
+    try:
+        totais = {
+            'profissionais': _inserir(ProfissionalModel.__table__, (
+                {'nome': f'Profissional {i}'} for i in range(1, profissionais + 1)), lote),
+            'servicos': _inserir(ServicoModel.__table__, (
+                {'descricao': f'Serviço {i}', 'valor': valor, 'horario_duraçao': duracao}
+                for i, (duracao, valor) in enumerate(SERVICOS, 1)), lote),
+            'usuarios': _inserir(UsuarioModel.__table__, _usuarios(clientes), lote),
+            'agendamentos': _inserir(AgendamentoModel.__table__, _agendamentos(
+                agendamentos, clientes, profissionais, semente, hoje or date.today()), lote),
+        }
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return totais
+
+
+def _arquivo_sqlite(engine: Engine) -> Optional[str]:
+    """Caminho do arquivo do banco sqlite do engine (None para :memory:); erro para outros bancos"""
+    if engine.dialect.name != 'sqlite':
+        raise ValueError(f'snapshot só para sqlite (banco atual: {engine.dialect.name})')
+    with engine.connect() as conexao:
+        for _, nome, arquivo in conexao.exec_driver_sql('PRAGMA database_list'):
+            if nome == 'main':
+                return arquivo or None
+    return None
+
+
+def salvar_snapshot(destino: str, engine: Optional[Engine] = None) -> str:
+    """Copia o banco atual para ``destino`` pela API de backup do sqlite (arquivo trocado atomicamente)"""
+    engine = engine or db.session.get_bind()
+    _arquivo_sqlite(engine)
+    db.session.remove()  # nada pendente fica fora do snapshot
+
+    os.makedirs(os.path.dirname(os.path.abspath(destino)), exist_ok=True)
+    temporario = f'{destino}.{os.getpid()}.tmp'
+    with engine.connect() as conexao:
+        saida = sqlite3.connect(temporario)
+        try:
+            conexao.connection.dbapi_connection.backup(saida)
+            # snapshot autocontido: sem -wal ao lado, o arquivo é o banco inteiro
+            saida.execute('PRAGMA journal_mode=DELETE')
+        finally:
+            saida.close()
+    os.replace(temporario, destino)
+    return destino
+
+
+def restaurar_snapshot(origem: str, engine: Optional[Engine] = None, metodo: str = 'copia') -> None:
+    """Volta o banco atual ao conteúdo do snapshot ``origem`` (``metodo``: ``copia`` ou ``backup``)"""
+    if not os.path.exists(origem):
+        raise FileNotFoundError(origem)
+    engine = engine or db.session.get_bind()
+    arquivo = _arquivo_sqlite(engine)
+    db.session.remove()
+
+    if metodo == 'backup' or arquivo is None:
+        entrada = sqlite3.connect(origem)
+        try:
+            with engine.connect() as conexao:
+                entrada.backup(conexao.connection.dbapi_connection)
+        finally:
+            entrada.close()
+        return
+    if metodo != 'copia':
+        raise ValueError(f'método de restauração inválido: {metodo}')
+
+    # fecha as conexões do pool e apaga -wal/-shm do banco antigo antes de trocar o arquivo
+    # (um -wal velho seria aplicado sobre o arquivo novo)
+    engine.dispose()
+    temporario = f'{arquivo}.{os.getpid()}.tmp'
+    shutil.copyfile(origem, temporario)
+    for sufixo in ('-wal', '-shm'):
+        if os.path.exists(arquivo + sufixo):
+            os.remove(arquivo + sufixo)
+    os.replace(temporario, arquivo)
+
+
+def versao_esquema(engine: Optional[Engine] = None) -> str:
+    """Hash do DDL de todas as tabelas e índices dos modelos"""
+    dialeto = (engine or db.session.get_bind()).dialect
+    ddl = []
+    for tabela in db.metadata.sorted_tables:
+        ddl.append(str(CreateTable(tabela).compile(dialect=dialeto)))
+        ddl += sorted(str(CreateIndex(indice).compile(dialect=dialeto)) for indice in tabela.indexes)
+    return hashlib.blake2b('\n'.join(ddl).encode(), digest_size=8).hexdigest()
+
+
+def nome_snapshot(**parametros) -> str:
+    """Nome do arquivo de snapshot para os parâmetros de ``gerar`` e o esquema atual"""
+    chave = json.dumps(parametros, sort_keys=True, default=str)
+    return f"massa-{hashlib.blake2b(chave.encode(), digest_size=6).hexdigest()}-{versao_esquema()}.db"
+
+
+def preparar(diretorio: str, metodo: str = 'copia', **parametros) -> Dict:
+    """
+    Restaura o snapshot da massa descrita por ``parametros`` (os de ``gerar``)
+    ou, se ainda não existir, gera a massa e salva o snapshot. O banco atual
+    é substituído.
+    """
+    parametros.setdefault('hoje', date.today())  # massa relativa a hoje: snapshot vale só no dia
+    arquivo = os.path.join(diretorio, nome_snapshot(**parametros))
+    comeco = time.perf_counter()
+    if os.path.exists(arquivo):
+        restaurar_snapshot(arquivo, metodo=metodo)
+        origem, totais = 'snapshot', {}
+    else:
+        engine = db.session.get_bind()
+        db.session.remove()
+        db.metadata.drop_all(engine)
+        totais = gerar(**parametros)
+        salvar_snapshot(arquivo, engine)
+        origem = 'gerado'
+    return {'origem': origem, 'arquivo': arquivo, 'segundos': round(time.perf_counter() - comeco, 3), **totais}
@@ -0,0 +1,175 @@
+"""
+Idempotency-Key para POSTs de cadastro (usuário e agendamento)
+
+A primeira requisição com uma chave reserva a chave em ``tb_idempotencia``,
+executa o service e grava a resposta. Repetições da mesma chave dentro do
+TTL devolvem a resposta gravada sem executar validações, hash de senha ou
+INSERTs de novo. Chaves expiradas são removidas periodicamente.
+
+A chave vale só para quem a enviou: o registro é gravado pelo hash de
+(usuário do token Bearer, ou IP do cliente sem token, + Idempotency-Key).
+Outro cliente que repetir a mesma chave não recebe a resposta gravada nem
+bloqueia a do dono.
+
+A reserva vale por IDEMPOTENCY_LEASE_SECONDS: se o processo morrer no meio
+da requisição a chave não fica presa em "em processamento" até o TTL; a
+primeira retentativa (mesmo corpo) depois do prazo assume a reserva e
+executa de novo. O prazo deve ser maior que a requisição mais lenta, senão
+uma retentativa pode executar junto com a original (a original então não
+grava a resposta, porque a reserva já não é dela).
+"""
+
+import hashlib
+import time
+from datetime import datetime, timedelta
+from functools import wraps
+
+from flask import Response, current_app, g, jsonify, make_response, request
+from sqlalchemy.exc import IntegrityError
+
+from src import db
+from src.models.idempotencia_model import IdempotenciaModel
+from src.utils.autenticacao import verificar_token
+from src.utils.filiais import filial_atual
+from src.utils.rate_limit import identificar_cliente
+
+HEADER = 'Idempotency-Key'
+
+_ultima_limpeza = {}  # filial -> instante da última limpeza
+
+
+def limpar_expiradas(agora: datetime = None) -> int:
+    """Remove as chaves com TTL vencido; retorna quantas foram apagadas"""
+    agora = agora or datetime.utcnow()
+    apagadas = IdempotenciaModel.query.filter(IdempotenciaModel.expira_em < agora).delete(
+        synchronize_session=False)
+    db.session.commit()
+    return apagadas
+
+
+def _limpar_se_necessario():
+    filial = filial_atual()
+    intervalo = current_app.config.get('IDEMPOTENCY_CLEANUP_INTERVAL', 300)
+    if time.monotonic() - _ultima_limpeza.get(filial, float('-inf')) >= intervalo:
+        _ultima_limpeza[filial] = time.monotonic()
+        limpar_expiradas()
+
+
+def _hash_requisicao() -> str:
+    return hashlib.sha256(request.get_data()).hexdigest()
+
+
+def _chave_do_cliente(chave: str) -> str:
+    """Chave gravada: hash do usuário autenticado (ou do IP, sem token) com o Idempotency-Key"""
+    if 'id_usuario' in g:
+        dono = f'usuario:{g.id_usuario}'
+    else:
+        tipo, _, token = request.headers.get('Authorization', '').partition(' ')
+        dados = verificar_token(token.strip()) if tipo.lower() == 'bearer' and token else None
+        dono = f"usuario:{dados['sub']}" if dados else f'ip:{identificar_cliente()}'
+    return hashlib.sha256(f'{dono}\n{chave}'.encode()).hexdigest()
+
+
+def _responder(registro: IdempotenciaModel) -> Response:
+    resposta = Response(registro.corpo, status=registro.status_code, mimetype='application/json')
+    resposta.headers['Idempotent-Replayed'] = 'true'
+    return resposta
+
+
+def _reservar(chave, endpoint, hash_requisicao, agora):
+    """
+    Grava a chave como 'em processamento' (criado_em = ``agora``, que identifica
+    a reserva); retorna o registro existente se já houver um. Reserva em
+    processamento com o lease vencido é assumida pela retentativa.
+    """
+    registro = db.session.get(IdempotenciaModel, (chave, endpoint))
+    if registro and registro.expira_em < agora:
+        db.session.delete(registro)
+        db.session.commit()
+        registro = None
+
+    if registro:
+        lease = current_app.config.get('IDEMPOTENCY_LEASE_SECONDS', 60)
+        if (registro.status_code is None and registro.hash_requisicao == hash_requisicao
+                and registro.criado_em < agora - timedelta(seconds=lease)):
+            # UPDATE condicional: entre retentativas simultâneas só uma assume a reserva
+            assumidas = IdempotenciaModel.query.filter_by(
+                chave=chave, endpoint=endpoint, status_code=None, criado_em=registro.criado_em
+            ).update({'criado_em': agora}, synchronize_session=False)
+            db.session.commit()
+            if assumidas:
+                return None
+            return db.session.get(IdempotenciaModel, (chave, endpoint))
+        return registro
+
+    ttl = current_app.config.get('IDEMPOTENCY_TTL_SECONDS', 24 * 3600)
+    db.session.add(IdempotenciaModel(
+        chave=chave, endpoint=endpoint, hash_requisicao=hash_requisicao,
+        criado_em=agora, expira_em=agora + timedelta(seconds=ttl)))
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # outra requisição com a mesma chave reservou primeiro
+        db.session.rollback()
+        return db.session.get(IdempotenciaModel, (chave, endpoint))
+    return None
+
+
+def _liberar(chave, endpoint, reservado_em):
+    # só a própria reserva (uma retentativa pode tê-la assumido depois do lease)
+    db.session.rollback()
+    IdempotenciaModel.query.filter_by(chave=chave, endpoint=endpoint, status_code=None,
+                                      criado_em=reservado_em).delete(synchronize_session=False)
+    db.session.commit()
+
+
+def idempotente(endpoint: str):
+    """
+    Decorator para métodos POST de Resource.
+    Sem o header Idempotency-Key a requisição segue normalmente.
+    """
+    def decorator(funcao):
+        @wraps(funcao)
+        def wrapper(*args, **kwargs):
+            chave = request.headers.get(HEADER)
+            if not chave:
+                return funcao(*args, **kwargs)
+
+            if len(chave) > 255:
+                return make_response(jsonify({'message': f'{HEADER} muito longa'}), 400)
+
+            _limpar_se_necessario()
+            chave = _chave_do_cliente(chave)
+            hash_requisicao = _hash_requisicao()
+            # segundos inteiros: a reserva é comparada por igualdade e o MySQL trunca DATETIME
+            reservado_em = datetime.utcnow().replace(microsecond=0)
+            existente = _reservar(chave, endpoint, hash_requisicao, reservado_em)
+
+            if existente:
+                if existente.hash_requisicao != hash_requisicao:
+                    return make_response(jsonify(
+                        {'message': f'{HEADER} já usada com outro corpo de requisição'}), 422)
+                if existente.status_code is None:
+                    return make_response(jsonify(
+                        {'message': 'Requisição original ainda em processamento'}), 409)
+                return _responder(existente)
+
+            try:
+                resposta = make_response(funcao(*args, **kwargs))
+            except Exception:
+                _liberar(chave, endpoint, reservado_em)
+                raise
+
+            # 429/5xx não são definitivos: libera a chave para o cliente tentar de novo
+            if resposta.status_code == 429 or resposta.status_code >= 500:
+                _liberar(chave, endpoint, reservado_em)
+                return resposta
+
+            IdempotenciaModel.query.filter_by(
+                chave=chave, endpoint=endpoint, status_code=None, criado_em=reservado_em
+            ).update({'status_code': resposta.status_code, 'corpo': resposta.get_data(as_text=True)},
+                     synchronize_session=False)
+            db.session.commit()
+            return resposta
+        return wrapper
+    return decorator
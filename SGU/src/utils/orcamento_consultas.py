@@ -0,0 +1,64 @@
+"""
+Orçamento de consultas SQL e de tempo por operação
+
+Conta os comandos enviados ao banco (evento ``before_cursor_execute`` do
+SQLAlchemy) e o tempo gasto dentro de um bloco ``with``. Ao sair do bloco,
+falha com ``OrcamentoExcedido`` se algum limite foi ultrapassado:
+
+    with OrcamentoConsultas(db.engine, max_consultas=3, max_ms=50):
+        agendamento_services.listar_horarios_disponiveis(1, '2030-01-02')
+"""
+
+import time
+from typing import List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+class OrcamentoExcedido(AssertionError):
+    pass
+
+
+class OrcamentoConsultas:
+    def __init__(self, engine: Engine, max_consultas: Optional[int] = None,
+                 max_ms: Optional[float] = None, nome: str = ''):
+        self.engine = engine
+        self.max_consultas = max_consultas
+        self.max_ms = max_ms
+        self.nome = nome
+        self.comandos: List[str] = []
+        self.ms = 0.0
+        self._inicio = 0.0
+
+    @property
+    def consultas(self) -> int:
+        return len(self.comandos)
+
+    def _registrar(self, _conn, _cursor, statement, _parameters, _context, executemany):
+        self.comandos.append(statement)
+
+    def __enter__(self):
+        event.listen(self.engine, 'before_cursor_execute', self._registrar)
+        self._inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, tipo_erro, _erro, _tb):
+        self.ms = (time.perf_counter() - self._inicio) * 1000
+        event.remove(self.engine, 'before_cursor_execute', self._registrar)
+
+        # erro dentro do bloco tem prioridade sobre o orçamento
+        if tipo_erro is None:
+            self.verificar()
+        return False
+
+    def verificar(self) -> None:
+        problemas = []
+        if self.max_consultas is not None and self.consultas > self.max_consultas:
+            problemas.append(f'{self.consultas} consultas (máximo {self.max_consultas})')
+        if self.max_ms is not None and self.ms > self.max_ms:
+            problemas.append(f'{self.ms:.1f} ms (máximo {self.max_ms} ms)')
+
+        if problemas:
+            comandos = '\n'.join(f'  {i + 1}. {c.splitlines()[0][:120]}' for i, c in enumerate(self.comandos))
+            raise OrcamentoExcedido(f'{self.nome or "operação"}: ' + ', '.join(problemas) + f'\n{comandos}')
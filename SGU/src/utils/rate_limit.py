@@ -0,0 +1,215 @@
+"""
+Rate limiting (token bucket) e controle de admissão para endpoints de escrita
+
+- Token bucket por endpoint + cliente: limita a taxa de requisições.
+- Admissão: limita quantas requisições de um endpoint (e de um mesmo cliente)
+  executam ao mesmo tempo; as excedentes esperam numa fila curta e, se a fila
+  estiver cheia ou o tempo acabar, recebem 429.
+
+O estado fica em memória do processo (``BackendMemoria``). Com
+``RATE_LIMIT_REDIS_URL`` configurado os buckets passam a ser compartilhados
+entre processos (``BackendRedis``, requer o pacote ``redis``). Qualquer objeto
+com o método ``consumir`` pode substituir o backend (ex.: um stand-in local).
+"""
+
+import math
+import threading
+import time
+from functools import wraps
+from typing import Dict, Tuple
+
+from flask import current_app, jsonify, make_response, request
+
+
+class BackendMemoria:
+    """Token buckets mantidos em um dicionário do processo"""
+
+    def __init__(self, relogio=time.monotonic, max_chaves: int = 10000):
+        self._relogio = relogio
+        self._max_chaves = max_chaves
+        # chave -> (tokens, instante da última leitura, instante em que o bucket enche)
+        self._buckets: Dict[str, Tuple[float, float, float]] = {}
+        self._lock = threading.Lock()
+
+    def consumir(self, chave: str, capacidade: int, taxa: float, custo: int = 1) -> Tuple[bool, float]:
+        """
+        Tenta retirar ``custo`` tokens do bucket ``chave``.
+        Retorna (permitido, segundos até haver tokens suficientes).
+        """
+        agora = self._relogio()
+        with self._lock:
+            tokens, ultimo, _ = self._buckets.get(chave, (float(capacidade), agora, agora))
+            tokens = min(float(capacidade), tokens + (agora - ultimo) * taxa)
+
+            permitido = tokens >= custo
+            if permitido:
+                tokens -= custo
+
+            if chave not in self._buckets and len(self._buckets) >= self._max_chaves:
+                self._descartar_cheios(agora)
+            self._buckets[chave] = (tokens, agora, agora + (capacidade - tokens) / taxa)
+
+        if permitido:
+            return True, 0.0
+        return False, (custo - tokens) / taxa
+
+    def _descartar_cheios(self, agora):
+        # bucket cheio equivale a bucket inexistente, pode sair do dicionário
+        for chave in [c for c, (_, _, cheio_em) in self._buckets.items() if cheio_em <= agora]:
+            del self._buckets[chave]
+
+
+class BackendRedis:
+    """Token buckets compartilhados entre processos via Redis (script Lua atômico)"""
+
+    _SCRIPT = """
+    local capacidade = tonumber(ARGV[1])
+    local taxa = tonumber(ARGV[2])
+    local custo = tonumber(ARGV[3])
+    local agora = tonumber(ARGV[4])
+    local estado = redis.call('HMGET', KEYS[1], 'tokens', 'ultimo')
+    local tokens = tonumber(estado[1]) or capacidade
+    local ultimo = tonumber(estado[2]) or agora
+    tokens = math.min(capacidade, tokens + (agora - ultimo) * taxa)
+    local permitido = 0
+    if tokens >= custo then
+        tokens = tokens - custo
+        permitido = 1
+    end
+    redis.call('HSET', KEYS[1], 'tokens', tokens, 'ultimo', agora)
+    redis.call('EXPIRE', KEYS[1], math.ceil(capacidade / taxa) + 1)
+    return {permitido, tostring(tokens)}
+    """
+
+    def __init__(self, url: str, prefixo: str = 'sgu:rl:'):
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError('RATE_LIMIT_REDIS_URL configurado, mas o pacote redis não está instalado') from e
+
+        self._cliente = redis.Redis.from_url(url)
+        self._script = self._cliente.register_script(self._SCRIPT)
+        self._prefixo = prefixo
+
+    def consumir(self, chave: str, capacidade: int, taxa: float, custo: int = 1) -> Tuple[bool, float]:
+        permitido, tokens = self._script(
+            keys=[self._prefixo + chave],
+            args=[capacidade, taxa, custo, time.time()])
+        if int(permitido):
+            return True, 0.0
+        return False, (custo - float(tokens)) / taxa
+
+
+class Admissao:
+    """Limite de concorrência com fila de espera limitada, por chave"""
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._ativos: Dict[str, int] = {}
+        self._esperando: Dict[str, int] = {}
+
+    def entrar(self, chaves: Dict[str, int], fila_max: int, espera_max: float) -> bool:
+        """
+        Ocupa uma vaga em todas as ``chaves`` ({chave: limite}) de uma vez.
+        Espera no máximo ``espera_max`` segundos; retorna False se a fila
+        estiver cheia ou o tempo acabar.
+        """
+        prazo = time.monotonic() + espera_max
+        with self._cond:
+            if self._tem_vaga(chaves):
+                self._ocupar(chaves)
+                return True
+
+            principal = next(iter(chaves))
+            if self._esperando.get(principal, 0) >= fila_max:
+                return False
+
+            self._esperando[principal] = self._esperando.get(principal, 0) + 1
+            try:
+                while not self._tem_vaga(chaves):
+                    restante = prazo - time.monotonic()
+                    if restante <= 0:
+                        return False
+                    self._cond.wait(restante)
+                self._ocupar(chaves)
+                return True
+            finally:
+                self._esperando[principal] -= 1
+                if not self._esperando[principal]:
+                    del self._esperando[principal]
+
+    def sair(self, chaves: Dict[str, int]) -> None:
+        with self._cond:
+            for chave in chaves:
+                self._ativos[chave] -= 1
+                if not self._ativos[chave]:
+                    del self._ativos[chave]
+            self._cond.notify_all()
+
+    def _tem_vaga(self, chaves):
+        return all(self._ativos.get(chave, 0) < limite for chave, limite in chaves.items())
+
+    def _ocupar(self, chaves):
+        for chave in chaves:
+            self._ativos[chave] = self._ativos.get(chave, 0) + 1
+
+
+backend = BackendMemoria()
+admissao = Admissao()
+
+
+def configurar_rate_limit(app) -> None:
+    """Escolhe o backend dos buckets conforme ``connection.py``"""
+    global backend
+    url = app.config.get('RATE_LIMIT_REDIS_URL')
+    backend = BackendRedis(url) if url else BackendMemoria()
+
+
+def identificar_cliente() -> str:
+    """Identifica o cliente pelo IP (ou X-Forwarded-For atrás de proxy confiável)"""
+    if current_app.config.get('RATE_LIMIT_TRUST_PROXY'):
+        encaminhado = request.headers.get('X-Forwarded-For', '')
+        if encaminhado:
+            return encaminhado.split(',')[0].strip()
+    return request.remote_addr or 'desconhecido'
+
+
+def _resposta_429(mensagem, retry_after):
+    resposta = make_response(jsonify({'message': mensagem}), 429)
+    resposta.headers['Retry-After'] = str(max(1, math.ceil(retry_after)))
+    return resposta
+
+
+def limitar(endpoint: str, taxa: float, capacidade: int, concorrencia: int,
+            concorrencia_cliente: int = 1, fila: int = 8, espera: float = 2.0):
+    """
+    Decorator para métodos de Resource que fazem trabalho pesado.
+
+    :param taxa: tokens repostos por segundo, por cliente
+    :param capacidade: rajada máxima por cliente
+    :param concorrencia: execuções simultâneas do endpoint (todos os clientes)
+    :param concorrencia_cliente: execuções simultâneas por cliente
+    :param fila: requisições que podem esperar vaga no endpoint
+    :param espera: tempo máximo de espera na fila, em segundos
+    """
+    def decorator(funcao):
+        @wraps(funcao)
+        def wrapper(*args, **kwargs):
+            if not current_app.config.get('RATE_LIMIT_ENABLED', True):
+                return funcao(*args, **kwargs)
+
+            cliente = identificar_cliente()
+            permitido, retry_after = backend.consumir(f'{endpoint}:{cliente}', capacidade, taxa)
+            if not permitido:
+                return _resposta_429('Muitas requisições, tente novamente mais tarde', retry_after)
+
+            chaves = {endpoint: concorrencia, f'{endpoint}:{cliente}': concorrencia_cliente}
+            if not admissao.entrar(chaves, fila, espera):
+                return _resposta_429('Servidor ocupado, tente novamente mais tarde', espera)
+
+            try:
+                return funcao(*args, **kwargs)
+            finally:
+                admissao.sair(chaves)
+        return wrapper
+    return decorator
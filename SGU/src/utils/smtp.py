@@ -0,0 +1,120 @@
+"""
+Cliente SMTP com pool de conexões (lembretes e demais e-mails)
+
+Abrir uma conexão SMTP (TCP, EHLO, STARTTLS, AUTH) custa mais que enviar
+uma mensagem: o pool mantém até ``tamanho`` conexões abertas e cada envio
+em lote reaproveita uma delas para várias mensagens. Conexão derrubada
+pelo servidor é refeita uma vez antes de a mensagem contar como falha.
+
+Para testes, qualquer servidor SMTP local serve (ex.: ``python
+benchmarks/smtp_local.py``, com LEMBRETE_SMTP_PORT=1025).
+"""
+
+import queue
+import smtplib
+import threading
+from contextlib import contextmanager
+from email.message import EmailMessage
+from typing import List, Optional
+
+
+class PoolSMTP:
+    def __init__(self, host: str, porta: int, usuario: Optional[str] = None, senha: Optional[str] = None,
+                 starttls: bool = False, tamanho: int = 4, timeout: float = 10):
+        self.host = host
+        self.porta = porta
+        self.usuario = usuario
+        self.senha = senha
+        self.starttls = starttls
+        self.tamanho = max(1, tamanho)
+        self.timeout = timeout
+        self._livres: 'queue.LifoQueue[smtplib.SMTP]' = queue.LifoQueue()
+        self._vagas = threading.BoundedSemaphore(self.tamanho)
+        self.conexoes_abertas = 0
+
+    def _conectar(self) -> smtplib.SMTP:
+        smtp = smtplib.SMTP(self.host, self.porta, timeout=self.timeout)
+        try:
+            if self.starttls:
+                smtp.starttls()
+            if self.usuario:
+                smtp.login(self.usuario, self.senha or '')
+        except Exception:
+            smtp.close()
+            raise
+        self.conexoes_abertas += 1
+        return smtp
+
+    @staticmethod
+    def _encerrar(smtp: smtplib.SMTP) -> None:
+        try:
+            smtp.quit()
+        except (smtplib.SMTPException, OSError):
+            smtp.close()
+
+    @contextmanager
+    def conexao(self):
+        """Conexão do pool (abre uma nova se não houver livre); descartada se der erro durante o uso"""
+        with self._vagas:
+            try:
+                smtp = self._livres.get_nowait()
+            except queue.Empty:
+                smtp = self._conectar()
+            try:
+                yield smtp
+            except BaseException:
+                # estado da sessão SMTP desconhecido: não volta para o pool
+                smtp.close()
+                raise
+            self._livres.put(smtp)
+
+    def enviar(self, mensagens: List[EmailMessage]) -> List[Optional[str]]:
+        """
+        Envia as mensagens por uma única conexão do pool. Devolve, na mesma
+        ordem, None para enviada ou a mensagem de erro.
+        """
+        resultados: List[Optional[str]] = []
+        pendentes = list(mensagens)
+        reconectou = False
+        while pendentes:
+            try:
+                with self.conexao() as smtp:
+                    while pendentes:
+                        try:
+                            smtp.send_message(pendentes[0])
+                            resultados.append(None)
+                        except (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused,
+                                smtplib.SMTPDataError) as e:
+                            # recusa da mensagem: a conexão continua boa
+                            resultados.append(str(e)[:255])
+                        pendentes.pop(0)
+            except (smtplib.SMTPException, OSError) as e:
+                if reconectou:
+                    resultados += [str(e)[:255] or e.__class__.__name__] * len(pendentes)
+                    break
+                reconectou = True
+        return resultados
+
+    def fechar(self) -> None:
+        while True:
+            try:
+                self._encerrar(self._livres.get_nowait())
+            except queue.Empty:
+                return
+
+
+_pools_lock = threading.Lock()
+
+
+def pool_smtp(app) -> PoolSMTP:
+    """Pool SMTP da app, configurado por LEMBRETE_SMTP_* (criado na primeira chamada)"""
+    pool = app.extensions.get('sgu_smtp')
+    if pool is None:
+        with _pools_lock:
+            pool = app.extensions.get('sgu_smtp')
+            if pool is None:
+                pool = app.extensions['sgu_smtp'] = PoolSMTP(
+                    app.config.get('LEMBRETE_SMTP_HOST', 'localhost'), app.config.get('LEMBRETE_SMTP_PORT', 25),
+                    app.config.get('LEMBRETE_SMTP_USUARIO'), app.config.get('LEMBRETE_SMTP_SENHA'),
+                    app.config.get('LEMBRETE_SMTP_STARTTLS', False), app.config.get('LEMBRETE_SMTP_POOL', 4))
+    return pool
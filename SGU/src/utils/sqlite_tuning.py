@@ -0,0 +1,43 @@
+"""
+Perfil de desempenho para SQLite
+Aplica WAL, synchronous=NORMAL, mmap, cache e busy timeout em cada conexão
+nova do pool, via evento ``connect`` do SQLAlchemy.
+"""
+
+from typing import Dict
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+def aplicar_pragmas(dbapi_connection, pragmas: Dict) -> None:
+    """Executa os PRAGMAs informados em uma conexão DBAPI do sqlite3"""
+    cursor = dbapi_connection.cursor()
+    try:
+        for nome, valor in pragmas.items():
+            cursor.execute(f'PRAGMA {nome}={valor}')
+    finally:
+        cursor.close()
+
+
+def configurar_sqlite(engine: Engine, pragmas: Dict) -> bool:
+    """
+    Registra os PRAGMAs no evento de conexão do engine.
+    Retorna False (sem fazer nada) quando o banco não é SQLite.
+    """
+    if engine.dialect.name != 'sqlite':
+        return False
+
+    @event.listens_for(engine, 'connect')
+    def _ao_conectar(dbapi_connection, _connection_record):
+        aplicar_pragmas(dbapi_connection, pragmas)
+
+    return True
+
+
+def configurar_sqlite_app(app, db) -> bool:
+    """Aplica o perfil configurado em ``connection.py`` ao engine da app Flask"""
+    if not app.config.get('SQLITE_PERFORMANCE_MODE'):
+        return False
+
+    with app.app_context():
+        return configurar_sqlite(db.engine, app.config.get('SQLITE_PRAGMAS', {}))
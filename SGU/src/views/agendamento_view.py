@@ -0,0 +1,153 @@
+from datetime import datetime, timedelta
+from flask_restful import Resource
+from marshmallow import ValidationError
+from src.schemas import agendamento_schema
+from src.models.agendamento_model import AgendamentoModel
+from flask import request, jsonify, make_response
+from src.services import agendamento_services
+from src.utils.autenticacao import autenticado, equipe_ou_profissional
+from src.utils.concorrencia import ConflitoVersao, com_versao, resposta_conflito, versoes_if_match
+from src.utils.idempotencia import idempotente
+from src.utils.rate_limit import limitar
+from src import api
+
+
+# POST-GET-PUT-DELETE
+# Lidar com todos os agendamentos
+class AgendamentoList(Resource):
+    def get(self):
+        agendamentos = agendamento_services.listar_agendamentos()
+        if not agendamentos:
+            return make_response(jsonify({'message': 'Não existem agendamentos!'}))
+
+        return make_response(jsonify(agendamento_schema.serializar_agendamentos(agendamentos)), 200)
+
+    # validações + consultas de disponibilidade: limitado por cliente e por endpoint
+    @idempotente('agendamento_post')
+    @limitar('agendamento_post', taxa=1, capacidade=10, concorrencia=8)
+    def post(self):
+        schema = agendamento_schema.agendamento_schema
+
+        try:
+            dados = schema.load(request.json)
+        except ValidationError as err:
+            return make_response(jsonify(err.messages), 400)
+
+        try:
+            novo_agendamento = AgendamentoModel(**dados)
+            resultado = agendamento_services.cadastrar_agendamento(novo_agendamento)
+            return make_response(jsonify(schema.dump(resultado)), 201)
+
+        except Exception as e:
+            return make_response(jsonify({'message': str(e)}), 400)
+
+
+api.add_resource(AgendamentoList, '/agendamento')
+
+
+class AgendamentoResource(Resource):
+    def get(self, id_agendamento):
+        agendamento = agendamento_services.listar_agendamento_id(id_agendamento)
+        if not agendamento:
+            return make_response(jsonify({'message': 'Agendamento não encontrado'}), 404)
+
+        schema = agendamento_schema.agendamento_schema
+        return com_versao(make_response(jsonify(schema.dump(agendamento)), 200), agendamento.versao)
+
+    # If-Match com o ETag do GET: edição concorrente vira 412 em vez de sobrescrever
+    def put(self, id_agendamento):
+        schema = agendamento_schema.agendamento_schema
+
+        try:
+            dados = schema.load(request.json)
+        except ValidationError as err:
+            return make_response(jsonify(err.messages), 400)
+
+        try:
+            agendamento = agendamento_services.editar_agendamento(
+                id_agendamento, AgendamentoModel(**dados), versoes_if_match())
+            return com_versao(make_response(jsonify(schema.dump(agendamento)), 200), agendamento.versao)
+        except ConflitoVersao as e:
+            return resposta_conflito(e)
+        except Exception as e:
+            return make_response(jsonify({'message': str(e)}), 400)
+
+    def delete(self, id_agendamento):
+        try:
+            pedido = agendamento_services.excluir_agendamento(id_agendamento)
+            resposta = {'message': 'Agendamento cancelado com sucesso!'}
+            if pedido:
+                # vaga repassada para a lista de espera
+                resposta['lista_espera'] = {'id': pedido.id, 'status': pedido.status,
+                                            'id_agendamento': pedido.id_agendamento}
+            return make_response(jsonify(resposta), 200)
+        except ConflitoVersao as e:
+            return resposta_conflito(e)
+        except Exception as e:
+            return make_response(jsonify({'message': str(e)}), 400)
+
+api.add_resource(AgendamentoResource, '/agendamento/<int:id_agendamento>')
+
+
+class HorariosDisponiveis(Resource):
+    def get(self, id_profissional):
+        data = request.args.get('data')
+        if not data:
+            return make_response(jsonify({'message': 'Informe a data (YYYY-MM-DD)'}), 400)
+
+        try:
+            resultado = agendamento_services.listar_horarios_disponiveis(id_profissional, data)
+            return make_response(jsonify(resultado), 200)
+        except Exception as e:
+            return make_response(jsonify({'message': str(e)}), 400)
+
+api.add_resource(HorariosDisponiveis, '/profissional/<int:id_profissional>/horarios')
+
+
+class ProximosHorarios(Resource):
+    # horários livres mais cedo para um serviço, com qualquer profissional
+    def get(self, id_servico):
+        try:
+            inicio = datetime.fromisoformat(request.args['inicio']) if 'inicio' in request.args else datetime.now()
+            fim = datetime.fromisoformat(request.args['fim']) if 'fim' in request.args else inicio + timedelta(days=14)
+        except ValueError:
+            return make_response(jsonify({'message': 'inicio/fim devem estar no formato ISO 8601'}), 400)
+
+        limite = min(request.args.get('limite', 5, type=int), 50)
+
+        try:
+            horarios = agendamento_services.buscar_proximos_horarios(id_servico, inicio, fim, limite)
+            return make_response(jsonify(horarios), 200)
+        except Exception as e:
+            return make_response(jsonify({'message': str(e)}), 400)
+
+api.add_resource(ProximosHorarios, '/servico/<int:id_servico>/proximos-horarios')
+
+
+class CancelamentoProfissional(Resource):
+    # cancela em lote a agenda do profissional (dia inteiro com "data" ou período com "inicio"/"fim");
+    # só a equipe ou o próprio profissional
+    @autenticado
+    @equipe_ou_profissional
+    @limitar('cancelamento_profissional', taxa=0.2, capacidade=2, concorrencia=1)
+    def post(self, id_profissional):
+        dados = request.json or {}
+        try:
+            if 'data' in dados:
+                inicio = datetime.fromisoformat(dados['data'])
+                fim = inicio + timedelta(days=1)
+            else:
+                inicio = datetime.fromisoformat(dados['inicio'])
+                fim = datetime.fromisoformat(dados['fim'])
+        except (KeyError, TypeError, ValueError):
+            return make_response(jsonify({'message': 'Informe data ou inicio/fim no formato ISO 8601'}), 400)
+
+        try:
+            resumo = agendamento_services.cancelar_agendamentos_profissional(id_profissional, inicio, fim)
+            return make_response(jsonify(resumo), 200)
+        except ConflitoVersao as e:
+            return resposta_conflito(e)
+        except Exception as e:
+            return make_response(jsonify({'message': str(e)}), 400)
+
+api.add_resource(CancelamentoProfissional, '/profissional/<int:id_profissional>/cancelamentos')
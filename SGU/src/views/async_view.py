@@ -0,0 +1,72 @@
+# Variante assíncrona (Flask async views) das consultas de leitura.
+# O Flask-RESTful não aguarda corrotinas, por isso aqui são rotas de Blueprint.
+from flask import Blueprint, jsonify, make_response, request
+from src.schemas import agendamento_schema, usuario_schema
+from src.services import consulta_async_services
+from src import app
+
+bp = Blueprint('async_api', __name__, url_prefix='/async')
+
+
+@bp.get('/agendamento')
+async def listar_agendamentos():
+    agendamentos = await consulta_async_services.listar_agendamentos()
+    if not agendamentos:
+        return make_response(jsonify({'message': 'Não existem agendamentos!'}))
+
+    return make_response(jsonify(agendamento_schema.serializar_agendamentos(agendamentos)), 200)
+
+
+@bp.get('/agendamento/<int:id_agendamento>')
+async def buscar_agendamento(id_agendamento):
+    agendamento = await consulta_async_services.listar_agendamento_id(id_agendamento)
+    if not agendamento:
+        return make_response(jsonify({'message': 'Agendamento não encontrado'}), 404)
+
+    return make_response(jsonify(agendamento_schema.agendamento_schema.dump(agendamento)), 200)
+
+
+@bp.get('/profissional/<int:id_profissional>/horarios')
+async def listar_horarios(id_profissional):
+    data = request.args.get('data')
+    if not data:
+        return make_response(jsonify({'message': 'Informe a data (YYYY-MM-DD)'}), 400)
+
+    try:
+        dias = request.args.get('dias', 1, type=int)
+        if dias > 1:
+            resultado = await consulta_async_services.listar_horarios_periodo(id_profissional, data, min(dias, 31))
+        else:
+            resultado = await consulta_async_services.listar_horarios_disponiveis(id_profissional, data)
+        return make_response(jsonify(resultado), 200)
+    except Exception as e:
+        return make_response(jsonify({'message': str(e)}), 400)
+
+
+@bp.get('/usuario')
+async def listar_usuarios():
+    usuarios = await consulta_async_services.listar_usuario()
+    if not usuarios:
+        return make_response(jsonify({'message': 'Não existe usuarios!'}))
+
+    return make_response(jsonify(usuario_schema.serializar_usuarios(usuarios)), 200)
+
+
+@bp.get('/usuario/<int:id_usuario>')
+async def buscar_usuario(id_usuario):
+    usuario_encontrado = await consulta_async_services.listar_usuario_id(id_usuario)
+    if not usuario_encontrado:
+        return make_response(jsonify({'message': 'Usuário não encontrado'}), 404)
+
+    return make_response(jsonify(usuario_schema.serializar_usuario(usuario_encontrado)), 200)
+
+
+@bp.get('/usuario/<int:id_usuario>/agendamentos')
+async def listar_agendamentos_usuario(id_usuario):
+    agendamentos = await consulta_async_services.listar_agendamentos_usuario(
+        id_usuario, request.args.get('status'))
+
+    return make_response(jsonify(agendamento_schema.serializar_agendamentos(agendamentos)), 200)
+
+
+app.register_blueprint(bp)
@@ -0,0 +1,28 @@
+from flask import jsonify, make_response, request
+from flask_restful import Resource
+
+from src import api
+from src.services import busca_services
+from src.utils.autenticacao import autenticado
+
+
+class Busca(Resource):
+    # busca da recepção: ?q=<texto>&tipo=usuario,servico&pagina=&por_pagina=
+    # (dados pessoais de clientes: exige token de acesso)
+    @autenticado
+    def get(self):
+        termo = request.args.get('q', '').strip()
+        if not termo:
+            return make_response(jsonify({'message': 'Informe o texto da busca (q)'}), 400)
+
+        tipos = request.args.get('tipo', ','.join(busca_services.TIPOS)).split(',')
+        pagina = max(request.args.get('pagina', 1, type=int), 1)
+        por_pagina = min(max(request.args.get('por_pagina', 20, type=int), 1), 100)
+
+        try:
+            resultado = busca_services.buscar(termo, tipos, pagina, por_pagina)
+            return make_response(jsonify(resultado), 200)
+        except Exception as e:
+            return make_response(jsonify({'message': str(e)}), 400)
+
+api.add_resource(Busca, '/busca')
@@ -0,0 +1,72 @@
+from contextlib import nullcontext
+
+from flask import g, jsonify, make_response, request, url_for
+from flask_restful import Resource
+
+from src import api
+from src.services import calendario_services
+from src.utils.autenticacao import autenticado, gerencia_profissional
+from src.utils.filiais import filial_atual, usar_filial
+
+
+# link de assinatura do calendário: cliente só o próprio; profissional só ele mesmo ou a equipe
+# (o feed do profissional traz os nomes dos clientes). GET = link atual, POST = link novo
+# (rotação: os links anteriores do dono deixam de valer)
+class CalendarioLink(Resource):
+    @autenticado
+    def get(self, tipo, id_dono):
+        return self._link(tipo, id_dono, rotacionar=False)
+
+    @autenticado
+    def post(self, tipo, id_dono):
+        return self._link(tipo, id_dono, rotacionar=True)
+
+    @staticmethod
+    def _link(tipo, id_dono, rotacionar):
+        if tipo not in calendario_services.TIPOS:
+            return make_response(jsonify({'message': 'Tipo de calendário inválido'}), 404)
+        if tipo == 'usuario' and id_dono != g.id_usuario:
+            return make_response(jsonify({'message': 'Calendário de outro usuário'}), 403)
+        if tipo == 'profissional' and not gerencia_profissional(id_dono):
+            return make_response(jsonify({'message': 'Calendário restrito à equipe e ao próprio profissional'}), 403)
+
+        try:
+            token = calendario_services.emitir_token(tipo, id_dono, rotacionar)
+        except RuntimeError as e:
+            return make_response(jsonify({'message': str(e)}), 500)
+        return make_response(jsonify({'url': url_for('calendariofeed', token=token, _external=True)}), 200)
+
+api.add_resource(CalendarioLink, '/calendario/<string:tipo>/<int:id_dono>/link')
+
+
+# feed .ics consultado pelo app de calendário (sem Authorization: o token do link identifica o dono)
+class CalendarioFeed(Resource):
+    def get(self, token):
+        dados = calendario_services.ler_token(token)
+        if dados is None:
+            return make_response(jsonify({'message': 'Calendário não encontrado'}), 404)
+
+        # apps de calendário não mandam X-Filial: a filial vem do token
+        if dados['filial'] != filial_atual():
+            if filial_atual() is not None:
+                return make_response(jsonify({'message': 'Calendário não encontrado'}), 404)
+            contexto = usar_filial(dados['filial'])
+        else:
+            contexto = nullcontext()
+
+        try:
+            with contexto:
+                corpo, etag, modificado_em = calendario_services.feed(dados['tipo'], dados['id'], dados['v'])
+        except (LookupError, ValueError) as e:
+            return make_response(jsonify({'message': str(e)}), 404)
+
+        resposta = make_response(corpo, 200)
+        resposta.mimetype = 'text/calendar'
+        resposta.set_etag(etag, weak=True)
+        resposta.last_modified = modificado_em
+        resposta.cache_control.private = True
+        resposta.cache_control.no_cache = True
+        # If-None-Match / If-Modified-Since conferidos com o feed em memória: 304 sem corpo
+        return resposta.make_conditional(request)
+
+api.add_resource(CalendarioFeed, '/calendario/<string:token>.ics')
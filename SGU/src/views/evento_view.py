@@ -0,0 +1,25 @@
+from flask import current_app, jsonify, make_response, request
+from flask_restful import Resource
+
+from src import api
+from src.schemas import evento_schema
+from src.services import evento_services
+
+
+class EventoList(Resource):
+    # consumo incremental do outbox: ?after=<último id visto>&limite=&espera=<segundos de long-poll>
+    def get(self):
+        apos = request.args.get('after', 0, type=int)
+        limite = min(max(request.args.get('limite', 100, type=int), 1), 1000)
+        espera = min(max(request.args.get('espera', 0, type=float), 0),
+                     current_app.config.get('EVENTOS_ESPERA_MAXIMA', 30))
+
+        eventos = evento_services.aguardar_eventos(apos, limite, espera)
+
+        return make_response(jsonify({
+            'eventos': evento_schema.eventos_schema.dump(eventos),
+            # cursor para a próxima chamada (o mesmo se não houve eventos)
+            'after': eventos[-1].id if eventos else apos,
+        }), 200)
+
+api.add_resource(EventoList, '/events')
@@ -0,0 +1,66 @@
+from flask_restful import Resource
+from marshmallow import ValidationError
+from src.schemas import horario_schema
+from src.models.horario_trabalho_model import ExcecaoHorarioModel
+from flask import request, jsonify, make_response
+from src.services import horario_services
+from src.utils.autenticacao import autenticado, equipe_ou_profissional, somente_equipe
+from src import api
+
+
+# modelo semanal de horários de um profissional (alterar: equipe ou o próprio profissional)
+class HorarioTrabalhoResource(Resource):
+    def get(self, id_profissional):
+        horarios = horario_services.listar_horarios_trabalho(id_profissional)
+        schema = horario_schema.horarios_trabalho_schema
+        return make_response(jsonify(schema.dump(horarios)), 200)
+
+    @autenticado
+    @equipe_ou_profissional
+    def put(self, id_profissional):
+        schema = horario_schema.horarios_trabalho_schema
+
+        try:
+            periodos = schema.load(request.json)
+        except ValidationError as err:
+            return make_response(jsonify(err.messages), 400)
+
+        try:
+            horarios = horario_services.definir_horarios_trabalho(id_profissional, periodos)
+            return make_response(jsonify(schema.dump(horarios)), 200)
+        except Exception as e:
+            return make_response(jsonify({'message': str(e)}), 400)
+
+api.add_resource(HorarioTrabalhoResource, '/profissional/<int:id_profissional>/horarios-trabalho')
+
+
+# feriados e horários especiais (só a equipe)
+class ExcecaoHorarioList(Resource):
+    @autenticado
+    @somente_equipe
+    def post(self):
+        schema = horario_schema.excecao_horario_schema
+
+        try:
+            dados = schema.load(request.json)
+        except ValidationError as err:
+            return make_response(jsonify(err.messages), 400)
+
+        try:
+            excecao = horario_services.cadastrar_excecao(ExcecaoHorarioModel(**dados))
+            return make_response(jsonify(schema.dump(excecao)), 201)
+        except Exception as e:
+            return make_response(jsonify({'message': str(e)}), 400)
+
+api.add_resource(ExcecaoHorarioList, '/excecao-horario')
+
+
+class ExcecaoHorarioResource(Resource):
+    @autenticado
+    @somente_equipe
+    def delete(self, id_excecao):
+        if not horario_services.excluir_excecao(id_excecao):
+            return make_response(jsonify({'message': 'Exceção não encontrada'}), 404)
+        return make_response(jsonify({'message': 'Exceção excluída com sucesso!'}), 200)
+
+api.add_resource(ExcecaoHorarioResource, '/excecao-horario/<int:id_excecao>')
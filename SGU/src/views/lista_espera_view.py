@@ -0,0 +1,84 @@
+from flask_restful import Resource
+from marshmallow import ValidationError
+from src.schemas import lista_espera_schema
+from src.models.lista_espera_model import ListaEsperaModel
+from flask import g, request, jsonify, make_response
+from src.services import lista_espera_services
+from src.utils.autenticacao import autenticado, equipe
+from src import api
+
+
+# inscrições na lista de espera (?id_user=&status=)
+class ListaEsperaList(Resource):
+    def get(self):
+        pedidos = lista_espera_services.listar_pedidos(
+            request.args.get('id_user', type=int), request.args.get('status'))
+        schema = lista_espera_schema.listas_espera_schema
+        return make_response(jsonify(schema.dump(pedidos)), 200)
+
+    def post(self):
+        schema = lista_espera_schema.lista_espera_schema
+
+        try:
+            dados = schema.load(request.json)
+        except ValidationError as err:
+            return make_response(jsonify(err.messages), 400)
+
+        try:
+            pedido = lista_espera_services.cadastrar_pedido(ListaEsperaModel(**dados))
+            return make_response(jsonify(schema.dump(pedido)), 201)
+        except Exception as e:
+            return make_response(jsonify({'message': str(e)}), 400)
+
+api.add_resource(ListaEsperaList, '/lista-espera')
+
+
+def _pedido_do_usuario(id_pedido):
+    # (pedido, None) para o próprio cliente ou a equipe; senão (None, resposta 404/403)
+    pedido = lista_espera_services.listar_pedido_id(id_pedido)
+    if not pedido:
+        return None, make_response(jsonify({'message': 'Pedido não encontrado'}), 404)
+    if pedido.id_user != g.id_usuario and not equipe():
+        return None, make_response(jsonify({'message': 'Pedido de outro cliente'}), 403)
+    return pedido, None
+
+
+class ListaEsperaResource(Resource):
+    @autenticado
+    def get(self, id_pedido):
+        pedido, erro = _pedido_do_usuario(id_pedido)
+        if erro:
+            return erro
+
+        return make_response(jsonify(lista_espera_schema.lista_espera_schema.dump(pedido)), 200)
+
+    @autenticado
+    def delete(self, id_pedido):
+        _, erro = _pedido_do_usuario(id_pedido)
+        if erro:
+            return erro
+
+        try:
+            lista_espera_services.cancelar_pedido(id_pedido)
+            return make_response(jsonify({'message': 'Pedido retirado da lista de espera!'}), 200)
+        except Exception as e:
+            return make_response(jsonify({'message': str(e)}), 400)
+
+api.add_resource(ListaEsperaResource, '/lista-espera/<int:id_pedido>')
+
+
+# cliente aceita a vaga oferecida (pedidos com automatico = false)
+class AceitarOferta(Resource):
+    @autenticado
+    def post(self, id_pedido):
+        _, erro = _pedido_do_usuario(id_pedido)
+        if erro:
+            return erro
+
+        try:
+            pedido = lista_espera_services.aceitar_oferta(id_pedido)
+            return make_response(jsonify(lista_espera_schema.lista_espera_schema.dump(pedido)), 200)
+        except Exception as e:
+            return make_response(jsonify({'message': str(e)}), 400)
+
+api.add_resource(AceitarOferta, '/lista-espera/<int:id_pedido>/aceitar')
@@ -0,0 +1,38 @@
+from flask import g, jsonify, make_response, request
+from flask_restful import Resource
+
+from src import api
+from src.services import usuario_services
+from src.utils.autenticacao import autenticado, emitir_token, revogar_token
+from src.utils.rate_limit import limitar
+
+
+# POST = login (emite token), GET = dono do token, DELETE = logout (revoga o token)
+class LoginResource(Resource):
+    # pbkdf2 é caro de propósito: limitado por cliente e por endpoint
+    @limitar('login', taxa=0.5, capacidade=5, concorrencia=4)
+    def post(self):
+        dados = request.get_json(silent=True) or {}
+        email, senha = dados.get('email'), dados.get('senha')
+        if not isinstance(email, str) or not isinstance(senha, str):
+            return make_response(jsonify({'message': 'Informe email e senha'}), 400)
+
+        id_usuario = usuario_services.autenticar_usuario(email, senha)
+        if id_usuario is None:
+            return make_response(jsonify({'message': 'Email ou senha inválidos'}), 401)
+
+        try:
+            return make_response(jsonify(emitir_token(id_usuario)), 200)
+        except RuntimeError as e:
+            return make_response(jsonify({'message': str(e)}), 500)
+
+    @autenticado
+    def get(self):
+        return make_response(jsonify({'id_usuario': g.id_usuario}), 200)
+
+    @autenticado
+    def delete(self):
+        revogar_token(g.token)
+        return make_response(jsonify({'message': 'Logout realizado com sucesso!'}), 200)
+
+api.add_resource(LoginResource, '/login')
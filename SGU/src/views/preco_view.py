@@ -0,0 +1,64 @@
+from flask_restful import Resource
+from marshmallow import ValidationError
+from src.schemas import preco_schema
+from src.models.regra_preco_model import RegraPrecoModel
+from flask import request, jsonify, make_response
+from src.services import preco_services
+from src.utils.autenticacao import autenticado, somente_equipe
+from src.utils.rate_limit import limitar
+from src import api
+
+
+# regras de preço (horário de pico e pacotes); alterar só a equipe
+class RegraPrecoList(Resource):
+    def get(self):
+        regras = preco_services.listar_regras()
+        return make_response(jsonify(preco_schema.regras_preco_schema.dump(regras)), 200)
+
+    @autenticado
+    @somente_equipe
+    def post(self):
+        schema = preco_schema.regra_preco_schema
+
+        try:
+            dados = schema.load(request.json)
+        except ValidationError as err:
+            return make_response(jsonify(err.messages), 400)
+
+        try:
+            regra = preco_services.cadastrar_regra(RegraPrecoModel(**dados))
+            return make_response(jsonify(schema.dump(regra)), 201)
+        except Exception as e:
+            return make_response(jsonify({'message': str(e)}), 400)
+
+api.add_resource(RegraPrecoList, '/regra-preco')
+
+
+class RegraPrecoResource(Resource):
+    @autenticado
+    @somente_equipe
+    def delete(self, id_regra):
+        if not preco_services.excluir_regra(id_regra):
+            return make_response(jsonify({'message': 'Regra não encontrada'}), 404)
+        return make_response(jsonify({'message': 'Regra excluída com sucesso!'}), 200)
+
+api.add_resource(RegraPrecoResource, '/regra-preco/<int:id_regra>')
+
+
+# preço de um ou mais serviços em vários horários candidatos, sem agendar
+class Cotacao(Resource):
+    # até MAX_HORARIOS horários por chamada: limitado por cliente e por endpoint
+    @limitar('cotacao', taxa=2, capacidade=20, concorrencia=8)
+    def post(self):
+        try:
+            dados = preco_schema.cotacao_schema.load(request.json)
+        except ValidationError as err:
+            return make_response(jsonify(err.messages), 400)
+
+        try:
+            cotacao = preco_services.cotar(dados['servicos'], dados['horarios'])
+            return make_response(jsonify(cotacao), 200)
+        except Exception as e:
+            return make_response(jsonify({'message': str(e)}), 400)
+
+api.add_resource(Cotacao, '/cotacao')
@@ -0,0 +1,61 @@
+from datetime import date, datetime, timedelta
+from flask_restful import Resource
+from flask import request, jsonify, make_response
+from src import api
+
+# período padrão dos relatórios: últimas 12 semanas
+SEMANAS_PADRAO = 12
+MAX_DIAS = 3 * 366
+
+
+def _periodo():
+    """(inicio, fim) de ?inicio=YYYY-MM-DD&fim=YYYY-MM-DD"""
+    fim = request.args.get('fim')
+    fim = datetime.strptime(fim, '%Y-%m-%d').date() if fim else date.today()
+    inicio = request.args.get('inicio')
+    inicio = datetime.strptime(inicio, '%Y-%m-%d').date() if inicio else fim - timedelta(weeks=SEMANAS_PADRAO)
+    if (fim - inicio).days > MAX_DIAS:
+        raise Exception(f"Período máximo de {MAX_DIAS} dias")
+    return inicio, fim
+
+
+# os services de relatório usam NumPy: importados na primeira requisição, não no boot da API
+class OcupacaoRelatorio(Resource):
+    def get(self):
+        from src.services import analytics_services
+
+        try:
+            inicio, fim = _periodo()
+            relatorio = analytics_services.ocupacao(inicio, fim, request.args.get('id_profissional', type=int))
+            return make_response(jsonify(relatorio), 200)
+        except Exception as e:
+            return make_response(jsonify({'message': str(e)}), 400)
+
+api.add_resource(OcupacaoRelatorio, '/relatorios/ocupacao')
+
+
+class TaxasRelatorio(Resource):
+    def get(self):
+        from src.services import analytics_services
+
+        try:
+            inicio, fim = _periodo()
+            return make_response(jsonify(analytics_services.taxas(inicio, fim)), 200)
+        except Exception as e:
+            return make_response(jsonify({'message': str(e)}), 400)
+
+api.add_resource(TaxasRelatorio, '/relatorios/taxas')
+
+
+class DemandaRelatorio(Resource):
+    def get(self):
+        from src.services import analytics_services
+
+        try:
+            inicio, fim = _periodo()
+            semanas = min(max(request.args.get('semanas', 4, type=int), 1), 26)
+            return make_response(jsonify(analytics_services.demanda(inicio, fim, semanas)), 200)
+        except Exception as e:
+            return make_response(jsonify({'message': str(e)}), 400)
+
+api.add_resource(DemandaRelatorio, '/relatorios/demanda')
@@ -2,8 +2,12 @@ from flask_restful import Resource
 from marshmallow import ValidationError
 from src.schemas import usuario_schema
 from src.entities import usuario
-from flask import request, jsonify, make_response
+from flask import g, request, jsonify, make_response
 from src.services import usuario_services
+from src.utils.autenticacao import autenticado, equipe
+from src.utils.concorrencia import ConflitoVersao, com_versao, resposta_conflito, versoes_if_match
+from src.utils.idempotencia import idempotente
+from src.utils.rate_limit import limitar
 from src import api
 
 
@@ -12,19 +16,18 @@ from src import api
 class UsuarioList(Resource):
     def get(self):
         usuarios = usuario_services.listar_usuario()
-        schema = usuario_schema.UsuarioSchema(many=True)
 
         if not usuarios:
             return make_response(jsonify({'message':'Não existe usuarios!'}))
 
-        schema = usuario_schema.UsuarioSchema(many=True)
-        return make_response(jsonify(schema.dump(usuarios)), 200)
+        return make_response(jsonify(usuario_schema.serializar_usuarios(usuarios)), 200)
 
+    # hash pbkdf2 + 2 idas ao banco: limitado por cliente e por endpoint
+    @idempotente('usuario_post')
+    @limitar('usuario_post', taxa=0.5, capacidade=5, concorrencia=4)
     def post(self):
-        schema = usuario_schema.UsuarioSchema()
-
         try:
-            dados = schema.load(request.json)
+            dados = usuario_schema.carregar_usuario(request.json)
         except ValidationError as err:
             return make_response(jsonify(err.messages), 400)    
         
@@ -41,7 +44,7 @@ class UsuarioList(Resource):
                     
             )
             resultado = usuario_services.cadastrar_usuario(novo_usurio)
-            return make_response(jsonify(schema.dump(resultado)), 201)
+            return make_response(jsonify(usuario_schema.serializar_usuario(resultado)), 201)
         
         except Exception as e:
             return make_response(jsonify({'message':str(e)}), 400)
@@ -49,24 +52,76 @@ class UsuarioList(Resource):
 
 api.add_resource(UsuarioList, '/usuario')            
 
+
+def _proibido(id_usuario):
+    # alterar ou excluir: só o próprio usuário ou a equipe
+    if id_usuario != g.id_usuario and not equipe():
+        return make_response(jsonify({'message': 'Usuário de outra pessoa'}), 403)
+    return None
+
+
 class UsuarioResource(Resource):
     def get(self, id_usuario):
         usuario_encontrado = usuario_services.listar_usuario_id(id_usuario)
         if not usuario_encontrado:
             return make_response(jsonify({'message': 'Usuário não encontrado'}))
         
-        schema = usuario_schema.UsuarioSchema()
-        return make_response(jsonify(schema.dump(usuario_encontrado)), 200)
+        return com_versao(make_response(jsonify(usuario_schema.serializar_usuario(usuario_encontrado)), 200),
+                          usuario_encontrado.versao)
     
+    # If-Match com o ETag do GET: edição concorrente vira 412 em vez de sobrescrever
+    @autenticado
+    @limitar('usuario_put', taxa=0.5, capacidade=5, concorrencia=4)
     def put(self, id_usuario):
-        ...
+        proibido = _proibido(id_usuario)
+        if proibido:
+            return proibido
+
+        corpo = request.json
+        senha_atual = corpo.pop('senha_atual', None) if isinstance(corpo, dict) else None
+        try:
+            # o email não muda pelo PUT e a senha só é trocada se vier no corpo
+            dados = usuario_schema.usuario_schema.load(corpo, partial=('email', 'senha'))
+        except ValidationError as err:
+            return make_response(jsonify(err.messages), 400)
+
+        # trocar a própria senha exige a atual (a equipe pode redefinir a de outro usuário)
+        if dados.get('senha') and id_usuario == g.id_usuario \
+                and not usuario_services.conferir_senha(id_usuario, senha_atual):
+            return make_response(jsonify({'message': 'Senha atual incorreta'}), 403)
+
+        try:
+            alterado = usuario.Usuario(
+                nome=dados['nome'],
+                email=dados.get('email'),
+                telefone=dados['telefone'],
+                senha=dados.get('senha')
+            )
+            resultado = usuario_services.editar_usuario(id_usuario, alterado, versoes_if_match())
+        except ConflitoVersao as e:
+            return resposta_conflito(e)
+        except Exception as e:
+            return make_response(jsonify({'message': str(e)}), 400)
+
+        if resultado is None:
+            return make_response(jsonify({'message': 'Usuário não encontrado'}), 404)
+        return com_versao(make_response(jsonify(usuario_schema.serializar_usuario(resultado)), 200),
+                          resultado.versao)
+
+    @autenticado
     def delete(self, id_usuario):
+        proibido = _proibido(id_usuario)
+        if proibido:
+            return proibido
+
         usuario_encontrado = usuario_services.listar_usuario_id(id_usuario)
         if not usuario_encontrado:
             return make_response(jsonify({'message': 'Usuário não encontrado'}), 404)
         try:
             usuario_services.excluir_usuario(id_usuario)
             return make_response(jsonify({'message': 'Usuário excluído com sucesso!'}), 200)
+        except ConflitoVersao as e:
+            return resposta_conflito(e)
         except Exception as e:
             return make_response(jsonify({'message':str(e)}),400)
 